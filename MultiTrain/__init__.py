@@ -1,4 +1,28 @@
-from MultiTrain.classification.classification_models import MultiClassifier
-from MultiTrain.regression.regression_models import MultiRegressor
+from importlib import import_module
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from MultiTrain.classification.classification_models import MultiClassifier
+    from MultiTrain.regression.regression_models import MultiRegressor
 
+__all__ = ['MultiClassifier', 'MultiRegressor']
+
+# the leaderboard classes are imported the first time they are used, so `import MultiTrain` stays cheap for scripts
+# that only need one of them. The model backends (xgboost, lightgbm, catboost, skopt, imblearn) and the plotting
+# libraries are imported later still, when a model, sampler or plot that needs them is built
+_LAZY = {
+    'MultiClassifier': 'MultiTrain.classification.classification_models',
+    'MultiRegressor': 'MultiTrain.regression.regression_models',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -1,52 +1,40 @@
 from collections import Counter
 from operator import __setitem__
-import seaborn as sns
-import plotly.express as px
-from IPython.display import display
-from imblearn.combine import SMOTEENN, SMOTETomek
-from imblearn.over_sampling import SMOTE, RandomOverSampler, SMOTENC, SMOTEN, ADASYN, BorderlineSMOTE, KMeansSMOTE, \
-    SVMSMOTE
-from imblearn.under_sampling import CondensedNearestNeighbour, EditedNearestNeighbours, RepeatedEditedNearestNeighbours, \
-    AllKNN, InstanceHardnessThreshold, NearMiss, NeighbourhoodCleaningRule, OneSidedSelection, RandomUnderSampler, \
-    TomekLinks
 from sklearn.decomposition import PCA
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline, make_pipeline
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.preprocessing import StandardScaler, RobustScaler, MinMaxScaler
-from catboost import CatBoostClassifier
-from sklearn.preprocessing import FunctionTransformer
-from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier, HistGradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from lightgbm import LGBMClassifier
 from pandas import DataFrame
-from sklearn.discriminant_analysis import LinearDiscriminantAnalysis, QuadraticDiscriminantAnalysis
-from sklearn.ensemble import GradientBoostingClassifier, ExtraTreesClassifier, \
-    BaggingClassifier
-from sklearn.linear_model import LogisticRegressionCV, SGDClassifier, PassiveAggressiveClassifier, RidgeClassifier, \
-    RidgeClassifierCV, Perceptron
-from sklearn.naive_bayes import GaussianNB, BernoulliNB, MultinomialNB, ComplementNB
-from sklearn.neural_network import MLPClassifier
-from sklearn.svm import LinearSVC
-from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
-from sklearn.svm import NuSVC
-from xgboost import XGBClassifier
-from imblearn.ensemble import BalancedBaggingClassifier
-from MultiTrain.methods.multitrain_methods import directory, img, img_plotly, kf_best_model, write_to_excel
-from skopt import BayesSearchCV
-from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV, cross_validate
+from MultiTrain.methods.multitrain_methods import directory, display, img, img_plotly, kf_best_model, \
+    leaderboard_record, log_data_report, result_row, result_status, split_leaderboard, write_to_excel
+from MultiTrain.methods.metrics import classification_score_matrix
+from MultiTrain.methods.parallel import WorkerSlots, run_tasks
+from MultiTrain.methods.folds import fold_data, fold_indices, fold_scores, gather_folds
+from MultiTrain.methods.racing import race_folds, race_sample, race_schedule, sample_order
+from MultiTrain.methods.registry import ModelRegistry, ModelSpec
+from MultiTrain.methods.scheduler import core_budget, cost_order, set_threads
+from MultiTrain.methods.cache import ResultCache, fingerprint, model_keys
+from MultiTrain.methods.checkpoint import Journal, previous_results, recorded
+from MultiTrain.methods.store import ModelStore
+from MultiTrain.methods.prepare import DTYPES, LAYOUTS, prepare_data, prepare_target
+from MultiTrain.methods.shared import SharedData
+from MultiTrain.methods.incremental import advance, n_rows, roll
+from MultiTrain.methods.stream import CHUNK_SIZE, ClassificationTally, prepared_chunks, scan_labels, score_stream, \
+    train_stream
+from MultiTrain.methods.sparse import DENSE_POLICIES, Skipped, densify_folds, densify_split, dense_route
+from MultiTrain.methods.text import VECTORIZERS, vectorize
+from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV
 from sklearn.experimental import enable_halving_search_cv  # noqa
 from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, make_scorer
-from sklearn.metrics import mean_absolute_error, r2_score, f1_score, roc_auc_score, mean_squared_error
-from sklearn.metrics import precision_score, recall_score, balanced_accuracy_score
-from matplotlib import pyplot as plt
+from sklearn.metrics import accuracy_score, make_scorer, precision_score, recall_score
 from numpy.random import randint
-from imblearn.pipeline import Pipeline as imbpipe
 import pandas as pd
 import numpy as np
+from scipy.sparse import issparse
 import warnings
+import copy
+import os
+import threading
 import time
 
 import logging
@@ -55,6 +43,100 @@ logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 warnings.filterwarnings("ignore")
 
+# every model of the leaderboard in its usual order. cost is the expected training cost from 1 (cheap linear and naive
+# bayes models) to 5 (kernel methods), it is used to run the cheap models first when fit is given a time_budget
+CLASSIFIERS = ModelRegistry([
+    ModelSpec("Logistic Regression", "sklearn.linear_model.LogisticRegression", threads='n_jobs',
+              sparse=True, predict_proba=True, cost=1),
+    ModelSpec("LogisticRegressionCV", "sklearn.linear_model.LogisticRegressionCV", params={'refit': True},
+              threads='n_jobs', seed=False, sparse=True, predict_proba=True, cost=2),
+    ModelSpec("SGDClassifier", "sklearn.linear_model.SGDClassifier", threads='n_jobs',
+              sparse=True, partial_fit=True, cost=1),
+    ModelSpec("PassiveAggressiveClassifier", "sklearn.linear_model.PassiveAggressiveClassifier", threads='n_jobs',
+              sparse=True, partial_fit=True, cost=1),
+    ModelSpec("RandomForestClassifier", "sklearn.ensemble.RandomForestClassifier", threads='n_jobs',
+              sparse=True, predict_proba=True, warm_start=True, cost=3),
+    ModelSpec("GradientBoostingClassifier", "sklearn.ensemble.GradientBoostingClassifier",
+              sparse=True, predict_proba=True, cost=4),
+    ModelSpec("HistGradientBoostingClassifier", "sklearn.ensemble.HistGradientBoostingClassifier",
+              predict_proba=True, cost=2),
+    ModelSpec("AdaBoostClassifier", "sklearn.ensemble.AdaBoostClassifier",
+              sparse=True, predict_proba=True, cost=3),
+    ModelSpec("CatBoostClassifier", "catboost.CatBoostClassifier",
+              params={'verbose': False, 'allow_writing_files': False}, threads='thread_count',
+              sparse=True, predict_proba=True, cost=4),
+    ModelSpec("XGBClassifier", "xgboost.XGBClassifier", params={'eval_metric': "mlogloss", 'refit': True},
+              threads='n_jobs', sparse=True, predict_proba=True, cost=3),
+    ModelSpec("GaussianNB", "sklearn.naive_bayes.GaussianNB", seed=False,
+              predict_proba=True, partial_fit=True, cost=1),
+    ModelSpec("LinearDiscriminantAnalysis", "sklearn.discriminant_analysis.LinearDiscriminantAnalysis", seed=False,
+              predict_proba=True, cost=1),
+    ModelSpec("KNeighborsClassifier", "sklearn.neighbors.KNeighborsClassifier", threads='n_jobs', seed=False,
+              sparse=True, predict_proba=True, cost=2),
+    ModelSpec("MLPClassifier", "sklearn.neural_network.MLPClassifier",
+              sparse=True, predict_proba=True, partial_fit=True, cost=4),
+    ModelSpec("SVC", "sklearn.svm.SVC", sparse=True, cost=5),
+    ModelSpec("DecisionTreeClassifier", "sklearn.tree.DecisionTreeClassifier",
+              sparse=True, predict_proba=True, cost=1),
+    ModelSpec("BernoulliNB", "sklearn.naive_bayes.BernoulliNB", seed=False,
+              sparse=True, predict_proba=True, partial_fit=True, cost=1),
+    ModelSpec("MultinomialNB", "sklearn.naive_bayes.MultinomialNB", seed=False,
+              sparse=True, predict_proba=True, partial_fit=True, cost=1),
+    ModelSpec("ComplementNB", "sklearn.naive_bayes.ComplementNB", seed=False,
+              sparse=True, predict_proba=True, partial_fit=True, cost=1),
+    ModelSpec("ExtraTreesClassifier", "sklearn.ensemble.ExtraTreesClassifier", threads='n_jobs',
+              sparse=True, predict_proba=True, warm_start=True, cost=3),
+    ModelSpec("RidgeClassifier", "sklearn.linear_model.RidgeClassifier", sparse=True, cost=1),
+    ModelSpec("RidgeClassifierCV", "sklearn.linear_model.RidgeClassifierCV", seed=False, sparse=True, cost=1),
+    ModelSpec("ExtraTreeClassifier", "sklearn.tree.ExtraTreeClassifier",
+              sparse=True, predict_proba=True, cost=1),
+    ModelSpec("QuadraticDiscriminantAnalysis", "sklearn.discriminant_analysis.QuadraticDiscriminantAnalysis",
+              seed=False, predict_proba=True, cost=1),
+    ModelSpec("LinearSVC", "sklearn.svm.LinearSVC", sparse=True, cost=2),
+    ModelSpec("BaggingClassifier", "sklearn.ensemble.BaggingClassifier", threads='n_jobs',
+              sparse=True, predict_proba=True, warm_start=True, cost=3),
+    ModelSpec("BalancedBaggingClassifier", "imblearn.ensemble.BalancedBaggingClassifier", threads='n_jobs',
+              sparse=True, predict_proba=True, warm_start=True, cost=3),
+    ModelSpec("Perceptron", "sklearn.linear_model.Perceptron", threads='n_jobs',
+              sparse=True, partial_fit=True, cost=1),
+    ModelSpec("NuSVC", "sklearn.svm.NuSVC", sparse=True, cost=5),
+    ModelSpec("LGBMClassifier", "lightgbm.LGBMClassifier", threads='n_jobs',
+              sparse=True, predict_proba=True, cost=2),
+])
+
+# the imbalanced-learn samplers that can be picked with the sampling argument, imblearn is only imported once one of
+# them is used
+OVERSAMPLERS = ModelRegistry([
+    ModelSpec("SMOTE", "imblearn.over_sampling.SMOTE"),
+    ModelSpec("RandomOverSampler", "imblearn.over_sampling.RandomOverSampler"),
+    ModelSpec("SMOTEN", "imblearn.over_sampling.SMOTEN"),
+    ModelSpec("ADASYN", "imblearn.over_sampling.ADASYN"),
+    ModelSpec("BorderlineSMOTE", "imblearn.over_sampling.BorderlineSMOTE"),
+    ModelSpec("KMeansSMOTE", "imblearn.over_sampling.KMeansSMOTE"),
+    ModelSpec("SVMSMOTE", "imblearn.over_sampling.SVMSMOTE"),
+])
+
+UNDERSAMPLERS = ModelRegistry([
+    ModelSpec("CondensedNearestNeighbour", "imblearn.under_sampling.CondensedNearestNeighbour", threads='n_jobs'),
+    ModelSpec("EditedNearestNeighbours", "imblearn.under_sampling.EditedNearestNeighbours", threads='n_jobs',
+              seed=False),
+    ModelSpec("RepeatedEditedNearestNeighbours", "imblearn.under_sampling.RepeatedEditedNearestNeighbours",
+              threads='n_jobs', seed=False),
+    ModelSpec("AllKNN", "imblearn.under_sampling.AllKNN", threads='n_jobs', seed=False),
+    ModelSpec("InstanceHardnessThreshold", "imblearn.under_sampling.InstanceHardnessThreshold", threads='n_jobs'),
+    ModelSpec("NearMiss", "imblearn.under_sampling.NearMiss", threads='n_jobs', seed=False),
+    ModelSpec("NeighbourhoodCleaningRule", "imblearn.under_sampling.NeighbourhoodCleaningRule", threads='n_jobs',
+              seed=False),
+    ModelSpec("OneSidedSelection", "imblearn.under_sampling.OneSidedSelection", threads='n_jobs', seed=False),
+    ModelSpec("RandomUnderSampler", "imblearn.under_sampling.RandomUnderSampler"),
+    ModelSpec("TomekLinks", "imblearn.under_sampling.TomekLinks", threads='n_jobs', seed=False),
+])
+
+OVER_UNDER_SAMPLERS = ModelRegistry([
+    ModelSpec("SMOTEENN", "imblearn.combine.SMOTEENN", threads='n_jobs'),
+    ModelSpec("SMOTETomek", "imblearn.combine.SMOTETomek", threads='n_jobs'),
+])
+
 
 class MultiClassifier:
 
@@ -65,7 +147,10 @@ class MultiClassifier:
                  target_class: str = 'binary',
                  imbalanced: bool = False,
                  sampling: str = None,
-                 strategy: str or float = "auto") -> None:
+                 strategy: str or float = "auto",
+                 keep: str = 'all',
+                 top_k: int = 3,
+                 spill_dir: str = None) -> None:
 
         self.cores = cores
         self.random_state = random_state
@@ -74,53 +159,18 @@ class MultiClassifier:
         self.sampling = sampling
         self.imbalanced = imbalanced
         self.strategy = strategy
-        self.oversampling_list = ['SMOTE', 'RandomOverSampler', 'SMOTEN', 'ADASYN',
-                                  'BorderlineSMOTE', 'KMeansSMOTE', 'SVMSMOTE']
-        self.oversampling_methods = [SMOTE(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     RandomOverSampler(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     SMOTEN(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     ADASYN(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     BorderlineSMOTE(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     KMeansSMOTE(sampling_strategy=self.strategy, random_state=self.random_state),
-                                     SVMSMOTE(sampling_strategy=self.strategy, random_state=self.random_state)]
-
-        self.undersampling_list = ['CondensedNearestNeighbour', 'EditedNearestNeighbours',
-                                   'RepeatedEditedNearestNeighbours', 'AllKNN', 'InstanceHardnessThreshold',
-                                   'NearMiss', 'NeighbourhoodCleaningRule', 'OneSidedSelection', 'RandomUnderSampler',
-                                   'TomekLinks']
-        self.undersampling_methods = [CondensedNearestNeighbour(sampling_strategy=self.strategy,
-                                                                random_state=self.random_state,
-                                                                n_jobs=self.cores),
-                                      EditedNearestNeighbours(sampling_strategy=self.strategy,
-                                                              n_jobs=self.cores),
-                                      RepeatedEditedNearestNeighbours(sampling_strategy=self.strategy,
-                                                                      n_jobs=self.cores),
-                                      AllKNN(sampling_strategy=self.strategy, n_jobs=self.cores),
-                                      InstanceHardnessThreshold(sampling_strategy=self.strategy,
-                                                                random_state=self.random_state,
-                                                                n_jobs=self.cores),
-                                      NearMiss(sampling_strategy=self.strategy, n_jobs=self.cores),
-                                      NeighbourhoodCleaningRule(sampling_strategy=self.strategy,
-                                                                n_jobs=self.cores),
-                                      OneSidedSelection(sampling_strategy=self.strategy,
-                                                        n_jobs=self.cores),
-                                      RandomUnderSampler(sampling_strategy=self.strategy,
-                                                         random_state=self.random_state),
-                                      TomekLinks(sampling_strategy=self.strategy, n_jobs=self.cores)]
-
-        self.over_under_list = ['SMOTEENN', 'SMOTETomek']
-        self.over_under_methods = [SMOTEENN(sampling_strategy=self.strategy,
-                                            random_state=self.random_state,
-                                            n_jobs=self.cores),
-                                   SMOTETomek(sampling_strategy=self.strategy,
-                                              random_state=self.random_state,
-                                              n_jobs=self.cores)]
+        # the fitted estimators, predictions and leaderboard of the last fit. keep is 'all', 'top_k' or 'none' and
+        # decides which fitted models stay in memory, the others are written to spill_dir or dropped
+        self.store = ModelStore(keep=keep, top_k=top_k, spill_dir=spill_dir)
+        self.oversampling_list = OVERSAMPLERS.names()
+        self.undersampling_list = UNDERSAMPLERS.names()
+        self.over_under_list = OVER_UNDER_SAMPLERS.names()
 
         self.kf_binary_columns_train = ["Overfitting", "Accuracy(Train)", "Accuracy", "Balanced Accuracy(train)",
                                         "Balanced Accuracy",
                                         "Precision(Train)", "Precision", "Recall(Train)", "Recall", "f1(Train)", "f1",
-                                        'r2', "Standard Deviation of Accuracy(Train)", "Standard Deviation of Accuracy",
-                                        "Time Taken(s)"]
+                                        "r2(Train)", 'r2', "Standard Deviation of Accuracy(Train)",
+                                        "Standard Deviation of Accuracy", "Time Taken(s)"]
 
         self.kf_binary_columns_test = ["Overfitting", "Accuracy", "Balanced Accuracy", "Precision", "Recall", "f1",
                                        "r2",
@@ -129,7 +179,7 @@ class MultiClassifier:
         self.kf_multiclass_columns_train = ["Precision Macro(Train)", "Precision Macro", "Recall Macro(Train)",
                                             "Recall Macro", "f1 Macro(Train)", "f1 Macro", "Time Taken(s)"]
 
-        self.kf_multiclass_columns_test = ["Precision Macro", "Recall Macro", "f1 Macro"]
+        self.kf_multiclass_columns_test = ["Precision Macro", "Recall Macro", "f1 Macro", "Time Taken(s)"]
 
         self.t_split_binary_columns_train = ["Overfitting", "Accuracy(Train)", "Accuracy", "Balanced Accuracy(Train)",
                                              "Balanced Accuracy", "r2 score(Train)", "r2 score", "ROC AUC(Train)",
@@ -158,20 +208,31 @@ class MultiClassifier:
 
     def _get_sample_index_method(self):
 
-        if self.sampling in self.oversampling_list:
-            index_ = self.oversampling_list.index(self.sampling)
-            method = self.oversampling_methods[index_]
-            return method
-
-        elif self.sampling in self.undersampling_list:
-            index_ = self.undersampling_list.index(self.sampling)
-            method = self.undersampling_methods[index_]
-            return method
+        for samplers in (OVERSAMPLERS, UNDERSAMPLERS, OVER_UNDER_SAMPLERS):
+            if self.sampling in samplers:
+                return samplers[self.sampling].build(n_threads=self.cores, random_state=self.random_state,
+                                                     sampling_strategy=self.strategy)
 
-        elif self.sampling in self.over_under_list:
-            index_ = self.over_under_list.index(self.sampling)
-            method = self.over_under_methods[index_]
-            return method
+    def _resample(self, X, y) -> tuple:
+        """
+        It resamples the training data of a split, a fold or a racing round with the sampler of sampling and returns
+        (the resampled data, the resampled labels). It is called once per training set and the result is shared by
+        all the models, the class counts are reported once when verbose is True
+        """
+        method = self._get_sample_index_method()
+        if self.verbose is True:
+            print(f'Before resampling: {Counter(y)}')
+        X_resampled, y_resampled = method.fit_resample(X, y)
+        if self.verbose is True:
+            print(f'After resampling: {Counter(y_resampled)}')
+            print("\n")
+        return X_resampled, y_resampled
+
+    def _cache_settings(self) -> tuple:
+        """
+        It returns the settings of the classifier that change the results of a model, they are part of its cache key
+        """
+        return self.target_class, self.imbalanced, self.sampling, self.strategy, self.random_state
 
     def split(self,
               X: any,
@@ -266,172 +327,486 @@ class MultiClassifier:
                                                                     train_size=1 - sizeOfTest)
                 return X_train, X_test, y_train, y_test
 
-    def classifier_model_names(self) -> list:
-        model_names = ["Logistic Regression", "LogisticRegressionCV", "SGDClassifier", "PassiveAggressiveClassifier",
-                       "RandomForestClassifier", "GradientBoostingClassifier", "HistGradientBoostingClassifier",
-                       "AdaBoostClassifier", "CatBoostClassifier", "XGBClassifier", "GaussianNB",
-                       "LinearDiscriminantAnalysis", "KNeighborsClassifier", "MLPClassifier", "SVC",
-                       "DecisionTreeClassifier", "BernoulliNB", "MultinomialNB", "ComplementNB",
-                       "ExtraTreesClassifier", "RidgeClassifier", "RidgeClassifierCV", "ExtraTreeClassifier",
-                       "QuadraticDiscriminantAnalysis", "LinearSVC", "BaggingClassifier",
-                       "BalancedBaggingClassifier", "Perceptron", "NuSVC", "LGBMClassifier"]
-        return model_names
-
-    def initialize(self):
+    def classifier_model_names(self, include: list = None, exclude: list = None, requires: list = None) -> list:
+        """
+        It returns the names of the models, optionally narrowed down the same way as in fit
+
+        :param include: the names of the only models to use
+        :param exclude: the names of models to leave out
+        :param requires: capabilities every model must have, any of 'sparse', 'predict_proba', 'partial_fit'
+        and 'warm_start'
+        """
+        return [spec.name for spec in CLASSIFIERS.select(include, exclude, requires)]
+
+    def initialize(self, n_threads: int = None, include: list = None, exclude: list = None, requires: list = None):
+        """
+        It initializes the models that we will be using in our ensemble. Only the selected models are imported and
+        constructed
+
+        :param n_threads: the number of threads each model may use, defaults to cores
+        :param include: the names of the only models to initialize
+        :param exclude: the names of models to leave out
+        :param requires: capabilities every model must have, any of 'sparse', 'predict_proba', 'partial_fit'
+        and 'warm_start'
+        """
+        cores = self.cores if n_threads is None else n_threads
+        return tuple(spec.build(n_threads=cores, random_state=self.random_state)
+                     for spec in CLASSIFIERS.select(include, exclude, requires))
+
+    def _keep_split_result(self, name: str, result, rows: int) -> None:
+        # the fitted models are kept so that use_model can hand them out without training them again
+        if isinstance(result, tuple) and result[1] is not None:
+            self.store.add(name, result[0], test=result[1], train=result[2], rows=rows)
+
+    def _split_record(self, name: str, result, y_tr, y_te, show_train_score: bool, reused: bool = False) -> dict:
+        """
+        It scores a single model of a split run for the record fit_iter yields, see leaderboard_record
+        """
+        columns = self._split_columns(show_train_score)
+        scores = self._split_scores({0: result}, 1, y_tr, y_te, show_train_score)
+        row = split_leaderboard([name], scores, columns, {0: result}).iloc[0].to_dict()
+        row['Overfitting'] = None if np.isnan(row['Overfitting']) else bool(row['Overfitting'])
+        return leaderboard_record(name, 'split', row, result, reused)
+
+    def _split_columns(self, show_train_score: bool) -> list:
+        if self.target_class == 'binary':
+            if show_train_score is True:
+                return self.t_split_binary_columns_train
+            return self.t_split_binary_columns_test
+
+        elif self.target_class == 'multiclass':
+            if show_train_score is True:
+                return self.t_split_multiclass_columns_train
+            return self.t_split_multiclass_columns_test
+
+    def _kfold_columns(self, show_train_score: bool) -> list:
+        if self.target_class == 'binary':
+            if show_train_score is True:
+                return self.kf_binary_columns_train
+            return self.kf_binary_columns_test
+
+        elif self.target_class == 'multiclass':
+            if show_train_score is True:
+                return self.kf_multiclass_columns_train
+            return self.kf_multiclass_columns_test
+
+    def _get_index(self, df, the_best, include=None, exclude=None, requires=None):
+        names = self.classifier_model_names(include, exclude, requires)
+        best_model_name = self._rank(df[df.index.isin(names)], the_best)[0]
+        return self._fitted_or_new(best_model_name)
+
+    def _rank(self, df, the_best) -> list:
         """
-        It initializes all the models that we will be using in our ensemble
+        It returns the model names of a leaderboard from the best to the worst on the metric the_best, the models
+        without a score come last
         """
-        lr = LogisticRegression(n_jobs=self.cores, random_state=self.random_state)
-        lrcv = LogisticRegressionCV(n_jobs=self.cores, refit=True)
-        sgdc = SGDClassifier(n_jobs=self.cores, random_state=self.random_state)
-        pagg = PassiveAggressiveClassifier(n_jobs=self.cores, random_state=self.random_state)
-        rfc = RandomForestClassifier(n_jobs=self.cores, random_state=self.random_state)
-        gbc = GradientBoostingClassifier(random_state=self.random_state)
-        hgbc = HistGradientBoostingClassifier(random_state=self.random_state)
-        abc = AdaBoostClassifier(random_state=self.random_state)
-        cat = CatBoostClassifier(thread_count=self.cores, verbose=False, random_state=self.random_state)
-        xgb = XGBClassifier(eval_metric="mlogloss", n_jobs=self.cores, refit=True, random_state=self.random_state)
-        gnb = GaussianNB()
-        lda = LinearDiscriminantAnalysis()
-        knc = KNeighborsClassifier(n_jobs=self.cores)
-        mlp = MLPClassifier(random_state=self.random_state)
-        svc = SVC(random_state=self.random_state)
-        dtc = DecisionTreeClassifier(random_state=self.random_state)
-        bnb = BernoulliNB()
-        mnb = MultinomialNB()
-        conb = ComplementNB()
-        etcs = ExtraTreesClassifier(n_jobs=self.cores, random_state=self.random_state)
-        rcl = RidgeClassifier(random_state=self.random_state)
-        rclv = RidgeClassifierCV()
-        etc = ExtraTreeClassifier(random_state=self.random_state)
-        # self.gpc = GaussianProcessClassifier(warm_start=True, random_state=42, n_jobs=-1)
-        qda = QuadraticDiscriminantAnalysis()
-        lsvc = LinearSVC(random_state=self.random_state)
-        bc = BaggingClassifier(n_jobs=self.cores, random_state=self.random_state)
-        bbc = BalancedBaggingClassifier(n_jobs=self.cores, random_state=self.random_state)
-        per = Perceptron(n_jobs=self.cores, random_state=self.random_state)
-        nu = NuSVC(random_state=self.random_state)
-        lgbm = LGBMClassifier(random_state=self.random_state)
-
-        return (lr, lrcv, sgdc, pagg, rfc, gbc, hgbc, abc, cat, xgb, gnb, lda, knc, mlp, svc, dtc, bnb, mnb, conb,
-                etcs, rcl, rclv, etc, qda, lsvc, bc, bbc, per, nu, lgbm)
-
-    def _get_index(self, df, the_best):
-        name = list(self.classifier_model_names())
-        MODEL = self.initialize()
-        df['model_names'] = name
-        high = ['accuracy', 'balanced accuracy', 'f1 score', 'r2 score', 'ROC AUC', 'Test Acc', 'Test Precision',
+        high = ['Accuracy', 'Balanced Accuracy', 'Precision', 'Recall', 'f1', 'r2', 'Precision Macro', 'Recall Macro',
+                'f1 Macro',
+                'accuracy', 'balanced accuracy', 'f1 score', 'r2 score', 'ROC AUC', 'Test Acc', 'Test Precision',
                 'Test Recall', 'Test f1', 'Test r2', 'Test Precision Macro', 'Test Recall Macro',
                 'Test f1 Macro']
         low = ['mean absolute error', 'mean squared error', 'Test std']
 
         if the_best in high:
-            best_model_details = df[df[the_best] == df[the_best].max()]
+            ascending = False
 
         elif the_best in low:
-            best_model_details = df[df[the_best] == df[the_best].min()]
+            ascending = True
 
         else:
             raise Exception(f'metric {the_best} not found')
 
-        best_model_details = best_model_details.reset_index()
-        best_model_name = best_model_details.iloc[0]['model_names']
-        index_ = name.index(best_model_name)
-        return MODEL[index_]
+        # a stable sort, so ties keep the order of the leaderboard
+        return list(df[the_best].astype(float).sort_values(ascending=ascending, kind='mergesort',
+                                                             na_position='last').index)
 
-    def _startKFold_(self, param, param_X, param_y, param_cv, train_score):
-        names = self.classifier_model_names()
+    def _retention_rank(self, df, the_best, default: str) -> list:
+        """
+        It ranks a leaderboard for the keep policy, on the_best when it is a score column and on default otherwise
+        """
+        if the_best in df.columns:
+            try:
+                return self._rank(df, the_best)
+            except Exception:
+                pass
+        return self._rank(df, default)
+
+    def _fitted_or_new(self, name: str):
+        """
+        It returns the estimator the last fit trained for the model, or a new unfitted one if it kept none e.g. after
+        KFold, where no single estimator is trained on all the data
+        """
+        fitted = self.store.estimator(name)
+        if fitted is not None:
+            return fitted
+        return CLASSIFIERS[name].build(n_threads=self.cores, random_state=self.random_state)
 
+    def _kfold_scores(self, model, fold, train_score) -> dict:
+        """
+        It fits a single model on one fold and returns its scores, see fold_scores
+        """
         if self.target_class == 'binary':
-            dataframe = {}
-            for i in range(len(param)):
-
-                if self.verbose is True:
-                    print(param[i])
-
-                score = ('accuracy', 'balanced_accuracy', 'precision', 'recall', 'f1', 'r2')
-
-                if self.imbalanced is False:
-                    start = time.time()
-
-                    scores = cross_validate(estimator=param[i], X=param_X, y=param_y, scoring=score,
-                                            cv=param_cv, n_jobs=self.cores, return_train_score=train_score)
-
-                elif self.imbalanced is True:
-                    start = time.time()
-                    method = self._get_sample_index_method()
-                    pipeline = imbpipe(steps=[('sample', method), ('model', param[i])])
-                    scores = cross_validate(estimator=pipeline, X=param_X, y=param_y, scoring=score,
-                                            cv=param_cv, n_jobs=self.cores, return_train_score=train_score)
-                end = time.time()
-                seconds = end - start
-
-                mean_train_acc = scores['train_accuracy'].mean()
-                mean_test_acc = scores['test_accuracy'].mean()
-                mean_train_bacc = scores['train_balanced_accuracy'].mean()
-                mean_test_bacc = scores['test_balanced_accuracy'].mean()
-                mean_train_precision = scores['train_precision'].mean()
-                mean_test_precision = scores['test_precision'].mean()
-                mean_train_f1 = scores['train_f1'].mean()
-                mean_test_f1 = scores['test_f1'].mean()
-                mean_train_r2 = scores['train_r2'].mean()
-                mean_test_r2 = scores['test_r2'].mean()
-                mean_train_recall = scores['train_recall'].mean()
-                mean_test_recall = scores['test_recall'].mean()
-                train_stdev = scores['train_accuracy'].std()
-                test_stdev = scores['test_accuracy'].std()
-                overfitting = True if (mean_train_acc - mean_test_acc) > 0.1 else False
-                # scores = scores.tolist()
-                if train_score is True:
-                    scores_df = [overfitting, mean_train_acc, mean_test_acc, mean_train_bacc, mean_test_bacc,
-                                 mean_train_precision,
-                                 mean_test_precision, mean_train_f1, mean_test_f1, mean_train_r2, mean_test_r2,
-                                 mean_train_recall, mean_test_recall, train_stdev, test_stdev, seconds]
-                    dataframe.update({names[i]: scores_df})
-                    return dataframe
-
-                elif train_score is False:
-                    scores_df = [overfitting, mean_test_acc, mean_test_bacc, mean_test_precision, mean_test_f1,
-                                 mean_test_r2,
-                                 mean_test_recall, test_stdev, seconds]
-                    dataframe.update({names[i]: scores_df})
-                    return dataframe
+            score = ('accuracy', 'balanced_accuracy', 'precision', 'recall', 'f1', 'r2')
+            # the train scores are always computed because overfitting is judged from them
+            return fold_scores(model, fold, score, train_score=True)
 
         elif self.target_class == 'multiclass':
-            dataframe = {}
-            for j in range(len(param)):
-                start = time.time()
-                score = ('precision_macro', 'recall_macro', 'f1_macro')
-                scores = cross_validate(estimator=param[j], X=param_X, y=param_y, scoring=score,
-                                        cv=param_cv, n_jobs=-1, return_train_score=True)
-                end = time.time()
-                seconds = end - start
+            score = ('precision_macro', 'recall_macro', 'f1_macro')
+            return fold_scores(model, fold, score, train_score=train_score)
 
-                if train_score is True:
+    def _kfold_row(self, scores, train_score, seconds) -> list:
+        """
+        It turns the scores of the folds of a model into its row of mean scores for the leaderboard, the row is empty
+        but for the time when scores is None
+        """
+        if scores is None:
+            # every fold failed to fit, the model gets an empty row
+            return [None] * (len(self._kfold_columns(train_score)) - 1) + [seconds]
 
-                    mean_train_precision = scores['train_precision_macro'].mean()
-                    mean_test_precision = scores['test_precision_macro'].mean()
-                    mean_train_f1 = scores['train_f1_macro'].mean()
-                    mean_test_f1 = scores['test_f1_macro'].mean()
-                    mean_train_recall = scores['train_recall_macro'].mean()
-                    mean_test_recall = scores['test_recall_macro'].mean()
+        if self.target_class == 'binary':
+            mean_train_acc = scores['train_accuracy'].mean()
+            mean_test_acc = scores['test_accuracy'].mean()
+            mean_train_bacc = scores['train_balanced_accuracy'].mean()
+            mean_test_bacc = scores['test_balanced_accuracy'].mean()
+            mean_train_precision = scores['train_precision'].mean()
+            mean_test_precision = scores['test_precision'].mean()
+            mean_train_f1 = scores['train_f1'].mean()
+            mean_test_f1 = scores['test_f1'].mean()
+            mean_train_r2 = scores['train_r2'].mean()
+            mean_test_r2 = scores['test_r2'].mean()
+            mean_train_recall = scores['train_recall'].mean()
+            mean_test_recall = scores['test_recall'].mean()
+            train_stdev = scores['train_accuracy'].std()
+            test_stdev = scores['test_accuracy'].std()
+            overfitting = True if (mean_train_acc - mean_test_acc) > 0.1 else False
+
+            if train_score is True:
+                return [overfitting, mean_train_acc, mean_test_acc, mean_train_bacc, mean_test_bacc,
+                        mean_train_precision, mean_test_precision, mean_train_recall, mean_test_recall,
+                        mean_train_f1, mean_test_f1, mean_train_r2, mean_test_r2, train_stdev, test_stdev, seconds]
+
+            elif train_score is False:
+                return [overfitting, mean_test_acc, mean_test_bacc, mean_test_precision, mean_test_recall,
+                        mean_test_f1, mean_test_r2, test_stdev, seconds]
 
-                    scores_df = [mean_train_precision, mean_test_precision, mean_train_f1, mean_test_f1,
-                                 mean_train_recall, mean_test_recall, seconds]
+        elif self.target_class == 'multiclass':
+            mean_test_precision = scores['test_precision_macro'].mean()
+            mean_test_f1 = scores['test_f1_macro'].mean()
+            mean_test_recall = scores['test_recall_macro'].mean()
 
-                    dataframe.update({names[j]: scores_df})
+            if train_score is True:
+                mean_train_precision = scores['train_precision_macro'].mean()
+                mean_train_f1 = scores['train_f1_macro'].mean()
+                mean_train_recall = scores['train_recall_macro'].mean()
 
-                elif train_score is False:
+                return [mean_train_precision, mean_test_precision, mean_train_recall, mean_test_recall,
+                        mean_train_f1, mean_test_f1, seconds]
 
-                    mean_test_precision = scores['test_precision_macro'].mean()
-                    mean_test_f1 = scores['test_f1_macro'].mean()
-                    mean_test_recall = scores['test_recall_macro'].mean()
+            elif train_score is False:
+                return [mean_test_precision, mean_test_recall, mean_test_f1, seconds]
 
-                    scores_df = [mean_test_precision, mean_test_f1, mean_test_recall, seconds]
+    def _kfold_fold(self, model, train_score, fold) -> tuple:
+        """
+        It cross validates a single model on one fold and returns (the scores of the fold, the time taken), the scores
+        are None when the model could not be fitted
 
-                    dataframe.update({names[j]: scores_df})
+        :param fold: the data of the fold, see fold_data
+        """
+        if self.verbose is True:
+            print(model)
+
+        start = time.time()
+        try:
+            scores = self._kfold_scores(model, fold, train_score)
+        except Exception:
+            logger.error(f'{model} has an issue')
+            scores = None
+        return scores, time.time() - start
+
+    def _startKFold_(self, param, param_X, param_y, param_cv, train_score, max_time=None, deadline=None, names=None,
+                     cache=None, journal=None):
+        names = self.classifier_model_names() if names is None else names
+        results = {i: result for i, result, _ in self._kfold_stream(param, param_X, param_y, param_cv, train_score,
+                                                                    max_time, deadline, names, cache, journal)}
+
+        columns = self._kfold_columns(train_score)
+        status = max_time is not None or deadline is not None
+        dataframe = {}
+        for i in range(len(param)):
+            dataframe.update({names[i]: result_row(results.get(i), len(columns), status=status)})
+
+        return dataframe
+
+    def _kfold_stream(self, param, param_X, param_y, param_cv, train_score, max_time=None, deadline=None, names=None,
+                      cache=None, journal=None, slots=None, cancel=None, early_stopping=None, metric=None,
+                      dense_policy='float32', dense_limit_mb=None, dtype='float64', layout='C'):
+        """
+        It cross validates the models and yields (position, result, reused) for every model as soon as it is done,
+        reused being True for the results found in the checkpoint journal or the cache. With slots or cancel, see
+        fit_iter, every model runs in a worker process
+
+        :param early_stopping: the confidence level of the early elimination of the models that cannot catch up with
+        the leader on metric, see race_folds, or None to run every fold of every model
+        :param dense_policy: how the models that only take dense data get a sparse X, see dense_route
+        :param dense_limit_mb: the most memory in MB the dense data of a fold may take, see dense_route
+        :param dtype: the dtype X is converted to before it is sliced into folds, see prepare_data
+        :param layout: the layout X is converted to, see prepare_data
+        """
+        # every (model, fold) pair is a task of its own on one pool, the most expensive models go first so the cheap
+        # ones fill the cores at the end of the run, and with a time budget the cheap ones go first so as many models
+        # as possible are done by the deadline
+        costs = [CLASSIFIERS[name].cost for name in names]
+        order = cost_order(costs) if deadline is not None else cost_order(costs, expensive_first=True)
+
+        keys = {}
+        if cache is not None or journal is not None:
+            settings = () if early_stopping is None else ('early stopping', early_stopping, metric)
+            keys = model_keys('kf', fingerprint(param_X, param_y), param,
+                              self._cache_settings() + (param_cv, train_score, dense_policy, dtype, layout) + settings)
+        # the models found in the checkpoint journal or the cache are not run again
+        previous = previous_results(keys, journal, cache)
+        for i, result in previous.items():
+            yield i, result, True
+        models = [i for i in order if i not in previous]
+
+        if models:
+            # X and y are validated and converted once, before they are sliced into the folds of every model
+            n_workers = core_budget(self.cores, len(models) * param_cv)[0]
+            (param_X,), self.store.data_report = prepare_data([param_X], dtype, layout, n_workers)
+            param_y = prepare_target(param_y)
+            log_data_report(self.store.data_report)
+        # the stratified folds are computed and sliced out of the data once, every model is fitted on the same ones
+        data = fold_data(param_X, param_y, fold_indices(param_X, param_y, param_cv, stratify=True)) if models else []
+        # the models that only take dense data share the folds of a sparse X made dense, or are skipped, see
+        # dense_route
+        views = {'given': data}
+        route = {i: 'given' for i in models}
+        dense = [i for i in models if issparse(param_X) and CLASSIFIERS[names[i]].sparse is False]
+        if dense:
+            transformer, reason = dense_route(data[0][0], data[0][2], dense_policy, dense_limit_mb, self.random_state)
+            for i in dense:
+                if transformer is None:
+                    logger.warning(f'{names[i]} is skipped, {reason}')
+                    yield i, Skipped(reason), False
+                    del route[i]
+                else:
+                    route[i] = 'dense'
+            if transformer is not None:
+                views['dense'] = densify_folds(transformer, data)
+            models = [i for i in models if i in route]
+        if self.imbalanced is True and self.target_class == 'binary':
+            # the training data of every fold is resampled once, every model is fitted on it and scored on the fold as
+            # it was
+            views = {key: [fold + self._resample(fold[0], fold[1]) for fold in folds] for key, folds in views.items()}
+        # the folds are written once to shared memory and the worker processes attach read-only views of them instead
+        # of receiving a copy with every task
+        shared = SharedData()
+        try:
+            views = shared.share(views)
+            data = views['given']
+            if models:
+                logger.info(f'Shared {shared.nbytes / 2 ** 20:.1f} MB of folds with the worker processes')
+            outer, inner = core_budget(self.cores, len(models) * (1 if early_stopping is not None else len(data)))
+
+            def make_row(scores, seconds):
+                return self._kfold_row(scores, train_score, seconds)
+
+            if early_stopping is not None:
+                # the models run side by side one fold at a time and the ones that cannot catch up with the leader skip
+                # the folds left
+                tasks = [(i, (set_threads(param[i], inner), train_score)) for i in models]
+                outcome = race_folds(self._kfold_fold, tasks, {i: views[route[i]] for i in models}, make_row,
+                                     self._kfold_columns(train_score).index(metric), early_stopping, n_workers=outer,
+                                     n_threads=inner, timeout=max_time, deadline=deadline, slots=slots, cancel=cancel)
+            else:
+                # a worker that is free takes the next fold of any model, and the row of a model is built as soon as its
+                # last fold is done. A fold that goes over max_time, is still running at the deadline or belongs to a
+                # cancelled run is killed
+                tasks = [((i, k), (set_threads(param[i], inner), train_score, fold))
+                         for i in models for k, fold in enumerate(views[route[i]])]
+                outcome = gather_folds(run_tasks(self._kfold_fold, tasks, n_workers=outer, n_threads=inner,
+                                                 timeout=max_time, deadline=deadline, slots=slots, cancel=cancel),
+                                       len(data), make_row, deadline)
+            for i, result in recorded(outcome, keys, names, journal, cache):
+                yield i, result, False
+        finally:
+            # the files are deleted however the run ends, e.g. when its generator is closed early
+            shared.close()
+
+    def _split_model(self, model, X_tr, X_te, y_tr, y_te, steps=None, resampled=None):
+        """
+        It fits a single model on the training data and returns (the fitted model, its test predictions, its training
+        predictions, the time taken), all but the time are None if the model could not be fitted. The scores are
+        computed for all the models at once by _split_scores
+
+        :param steps: the fitted transformers that X_tr and X_te went through, e.g. the vectorizer of a text run or the
+        dense copy of a sparse X, see dense_route. The fitted model is then a pipeline of them and the model, that
+        takes the data as it was given to fit
+        :param resampled: the training data and labels the model is fitted on instead of X_tr and y_tr, resampled once
+        for all the models by _resample when imbalanced is True
+        """
+        if self.verbose is True:
+            print(model)
+        start = time.time()
+        pred, pred_train = None, None
 
-            return dataframe
+        X_fit, y_fit = (X_tr, y_tr) if resampled is None else resampled
+        try:
+            model.fit(X_fit, y_fit)
+        except Exception:
+            logger.error(f'{model} has an issue')
+            pass
+
+        end = time.time()
+
+        try:
+
+            pred = model.predict(X_te)
+
+            pred_train = model.predict(X_tr)
+        except Exception:
+            # a model that could not be fitted is not fitted, and a fitted one may still fail to predict e.g. a
+            # KNeighborsClassifier fitted on fewer rows than its neighbors
+            logger.error(f'{model} has an issue')
+            pred, pred_train = None, None
+
+        if pred is None or pred_train is None:
+            # the model could not be fitted, so it gets an empty row instead of the scores of the previous model
+            return None, None, None, round(end - start, 2)
+
+        # with a keep policy and a spill_dir the model is written to disk here, in the worker that fitted it
+        fitted = self.store.pack(make_pipeline(*steps, model) if steps else model)
+        return fitted, np.ravel(pred), np.ravel(pred_train), round(end - start, 2)
+
+    def _split_scores(self, results: dict, n_models: int, y_tr, y_te, show_train_score: bool) -> np.ndarray:
+        """
+        It scores the predictions of every model of a split run in one vectorized pass and returns the
+        (n_models, n_columns) metric matrix of the leaderboard without its time column, the models without predictions
+        get rows of NaN
+
+        :param results: the position of a model to the result of _split_model, or a TimedOut
+        :param n_models: the number of models of the run
+        :param y_tr: the training labels
+        :param y_te: the test labels
+        :param show_train_score: set to True to score the training predictions as well
+        """
+        columns = self._split_columns(show_train_score)[:-1]
+        scores = np.full((n_models, len(columns)), np.nan)
+        done = [i for i, result in results.items() if isinstance(result, tuple) and result[1] is not None]
+        if not done:
+            return scores
+
+        # every model is scored from its own confusion matrix, the matrices of all the models come from one bincount
+        average = self._average()
+        test = classification_score_matrix(y_te, np.stack([results[i][1] for i in done]), average=average)
+        train = classification_score_matrix(y_tr, np.stack([results[i][2] for i in done]), average=average)
+        return self._fill_scores(scores, columns, done, test, train)
+
+    def _average(self) -> str:
+        # the average of the precision, recall and f1 score columns
+        if self.target_class == 'binary':
+            return 'binary'
+        elif self.target_class == 'multiclass':
+            return 'micro' if self.imbalanced is True else 'macro'
+
+    @staticmethod
+    def _fill_scores(scores, columns, done, test, train) -> np.ndarray:
+        """
+        It fills the rows done of the metric matrix of a leaderboard from the test and training scores of the models,
+        see scores_from_confusion
+        """
+        keys = {'Accuracy': 'accuracy', 'Balanced Accuracy': 'balanced_accuracy', 'r2 score': 'r2',
+                'ROC AUC': 'roc_auc', 'f1 score': 'f1', 'Precision': 'precision', 'Recall': 'recall'}
+
+        for j, column in enumerate(columns):
+            if column == 'Overfitting':
+                scores[done, j] = (train['accuracy'] - test['accuracy']) > 0.1
+            elif column.endswith('(Train)'):
+                scores[done, j] = train[keys[column[:-len('(Train)')]]]
+            else:
+                scores[done, j] = test[keys[column]]
+        return scores
+
+    def _split_views(self, names, alive, X_tr, X_te, steps, dense_policy, dense_limit_mb) -> tuple:
+        """
+        It routes every model of alive to the data it is fitted on and returns (the views, the key of the view of every
+        model, the reason the models left out of it are skipped). A view is (training data, test data, the fitted
+        steps that made them, see _split_model). The models that take sparse data get a sparse X as it is, and the
+        ones that only take dense data share one dense copy or projection of it, chosen by dense_route before any
+        model is fitted
+        """
+        views = {'given': (X_tr, X_te, steps)}
+        route = {i: 'given' for i in alive}
+        dense = [i for i in alive if issparse(X_tr) and CLASSIFIERS[names[i]].sparse is False]
+        if not dense:
+            return views, route, None
+
+        transformer, reason = dense_route(X_tr, X_te, dense_policy, dense_limit_mb, self.random_state)
+        if transformer is None:
+            for i in dense:
+                del route[i]
+            return views, route, reason
+        fitted, X_tr_dense, X_te_dense = densify_split(transformer, X_tr, X_te)
+        views['dense'] = (X_tr_dense, X_te_dense, steps + [fitted])
+        route.update({i: 'dense' for i in dense})
+        return views, route, None
+
+    def _race(self, model, names, alive, raced, views, route, y_tr, y_te, resample, show_train_score, metric, factor,
+              workers, outer, inner, max_time=None, deadline=None, slots=None, cancel=None):
+        """
+        It races the models of alive on growing stratified samples of the training data and returns the positions of
+        the survivors, that are to be trained on all of it. Every round fits the models still in the race on its
+        sample, scores them on the test data and keeps the best 1 / factor of them on metric, see race_schedule. The
+        record of every eliminated model is yielded as soon as its round is over, and the scores, result and number
+        of training rows of the last round of every model are put in raced for the leaderboard
+
+        :param views: the data of the models and the key of the view of every model, see _split_views
+        :param resample: set to True to fit the models on the samples resampled by _resample
+        :param workers: set to True to fit the models of every round in worker processes, see run_tasks
+        """
+        columns = self._split_columns(show_train_score)
+        order = sample_order(y_tr, self.random_state, stratify=True)
+        for rows in race_schedule(len(alive), len(y_tr), factor):
+            if len(alive) < factor or (cancel is not None and cancel.is_set()):
+                break
+            logger.info(f'Racing {len(alive)} models on {rows} of {len(y_tr)} rows')
+            # every view of the data is sampled, and resampled, once for all the models of the round
+            samples = {}
+            for key in {route[i] for i in alive}:
+                X_sample, y_sample = race_sample(views[key][0], y_tr, order, rows)
+                samples[key] = (X_sample, self._resample(X_sample, y_sample) if resample is True else None)
+            tasks = [(i, (clone(model[i]), samples[route[i]][0], views[route[i]][1], y_sample, y_te,
+                          views[route[i]][2]), {'resampled': samples[route[i]][1]}) for i in alive]
+            if workers is True:
+                outcome = run_tasks(self._split_model, tasks, n_workers=outer, n_threads=inner, timeout=max_time,
+                                    deadline=deadline, slots=slots, cancel=cancel)
+            else:
+                outcome = ((i, self._split_model(*args, **kwargs)) for i, args, kwargs in tasks)
+
+            results = dict(outcome)
+            scores = self._split_scores(results, len(model), y_sample, y_te, show_train_score)
+            # the models that timed out or could not be fitted on the sample are out of the race
+            scored = [i for i in alive if isinstance(results.get(i), tuple) and results[i][1] is not None]
+            ranking = self._rank(pd.DataFrame(scores[scored], index=scored, columns=columns[:-1]), metric)
+            survivors = ranking[:-(-len(alive) // factor)]
+            for i in alive:
+                if i not in results:
+                    # never started before the deadline
+                    continue
+                # the models fitted on a sample are never kept, only their scores are
+                result = results[i]
+                if isinstance(result, tuple):
+                    self.store.discard(result[0])
+                    result = (None,) + result[1:]
+                raced[i] = (scores[i], result, rows)
+                if i not in survivors:
+                    record = self._split_record(names[i], result, y_sample, y_te, show_train_score)
+                    record['scores']['Rows Trained'] = rows
+                    if isinstance(result, tuple) and result[1] is not None:
+                        record['status'] = 'eliminated'
+                    yield record
+            alive = [i for i in alive if i in survivors]
+        return alive
 
     def fit(self,
             X: str = None,
@@ -452,17 +827,88 @@ class MultiClassifier:
             text: bool = False,
             vectorizer: str = None,
             ngrams: tuple = None,
-            sort: any = None
+            sort: any = None,
+            parallel: bool = False,
+            n_workers: int = None,
+            max_time_per_model: float = None,
+            time_budget: float = None,
+            include: list = None,
+            exclude: list = None,
+            requires: list = None,
+            cache_dir: str = None,
+            cache_models: bool = False,
+            checkpoint_dir: str = None,
+            racing: bool = False,
+            racing_factor: int = 3,
+            early_stopping: bool = False,
+            confidence: float = 0.95,
+            dense_policy: str = 'float32',
+            dense_limit_mb: float = 1024,
+            dtype: str = 'float64',
+            layout: str = 'C'
             ) -> DataFrame:
         """
         If splitting is False, then do nothing. If splitting is True, then assign the values of split_data to the
         variables X_train, X_test, y_train, and y_test
 
+        :param racing: set to True in split mode to race the models instead of training them all on all the data.
+        Every model is first trained on a small stratified sample of the training data, the worst of them on
+        return_best_model (Accuracy by default) are eliminated and the others trained again on a sample racing_factor
+        times larger, until fewer than racing_factor models are left and trained on all the data. The leaderboard gets
+        a 'Rows Trained' column, the eliminated models keep the scores of the last sample they were trained on and
+        only the models trained on all the data are kept for use_model
+        :param racing_factor: the share of the models eliminated in every round of a race, 3 keeps a third of them,
+        and the growth of the sample from one round to the next
+        :param early_stopping: set to True in KFold mode to stop cross validating the models that cannot catch up
+        with the leader. The models run one fold at a time, and from the third fold on a model is dropped when the
+        lower confidence bound of its gap to the leader on return_best_model (Accuracy or f1 Macro by default) is above
+        zero, the gap being measured fold by fold. Its row has the mean scores of the folds it ran, and the leaderboard
+        gets a 'Folds Run' column
+        :param confidence: the confidence level of the bound of early_stopping, higher drops fewer models
+        :param dense_policy: how the models that only take dense data, see requires, are fitted when X is a scipy
+        sparse matrix or the documents of a text run. The models that take sparse data always get it as it is, and the
+        others share a dense 'float32' copy of it, a dense float32 projection of it on 100 columns with 'svd', or are
+        skipped with 'skip'. The choice is made before any model is fitted
+        :param dense_limit_mb: the most memory in MB the dense copy or projection of dense_policy may take, the models
+        that only take dense data are skipped when it would take more. None for no limit
+        :param dtype: 'float64' or 'float32', the dtype X is converted to once before any model is fitted, so every
+        model is handed the same ready data instead of converting it on its own. float32 halves the memory of X but is
+        lossy, it rounds X to about 7 significant digits, so it is opt-in. float64 is used instead when X has values
+        float32 overflows on or integers it cannot hold exactly. A numeric dataframe becomes a bare array, so the
+        fitted models have no feature_names_in_. X that is not all numeric is left as it is
+        :param layout: 'C' or 'F', the row or column major layout X is converted to, CSR or CSC for a sparse X. The
+        memory of the data before and after and the peak memory saved are logged and kept in store.data_report
+        :param cache_dir: a directory for a persistent cache of the results in split or KFold mode. A model is keyed
+        by a fingerprint of the data, its parameters, the split or folds and the random_state, and a later run that
+        finds its key reuses its results instead of training it again, so adding a model to a run only trains that
+        model. The time column shows the time the model took when it was trained
+        :param cache_models: set to True to cache the fitted models of a split run as well, so that use_model hands
+        them out after a run served from the cache
+        :param checkpoint_dir: a directory for the checkpoint journal of a split or KFold run. The results of every
+        model are appended to it and fsync'd as soon as the model finishes, and a rerun with the same checkpoint_dir
+        skips the models it finds there, so a run that died carries on where it stopped
+        :param include: the names of the only models to train, defaults to every model in classifier_model_names()
+        :param exclude: the names of models to leave out of the run
+        :param requires: capabilities every model of the run must have, any of 'sparse', 'predict_proba',
+        'partial_fit' and 'warm_start'. Models that are left out are never imported or constructed
+        :param time_budget: the wall-clock limit in seconds for the whole run in split or KFold mode. The models are run
+        from the cheapest to the most expensive, and when the budget runs out the models still running are killed and
+        the leaderboard is returned with what finished so far. Models that were never started get a 'not attempted'
+        Status
+        :param max_time_per_model: the wall-clock limit in seconds for fitting a single model in split mode, or each of
+        its folds in KFold mode. A model that goes over it is killed in its worker process and shows up in the
+        leaderboard with empty scores, its elapsed time and a 'timed out' Status, the rest of the run carries on
+        :param n_workers: caps the number of worker processes used when parallel is True. The cores budget is split
+        between the workers and the threads each model may start, so workers * threads never goes above cores
+        :param parallel: defaults to False, set to True to fit and score the models in split mode in parallel worker
+        processes instead of one after the other
         :param sort:
-        :param ngrams:
+        :param ngrams: the ngram_range of the vectorizer, defaults to (1, 1)
         :param n_grams:
-        :param vectorizer:
-        :param text:
+        :param vectorizer: 'count' or 'tfidf', the vectorizer that turns the documents into a document-term matrix
+        when text is True. The matrix is built once and shared by every model, and the time it took is shown in a
+        'vectorization time(seconds)' column of the leaderboard
+        :param text: set to True when X holds documents
         :param show_train_score:
         :param return_fastest_model: defaults to False, set to True when you want the method to only return a dataframe
         of the fastest model
@@ -502,6 +948,95 @@ class MultiClassifier:
 
         fit(X = features, y = labels, kf = True, fold = (10, 42, True))
         """
+        records = self.fit_iter(X=X, y=y, split_self=split_self, X_train=X_train, X_test=X_test, y_train=y_train,
+                                y_test=y_test, split_data=split_data, splitting=splitting, kf=kf, fold=fold,
+                                return_best_model=return_best_model, show_train_score=show_train_score, text=text,
+                                vectorizer=vectorizer, ngrams=ngrams, parallel=parallel, n_workers=n_workers,
+                                max_time_per_model=max_time_per_model, time_budget=time_budget, include=include,
+                                exclude=exclude, requires=requires, cache_dir=cache_dir, cache_models=cache_models,
+                                checkpoint_dir=checkpoint_dir, racing=racing, racing_factor=racing_factor,
+                                early_stopping=early_stopping, confidence=confidence, dense_policy=dense_policy,
+                                dense_limit_mb=dense_limit_mb, dtype=dtype, layout=layout)
+        # fit consumes the stream of fit_iter until every model is done, fit_iter builds the leaderboard at the end
+        for _ in records:
+            pass
+        df = self.store.leaderboard
+        if df is None:
+            return None
+
+        if self.store.mode == 'split':
+            if return_best_model is not None:
+                logger.info(f'BEST MODEL BASED ON {return_best_model}')
+                display(df.sort_values(by=return_best_model, ascending=False))
+
+            elif return_best_model is None:
+                display(df.style.highlight_max(color="yellow"))
+
+            if return_fastest_model is True:
+                # df.drop(df[df['execution time(seconds)'] == 0.0].index, axis=0, inplace=True)
+                display(f"FASTEST MODEL")
+                display(df[df["execution time(seconds)"].max()])
+            write_to_excel(excel, df)
+            return df
+
+        kf_ = kf_best_model(df, return_best_model, excel)
+        return kf_
+
+    def fit_iter(self,
+                 X: any = None,
+                 y: any = None,
+                 split_self: bool = False,
+                 X_train: any = None,
+                 X_test: any = None,
+                 y_train: any = None,
+                 y_test: any = None,
+                 split_data: any = None,
+                 splitting: bool = False,
+                 kf: bool = False,
+                 fold: int = 5,
+                 return_best_model: str = None,
+                 show_train_score: bool = False,
+                 text: bool = False,
+                 vectorizer: str = None,
+                 ngrams: tuple = None,
+                 parallel: bool = True,
+                 n_workers: int = None,
+                 max_time_per_model: float = None,
+                 time_budget: float = None,
+                 include: list = None,
+                 exclude: list = None,
+                 requires: list = None,
+                 cache_dir: str = None,
+                 cache_models: bool = False,
+                 checkpoint_dir: str = None,
+                 racing: bool = False,
+                 racing_factor: int = 3,
+                 early_stopping: bool = False,
+                 confidence: float = 0.95,
+                 dense_policy: str = 'float32',
+                 dense_limit_mb: float = 1024,
+                 dtype: str = 'float64',
+                 layout: str = 'C',
+                 slots: WorkerSlots = None,
+                 cancel: threading.Event = None):
+        """
+        It runs the models like fit and yields a record for every model as soon as it is done, in the order the models
+        complete, so the caller can act on partial results e.g. update a dashboard or stop once a model is good
+        enough. The models run in parallel worker processes by default. The parameters are the ones of fit
+
+        Every record is a dictionary of the keys model, mode ('split' or 'kf'), scores (the leaderboard columns of the
+        model to its values), status ('completed', 'failed', 'timed out', 'eliminated' or 'skipped', see
+        result_status) and reused (True when the result came from the checkpoint journal or the cache). Once every
+        model is done the leaderboard is built as in fit and kept for use_model, visualize and show. Closing the
+        generator early, e.g. breaking out of the loop, kills the models that are still running and no leaderboard is
+        built
+
+        :param return_best_model: the metric the keep policy ranks the models on
+        :param slots: a WorkerSlots shared with other runs, so that they never have more worker processes together
+        than it has slots, see afit
+        :param cancel: a threading.Event, setting it e.g. from another thread kills the models still running and ends
+        the stream
+        """
         if text:
             if isinstance(text, bool) is False:
                 raise TypeError('parameter text is of type bool only. set to true or false')
@@ -513,6 +1048,9 @@ class MultiClassifier:
                 if ngrams is not None:
                     raise Exception('parameter ngrams can only be accepted when parameter text is True')
 
+            if vectorizer not in VECTORIZERS:
+                raise ValueError(f'vectorizer should be one of {list(VECTORIZERS)} when text is True, got {vectorizer}')
+
         if self.imbalanced is False:
             if self.sampling:
                 raise Exception('this parameter can only be used if "imbalanced" is set to True')
@@ -546,6 +1084,21 @@ class MultiClassifier:
                 raise ValueError("split_data cannot be used with kf, set splitting to True to use param "
                                  "split_data")
 
+        if racing is True and kf is True:
+            raise ValueError("racing is only available in split mode, set splitting to True or split_self to True")
+
+        if early_stopping is True and kf is False:
+            raise ValueError("early_stopping is only available in KFold mode, set kf to True")
+
+        if dense_policy not in DENSE_POLICIES:
+            raise ValueError(f"dense_policy should be one of {DENSE_POLICIES}, got {dense_policy}")
+
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype should be one of {DTYPES}, got {dtype}")
+
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout should be one of {LAYOUTS}, got {layout}")
+
         if kf is True and (X is None or y is None or (X is None and y is None)):
             raise ValueError("Set the values of features X and target y")
 
@@ -556,6 +1109,10 @@ class MultiClassifier:
                     f"target_class should be set to either binary or multiclass but target_class was set to "
                     f"{self.target_class}")
 
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        status = max_time_per_model is not None or time_budget is not None
+        self.store.clear()
+
         if splitting is True or split_self is True:
             if splitting and split_data:
                 X_tr, X_te, y_tr, y_te = split_data[0], split_data[1], split_data[2], split_data[3]
@@ -564,279 +1121,433 @@ class MultiClassifier:
                     and y_train is not None \
                     and y_test is not None:
                 X_tr, X_te, y_tr, y_te = X_train, X_test, y_train, y_test
-            model = self.initialize()
-            names = self.classifier_model_names()
-            dataframe = {}
-            for i in range(len(model)):
-                if self.verbose is True:
-                    print(model[i])
-                start = time.time()
-
-                if text is False:
-
-                    if self.imbalanced is False:
-                        try:
-                            model[i].fit(X_tr, y_tr)
-                        except ValueError:
-                            logger.error(f'{model[i]} has an issue')
-                            pass
-
-                    elif self.imbalanced is True:
-                        method = self._get_sample_index_method()
-
-                        if self.verbose is True:
-                            print(f'Before resampling: {Counter(y_tr)}')
-                        X_tr_, y_tr_ = method.fit_resample(X_tr, y_tr)
-                        if self.verbose is True:
-                            print(f'After resampling: {Counter(y_tr_)}')
-                            print("\n")
-                        try:
-                            model[i].fit(X_tr_, y_tr_)
-                        except ValueError:
-                            logger.error(f'{model[i]} has an issue')
-                            pass
-
-                    end = time.time()
-
-                    try:
-
-                        pred = model[i].predict(X_te)
-
-                        pred_train = model[i].predict(X_tr)
-                    except AttributeError:
-                        pass
-
-                elif text is True:
-                    if vectorizer == 'count':
-                        try:
-                            try:
-                                pipeline = make_pipeline(CountVectorizer(ngram_range=ngrams),
-                                                         model[i])
-
-                                pipeline.fit(X_tr, y_tr)
-                            except TypeError:
-                                # This is a fix for the error below when using gradient boosting classifier or
-                                # HistGradientBoostingClassifier TypeError: A sparse matrix was passed,
-                                # but dense data is required. Use X.toarray() to convert to a dense numpy array.
-                                pipeline = make_pipeline(CountVectorizer(ngram_range=ngrams),
-                                                         FunctionTransformer(lambda x: x.todense(),
-                                                                             accept_sparse=True),
-
-                                                         model[i])
-                                pipeline.fit(X_tr, y_tr)
-                        except Exception:
-                            logger.error(f'{model[i]} has an issue')
-                            pass
-
-                    elif vectorizer == 'tfidf':
-                        try:
-                            try:
-                                pipeline = make_pipeline(TfidfVectorizer(ngram_range=ngrams),
-                                                         model[i])
-
-                                pipeline.fit(X_tr, y_tr)
-                            except TypeError:
-                                # This is a fix for the error below when using gradient boosting classifier or
-                                # HistGradientBoostingClassifier TypeError: A sparse matrix was passed,
-                                # but dense data is required. Use X.toarray() to convert to a dense numpy array.
-                                pipeline = make_pipeline(TfidfVectorizer(ngram_range=ngrams),
-                                                         FunctionTransformer(lambda x: x.todense(),
-                                                                             accept_sparse=True),
-
-                                                         model[i])
-                                pipeline.fit(X_tr, y_tr)
-                        except Exception:
-                            logger.error(f'{model[i]} has an issue')
-                            pass
-
-                    end = time.time()
-                    try:
-                        pred = pipeline.predict(X_te)
-
-                        pred_train = pipeline.predict(X_tr)
-                    except AttributeError:
-                        pass
-
-                true = y_te
-                true_train = y_tr
-                acc = accuracy_score(true, pred)
-                bacc = balanced_accuracy_score(true, pred)
-                clr = classification_report(true, pred)
-                cfm = confusion_matrix(true, pred)
-                r2 = r2_score(true, pred)
-                try:
-                    roc = roc_auc_score(true, pred)
-                except ValueError:
-                    roc = None
-
-                if self.target_class == 'binary':
-                    f1 = f1_score(true, pred)
-                    pre = precision_score(true, pred)
-                    rec = recall_score(true, pred)
-
-                elif self.target_class == 'multiclass':
-                    if self.imbalanced is True:
-                        f1 = f1_score(true, pred, average='micro')
-                        pre = precision_score(true, pred, average='micro')
-                        rec = recall_score(true, pred, average='micro')
-                    elif self.imbalanced is False:
-                        f1 = f1_score(true, pred, average='macro')
-                        pre = precision_score(true, pred, average='macro')
-                        rec = recall_score(true, pred, average='macro')
-
-                tacc = accuracy_score(true_train, pred_train)
-                tbacc = balanced_accuracy_score(true_train, pred_train)
-                tclr = classification_report(true_train, pred_train)
-                tcfm = confusion_matrix(true_train, pred_train)
-                tr2 = r2_score(true_train, pred_train)
-                try:
-                    troc = roc_auc_score(true_train, pred_train)
-                except ValueError:
-
-                    troc = None
-
-                if self.target_class == 'binary':
-                    tf1 = f1_score(true_train, pred_train)
-                    tpre = precision_score(true_train, pred_train)
-                    trec = recall_score(true_train, pred_train)
-
-                elif self.target_class == 'multiclass':
-                    if self.imbalanced is True:
-                        tf1 = f1_score(true_train, pred_train, average='micro')
-                        tpre = precision_score(true_train, pred_train, average='micro')
-                        trec = recall_score(true_train, pred_train, average='micro')
-
-                    elif self.imbalanced is False:
-                        tf1 = f1_score(true_train, pred_train, average='macro')
-                        tpre = precision_score(true_train, pred_train, average='macro')
-                        trec = recall_score(true_train, pred_train, average='macro')
-
-                overfit = True if (tacc - acc) > 0.1 else False
-                time_taken = round(end - start, 2)
-
-                if show_train_score is False:
-                    eval_bin = [overfit, acc, bacc, r2, roc, f1, pre, rec, time_taken]
-                    eval_mul = [overfit, acc, bacc, r2, f1, pre, rec, time_taken]
-
-                elif show_train_score is True:
-                    eval_bin = [overfit, tacc, acc, tbacc, bacc, tr2, r2, troc, roc, tf1, f1, tpre,
-                                pre, trec, rec, time_taken]
-                    eval_mul = [overfit, tacc, acc, tbacc, bacc, tr2, r2, tf1, f1, tpre, pre, trec, rec,
-                                time_taken]
-
-                if self.target_class == 'binary':
-                    dataframe.update({names[i]: eval_bin})
-                elif self.target_class == 'multiclass':
-                    dataframe.update({names[i]: eval_mul})
-
-            if show_train_score is False:
-                if self.target_class == 'binary':
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.t_split_binary_columns_test)
-
-                elif self.target_class == 'multiclass':
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.t_split_multiclass_columns_test)
-
-            elif show_train_score is True:
-                if self.target_class == 'binary':
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.t_split_binary_columns_train)
-
-                elif self.target_class == 'multiclass':
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.t_split_multiclass_columns_train)
+            names = self.classifier_model_names(include, exclude, requires)
+            outer, inner = core_budget(self.cores, len(names), n_workers) if parallel is True else (1, None)
+            model = self.initialize(n_threads=inner, include=include, exclude=exclude, requires=requires)
+            # with a time budget the cheap models go first, so the leaderboard has as many models as possible when
+            # the deadline is reached
+            order = range(len(model)) if deadline is None else cost_order([CLASSIFIERS[name].cost for name in names])
+            self.store.clear('split')
+            # the data as it was given is the first window of the rolling training data and holdout of update, the
+            # rows of update are converted as the data of this fit is
+            self.store.training, self.store.holdout = (X_tr, y_tr), (X_te, y_te)
+            self.store.prepared_as = (dtype, layout)
+
+            keys = {}
+            cache = None if cache_dir is None else ResultCache(cache_dir, models=cache_models)
+            journal = None if checkpoint_dir is None else Journal(checkpoint_dir)
+            if cache is not None or journal is not None:
+                keys = model_keys('split', fingerprint(X_tr, X_te, y_tr, y_te), model,
+                                  self._cache_settings() + (text, vectorizer, ngrams, dense_policy, dtype, layout))
+            # the models already run on this data with the same parameters and settings are taken from the checkpoint
+            # journal or the cache, only the others are trained
+            results = {i: (self.store.pack(hit[0]),) + hit[1:]
+                       for i, hit in previous_results(keys, journal, cache).items()}
+            if keys:
+                logger.info(f'{len(results)} of {len(model)} models found in the checkpoint or the cache')
+            for i, result in list(results.items()):
+                self._keep_split_result(names[i], result, len(y_tr))
+                record = self._split_record(names[i], result, y_tr, y_te, show_train_score, reused=True)
+                if racing is True:
+                    record['scores']['Rows Trained'] = len(y_tr)
+                yield record
+
+            workers = parallel is True or status is True or slots is not None or cancel is not None
+            alive = [i for i in order if i not in results]
+            raced = {}
+            steps, vectorize_time = [], 0.0
+            if text is True and alive:
+                # the documents are tokenized and the vocabulary built once, every model is fitted on the same
+                # document-term matrices
+                fitted_vectorizer, X_tr, X_te, vectorize_time = vectorize(X_tr, X_te, vectorizer, ngrams)
+                steps = [fitted_vectorizer]
+                logger.info(f'Vectorized {X_tr.shape[0]} training documents into {X_tr.shape[1]} terms in '
+                            f'{vectorize_time:.2f}s')
+            if alive:
+                # X and y are validated and converted once, every model is handed the same buffers
+                (X_tr, X_te), self.store.data_report = prepare_data([X_tr, X_te], dtype, layout, outer)
+                y_tr, y_te = prepare_target(y_tr), prepare_target(y_te)
+                log_data_report(self.store.data_report)
+            # the models that take sparse data get a sparse X as it is, the others a dense view of it or nothing
+            views, route, reason = self._split_views(names, alive, X_tr, X_te, steps, dense_policy, dense_limit_mb)
+            for i in [i for i in alive if i not in route]:
+                logger.warning(f'{names[i]} is skipped, {reason}')
+                results[i] = Skipped(reason)
+                yield self._split_record(names[i], results[i], y_tr, y_te, show_train_score)
+            alive = [i for i in alive if i in route]
+            shared = None
+            try:
+                if workers is True and alive:
+                    # the data is written once to shared memory and the worker processes attach read-only views of it
+                    # instead of receiving a copy with every task, the run itself only keeps the shared copy
+                    shared = SharedData()
+                    views = shared.share(views)
+                    X_tr, X_te = views['given'][:2]
+                    logger.info(f'Shared {shared.nbytes / 2 ** 20:.1f} MB of data with the worker processes')
+                resample = self.imbalanced is True and text is False
+                if racing is True:
+                    # the models race on growing samples of the training data and only the few that survive every round
+                    # are trained on all of it
+                    metric = return_best_model if return_best_model in self._split_columns(False)[1:-1] else 'Accuracy'
+                    alive = yield from self._race(model, names, alive, raced, views, route, y_tr, y_te, resample,
+                                                  show_train_score, metric, racing_factor, workers, outer, inner,
+                                                  max_time_per_model, deadline, slots, cancel)
+                # the training data of every view is resampled once and every model is fitted on the same resampled data
+                resampled = {key: self._resample(views[key][0], y_tr) for key in {route[i] for i in alive}} \
+                    if resample is True else {}
+                if shared is not None:
+                    resampled = shared.share(resampled)
+                tasks = [(i, (model[i], views[route[i]][0], views[route[i]][1], y_tr, y_te, views[route[i]][2]),
+                          {'resampled': resampled.get(route[i])}) for i in alive]
+
+                if workers is True:
+                    # the models are independent of each other, so they are fitted in worker processes and their
+                    # predictions put back in their usual order once they have all finished. The core budget is split
+                    # between the workers so that every worker only starts its share of threads, and a worker that goes
+                    # over max_time_per_model or is still running at the deadline is killed without holding up the
+                    # others
+                    outcome = run_tasks(self._split_model, tasks, n_workers=outer, n_threads=inner,
+                                        timeout=max_time_per_model, deadline=deadline, slots=slots, cancel=cancel)
+                else:
+                    outcome = ((i, self._split_model(*args, **kwargs)) for i, args, kwargs in tasks)
+                # every model is journaled, cached and handed to the caller as soon as it finishes
+                for i, result in recorded(outcome, keys, names, journal, cache):
+                    results[i] = result
+                    self._keep_split_result(names[i], result, len(y_tr))
+                    record = self._split_record(names[i], result, y_tr, y_te, show_train_score)
+                    if racing is True:
+                        record['scores']['Rows Trained'] = len(y_tr)
+                    yield record
+
+                # the predictions of all the models are scored together and the leaderboard is built from the metric
+                # matrix
+                scores = self._split_scores(results, len(model), y_tr, y_te, show_train_score)
+                # the models that did not make it to the last round of a race keep the scores of the last round they ran
+                eliminated = [i for i in raced if i not in results]
+                for i in eliminated:
+                    scores[i] = raced[i][0]
+                shown = {**{i: raced[i][1] for i in eliminated}, **results}
+                skipped = any(isinstance(result, Skipped) for result in results.values())
+                df = split_leaderboard(names, scores, self._split_columns(show_train_score), shown,
+                                       status=status or skipped)
+                df['Overfitting'] = [None if np.isnan(value) else bool(value) for value in df['Overfitting']]
+                if racing is True:
+                    df['Rows Trained'] = [None if isinstance(results.get(i), Skipped) else len(y_tr) if i in results
+                                          else raced[i][2] if i in raced else None for i in range(len(names))]
+                    if status is True or skipped is True:
+                        eliminated_names = [names[i] for i in eliminated if result_status(raced[i][1]) == 'completed']
+                        df.loc[eliminated_names, 'Status'] = 'eliminated'
+                if text is True:
+                    # the vectorization is shared by every model, so it is shown next to the time each model took to fit
+                    df.insert(df.columns.get_loc('execution time(seconds)') + 1, 'vectorization time(seconds)',
+                              round(vectorize_time, 2))
+
+                # the keep policy decides which of the fitted models stay in memory from their rank on the leaderboard
+                self.store.retain(self._retention_rank(df, return_best_model, default='Accuracy'))
+                self.store.leaderboard = df
+            finally:
+                if shared is not None:
+                    shared.close()
 
-            if return_best_model is not None:
-                logger.info(f'BEST MODEL BASED ON {return_best_model}')
-                display(df.sort_values(by=return_best_model, ascending=False))
+        elif kf is True:
 
-            elif return_best_model is None:
-                display(df.style.highlight_max(color="yellow"))
+            # Fitting the models and predicting the values of the test set.
+            KFoldModel = self.initialize(include=include, exclude=exclude, requires=requires)
+            names = self.classifier_model_names(include, exclude, requires)
+
+            logger.info("Training started")
+            self.store.clear('kf')
+            columns = self._kfold_columns(show_train_score)
+            metric = None
+            if early_stopping is True:
+                # the models are compared on return_best_model when it is a test score, every one of them is higher
+                # for a better model
+                metrics = [column for column in self._kfold_columns(False)
+                           if column not in ('Overfitting', 'Time Taken(s)') and not column.startswith('Standard')]
+                metric = return_best_model if return_best_model in metrics else metrics[0]
+                columns = columns[:-1] + ['Folds Run'] + columns[-1:]
+            results = {}
+            for i, result, reused in self._kfold_stream(param=KFoldModel,
+                                                        param_X=X,
+                                                        param_y=y,
+                                                        param_cv=fold,
+                                                        train_score=show_train_score,
+                                                        max_time=max_time_per_model,
+                                                        deadline=deadline,
+                                                        names=names,
+                                                        cache=None if cache_dir is None else ResultCache(cache_dir),
+                                                        journal=None if checkpoint_dir is None else
+                                                        Journal(checkpoint_dir),
+                                                        slots=slots,
+                                                        cancel=cancel,
+                                                        early_stopping=confidence if early_stopping is True else None,
+                                                        metric=metric,
+                                                        dense_policy=dense_policy,
+                                                        dense_limit_mb=dense_limit_mb,
+                                                        dtype=dtype,
+                                                        layout=layout):
+                results[i] = result
+                yield leaderboard_record(names[i], 'kf', dict(zip(columns, result_row(result, len(columns)))), result,
+                                         reused)
+
+            status = status or any(isinstance(result, Skipped) for result in results.values())
+            dataframe = {names[i]: result_row(results.get(i), len(columns), status=status) for i in range(len(names))}
+            if status is True:
+                columns = columns + ['Status']
+            self.store.leaderboard = pd.DataFrame.from_dict(dataframe, orient='index', columns=columns)
+
+    async def afit_iter(self, pool=None, **kwargs):
+        """
+        It is the asynchronous fit_iter, an async iterator of the record of every model as soon as it is done. The run
+        is driven by a thread of pool and its models are fitted in worker processes that take the slots of pool, so
+        the event loop is never blocked and the concurrent runs of a service share a bounded number of workers.
+        Cancelling the task that iterates, or leaving the loop early, kills the models that are still running
 
-            if return_fastest_model is True:
-                # df.drop(df[df['execution time(seconds)'] == 0.0].index, axis=0, inplace=True)
-                display(f"FASTEST MODEL")
-                display(df[df["execution time(seconds)"].max()])
-            write_to_excel(excel, df)
-            return df
+        Concurrent runs should each use their own instance, the fitted models and leaderboard are kept per instance
 
-        elif kf is True:
+        :param pool: a LeaderboardPool from MultiTrain.methods.aio, defaults to one shared by the whole process
+        :param kwargs: the parameters of fit_iter
+        """
+        from MultiTrain.methods.aio import default_pool, iterate
 
-            # Fitting the models and predicting the values of the test set.
-            KFoldModel = self.initialize()
-            names = self.classifier_model_names()
+        pool = default_pool() if pool is None else pool
+        async for record in iterate(lambda cancel: self.fit_iter(**kwargs, slots=pool.slots, cancel=cancel), pool):
+            yield record
 
-            if self.target_class == 'binary':
-                logger.info("Training started")
-                dataframe = self._startKFold_(param=KFoldModel,
-                                              param_X=X,
-                                              param_y=y,
-                                              param_cv=fold,
-                                              train_score=show_train_score)
-
-                if show_train_score is True:
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.kf_binary_columns_train)
-
-                elif show_train_score is False:
-                    df = pd.DataFrame.from_dict(dataframe,
-                                                orient='index',
-                                                columns=self.kf_binary_columns_test)
-
-                kf_ = kf_best_model(df, return_best_model, excel)
-                return kf_
+    async def afit(self, pool=None, **kwargs) -> DataFrame:
+        """
+        It is the asynchronous fit, it runs the models like afit_iter and returns the leaderboard, nothing is
+        displayed or written to excel
 
-            elif self.target_class == 'multiclass':
-                logger.info("Training started")
-                dataframe = self._startKFold_(param=KFoldModel,
-                                              param_X=X,
-                                              param_y=y,
-                                              param_cv=fold,
-                                              train_score=show_train_score)
-
-                if show_train_score is True:
-                    df = pd.DataFrame.from_dict(dataframe, orient='index', columns=self.kf_multiclass_columns_train)
-                elif show_train_score is False:
-                    df = pd.DataFrame.from_dict(dataframe, orient='index', columns=self.kf_multiclass_columns_test)
-
-                kf_ = kf_best_model(df, return_best_model, excel)
-                return kf_
-
-    def use_model(self, df, model: str = None, best: str = None):
+        :param pool: a LeaderboardPool from MultiTrain.methods.aio, defaults to one shared by the whole process
+        :param kwargs: the parameters of fit_iter
+        """
+        async for _ in self.afit_iter(pool, **kwargs):
+            pass
+        return self.store.leaderboard
+
+    def fit_stream(self,
+                   data: any = None,
+                   target: str = None,
+                   holdout: any = None,
+                   test_size: float = 0.2,
+                   classes: list = None,
+                   chunk_size: int = CHUNK_SIZE,
+                   include: list = None,
+                   exclude: list = None,
+                   return_best_model: str = None,
+                   dtype: str = 'float64') -> DataFrame:
+        """
+        It trains the models that learn incrementally, see requires 'partial_fit', on data that does not fit in
+        memory. The stream is read once and every chunk is converted once and handed to the partial_fit of every model
+        in turn, then the models are scored on a held-out stream chunk by chunk, so only a chunk of the data is in
+        memory at any time. The leaderboard has the columns of a split run and a 'Rows Trained' column, Overfitting
+        compares the accuracy on the held-out stream with the one on every chunk right after it was trained on. The
+        fitted models are kept for use_model as after a split fit
+
+        :param data: the path of a CSV or Parquet file, or an iterable of (X, y) chunks or of dataframes holding the
+        target column
+        :param target: the name of the label column of a file or of the dataframes of data
+        :param holdout: the held-out stream the models are scored on, of the same kinds as data. Defaults to test_size
+        of the rows of every chunk of a file, left out of the training and read again for the scores. An iterable can
+        only be read once, so it needs a holdout
+        :param test_size: the share of the rows of a file held out when there is no holdout
+        :param classes: every label of the stream, which partial_fit needs before the first chunk. The target column of
+        a file is read once for them when they are not given
+        :param chunk_size: the number of rows read from a file at a time
+        :param include: the names of the only models to train, out of the ones that have partial_fit
+        :param exclude: the names of models to leave out of the run
+        :param return_best_model: the metric the keep policy ranks the models on
+        :param dtype: 'float64' or 'float32', the dtype every chunk is converted to, see fit
         """
+        if data is None:
+            raise ValueError('pass the stream to data, a CSV or Parquet path or an iterable of chunks')
+
+        path = isinstance(data, (str, os.PathLike))
+        if holdout is None and path is False:
+            raise ValueError('an iterable of chunks can only be read once, pass the held-out stream to holdout')
+
+        if classes is None and path is False:
+            raise ValueError('pass every label of the stream to classes, partial_fit needs them before the first chunk')
+
+        if not 0 < test_size < 1:
+            raise ValueError(f'test_size should be between 0 and 1, got {test_size}')
+
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype should be one of {DTYPES}, got {dtype}")
+
+        names = self.classifier_model_names(include, exclude, requires=['partial_fit'])
+        models = self.initialize(include=include, exclude=exclude, requires=['partial_fit'])
+        classes = scan_labels(data, target, chunk_size) if classes is None else np.unique(classes)
+        # the rows of a file that are held out are drawn again from the same seed when it is read for the scores
+        seed = randint(2 ** 31) if self.random_state is None else self.random_state
+        split = {} if holdout is not None else {'test_size': test_size, 'seed': seed}
+        self.store.clear('split')
+        self.store.prepared_as = (dtype, 'C')
+
+        logger.info(f'Streaming {len(models)} models')
+        train, test = ClassificationTally(len(models), classes), ClassificationTally(len(models), classes)
+        elapsed, failed, rows = train_stream(models, prepared_chunks(data, target, chunk_size, dtype, **split),
+                                             lambda model, X, y: model.partial_fit(X, y, classes=classes), train)
+        score_stream(models, prepared_chunks(data if holdout is None else holdout, target, chunk_size, dtype,
+                                             held_out=True, **split), test, failed)
+
+        columns = self._split_columns(False)
+        scores = np.full((len(models), len(columns) - 1), np.nan)
+        done = [i for i in range(len(models)) if i not in failed]
+        if done:
+            test_scores = {key: value[done] for key, value in test.scores(self._average()).items()}
+            train_scores = {key: value[done] for key, value in train.scores(self._average()).items()}
+            scores = self._fill_scores(scores, columns[:-1], done, test_scores, train_scores)
+        df = split_leaderboard(names, scores, columns, {i: (round(elapsed[i], 2),) for i in range(len(models))})
+        df['Overfitting'] = [None if np.isnan(value) else bool(value) for value in df['Overfitting']]
+        df['Rows Trained'] = [rows if i in done else None for i in range(len(models))]
+
+        for i in done:
+            self.store.add(names[i], models[i], rows=rows)
+        self.store.retain(self._retention_rank(df, return_best_model, default='Accuracy'))
+        self.store.leaderboard = df
+        return df
+
+    def _prepared_rows(self, rows):
+        """
+        It returns the (X, y) rows of update converted the way the last fit converted its data, see prepare_data, or
+        None when rows is None
+        """
+        if rows is None:
+            return None
+        (X,), _ = prepare_data([rows[0]], *self.store.prepared_as)
+        return X, prepare_target(rows[1])
 
+    def _rolled(self, window, X, y, size: int = None) -> tuple:
+        """
+        It returns a rolling window of update with the new rows appended, see roll. The window, which starts with the
+        data as it was given to the fit, and the rows are converted like the data of the fit before and after
+        """
+        return self._prepared_rows(roll(self._prepared_rows(window), *self._prepared_rows((X, y)), size))
+
+    def update(self,
+               X_new: any = None,
+               y_new: any = None,
+               holdout_size: float = 0.2,
+               window: int = None,
+               max_age: float = 86400,
+               return_best_model: str = None) -> DataFrame:
+        """
+        It advances the models kept by the last split fit, fit_stream or update with new labelled rows instead of
+        running fit again. holdout_size of the new rows join the rolling holdout and the others the rolling training
+        data, which keeps as many of the latest rows as the training data of the fit. The models with partial_fit are
+        trained on the new rows only, the ensembles with warm_start grow new estimators on them, and the other models
+        are trained again on the rolling training data, only when they were last trained more than max_age seconds
+        ago. Every model is then scored on the rolling holdout. The leaderboard has the columns of a split run, the
+        time each model took to update, an 'Update' column ('partial_fit', 'warm_start', 'refit' or 'kept') and a
+        'Rows Trained' column. The new rows are converted like the data of the fit, see prepare_data, and a model that
+        fails on them is kept as it was, with an empty row
+
+        :param X_new: the new rows, of the same kind as the data the models were fitted on
+        :param y_new: the labels of the new rows
+        :param holdout_size: the share of the new rows that join the rolling holdout
+        :param window: the number of the most recent held-out rows the models are scored on, defaults to the size of
+        the holdout so far
+        :param max_age: the age in seconds after which a model without an incremental path is trained again
+        :param return_best_model: the metric the keep policy ranks the models on
+        """
+        names = [spec.name for spec in CLASSIFIERS if spec.name in self.store.trained and spec.name in self.store]
+        if not names:
+            raise Exception('update advances the models kept by a split fit or fit_stream, call one of them first')
+
+        if not 0 < holdout_size < 1:
+            raise ValueError(f'holdout_size should be between 0 and 1, got {holdout_size}')
+
+        X_tr, X_te, y_tr, y_te = train_test_split(X_new, y_new, test_size=holdout_size, random_state=self.random_state)
+        X_tr, y_tr = self._prepared_rows((X_tr, y_tr))
+        self.store.holdout = self._rolled(self.store.holdout, X_te, y_te, window)
+        self.store.training = self._rolled(self.store.training, X_tr, y_tr)
+        (X_hold, y_hold), (X_fit, y_fit) = self.store.holdout, self.store.training
+
+        how, seconds, rows, predictions = [], [], [], {}
+        for i, name in enumerate(names):
+            stored, (trained_at, seen) = self.store.estimator(name), self.store.trained[name]
+            spec = CLASSIFIERS[name]
+            start, method = time.time(), None
+            try:
+                # the model is advanced on a copy, so the kept one is left as it was when anything fails
+                estimator = copy.deepcopy(stored) if spec.partial_fit or spec.warm_start else stored
+                method = advance(estimator, X_tr, y_tr, spec.partial_fit, spec.warm_start, seen)
+                if method is None:
+                    estimator = stored
+                    if time.time() - trained_at > max_age:
+                        estimator = clone(stored).fit(X_fit, y_fit)
+                        method = 'refit'
+                predictions[i] = (estimator.predict(X_hold), estimator.predict(X_tr))
+            except Exception:
+                # the model is kept as it was and gets an empty row
+                logger.error(f'{name} has an issue')
+                method = None
+            how.append(method or 'kept')
+            seconds.append(round(time.time() - start, 2))
+            rows.append(seen + len(y_tr) if method in ('partial_fit', 'warm_start') else
+                        n_rows(y_fit) if method == 'refit' else seen)
+            if method is not None:
+                self.store.add(name, self.store.pack(estimator), *predictions[i], rows=rows[-1])
+            elif i in predictions:
+                self.store.predictions[name] = predictions[i]
+
+        columns = self._split_columns(False)
+        scores = np.full((len(names), len(columns) - 1), np.nan)
+        done = list(predictions)
+        if done:
+            test = classification_score_matrix(y_hold, np.stack([predictions[i][0] for i in done]),
+                                               average=self._average())
+            train = classification_score_matrix(y_tr, np.stack([predictions[i][1] for i in done]),
+                                                average=self._average())
+            scores = self._fill_scores(scores, columns[:-1], done, test, train)
+        df = split_leaderboard(names, scores, columns, {i: (seconds[i],) for i in range(len(names))})
+        df['Overfitting'] = [None if np.isnan(value) else bool(value) for value in df['Overfitting']]
+        df['Update'] = how
+        df['Rows Trained'] = rows
+
+        self.store.retain(self._retention_rank(df, return_best_model, default='Accuracy'))
+        self.store.leaderboard = df
+        return df
+
+    def use_model(self, df, model: str = None, best: str = None, include: list = None, exclude: list = None,
+                  requires: list = None):
+        """
+        It returns a model by name or the best model of a leaderboard. After a split fit this is the estimator that
+        fit already trained, so it is ready to predict, loaded back from spill_dir if the keep policy spilled it.
+        Otherwise, e.g. after KFold or when the keep policy dropped it, it is a new unfitted instance
 
         :param df: the dataframe object
         :param model: name of the classifier algorithm
         :param best: the evaluation metric used to find the best model
+        :param include: when using best, the names of the only models that can be picked
+        :param exclude: when using best, the names of models that cannot be picked
+        :param requires: when using best, capabilities the picked model must have, any of 'sparse', 'predict_proba',
+        'partial_fit' and 'warm_start'
 
         :return:
         """
 
-        name = self.classifier_model_names()
-        MODEL = self.initialize()
-
         if model is not None and best is not None:
             raise Exception('You can only use one of the two arguments.')
 
         if model:
-            if model not in name:
-                raise Exception(f"name {model} is not found, "
-                                f"here is a list of the available models to work with: {name}")
-            elif model in name:
-                index_ = name.index(model)
-                return MODEL[index_]
+            # raises with the list of the available models when the name is misspelt
+            CLASSIFIERS[model]
+            return self._fitted_or_new(model)
 
         elif best:
-            instance = self._get_index(df, best)
+            instance = self._get_index(df, best, include, exclude, requires)
             return instance
 
+    def memory_report(self) -> pd.DataFrame:
+        """
+        It returns where every model the last fit kept is held, 'memory' or 'disk' when it was spilled to spill_dir,
+        and its size in MB, estimated from its arrays when in memory and the size of its file on disk
+        """
+        return self.store.memory_report()
+
     def tune_parameters(self,
                         model: str = None,
                         parameters: dict = None,
@@ -878,7 +1589,7 @@ class MultiClassifier:
         :param refit:
         :param random_state:
         :param n_iter:
-        :param model: This is the instance of the model to be used
+        :param model: This is the instance of the model to be used, or its name in classifier_model_names()
         :param factor: To be used with HalvingGridSearchCV, It is the ‘halving’ parameter, which determines the proportion of
         candidates that are selected for each subsequent iteration. For example, factor=3 means that only one third of the
         candidates are selected.
@@ -894,6 +1605,11 @@ class MultiClassifier:
         if isinstance(parameters, dict) is False:
             raise TypeError("The 'parameters' argument only accepts a dictionary of the parameters for the "
                             "model you want to train with.")
+
+        if isinstance(model, str):
+            # only the named model is imported and constructed
+            model = CLASSIFIERS[model].build(n_threads=self.cores, random_state=self.random_state)
+
         if tune:
             scorers = {
                 'precision_score': make_scorer(precision_score),
@@ -915,6 +1631,8 @@ class MultiClassifier:
                 return tuned_model
 
             elif tune == 'bayes':
+                from skopt import BayesSearchCV
+
                 tuned_model = BayesSearchCV(estimator=model, search_spaces=parameters, n_jobs=use_cpu,
                                             return_train_score=return_train_score, cv=cv, verbose=verbose,
                                             refit=refit, random_state=random_state, scoring=scorers,
@@ -940,8 +1658,32 @@ class MultiClassifier:
                                                     aggressive_elimination=aggressive_elimination)
                 return tuned_model
 
+    async def atune_parameters(self, X, y, pool=None, **kwargs):
+        """
+        It is the asynchronous tune_parameters, the search it returns is fitted on X and y in a worker process that
+        takes a slot of pool, and the fitted search is returned. Cancelling the task kills the worker
+
+        :param X: features
+        :param y: labels
+        :param pool: a LeaderboardPool from MultiTrain.methods.aio, defaults to one shared by the whole process
+        :param kwargs: the parameters of tune_parameters
+        """
+        from MultiTrain.methods.aio import default_pool, fit_estimator, iterate
+
+        search = self.tune_parameters(**kwargs)
+        if search is None:
+            raise ValueError("tune should be one of 'grid', 'random', 'bayes', 'half-grid' or 'half-random'")
+
+        pool = default_pool() if pool is None else pool
+        results = [result async for _, result in iterate(
+            lambda cancel: run_tasks(fit_estimator, [(0, (search, X, y))], n_workers=1, slots=pool.slots,
+                                     cancel=cancel), pool)]
+        if results and results[0] is None:
+            raise Exception('the search could not be fitted, its error is in the log')
+        return results[0]
+
     def visualize(self,
-                  param: {__setitem__},
+                  param: {__setitem__} = None,
                   file_path: any = None,
                   kf: bool = False,
                   t_split: bool = False,
@@ -955,7 +1697,7 @@ class MultiClassifier:
 
         :param target:
         :param file_path:
-        :param param: {__setitem__}
+        :param param: the leaderboard returned by fit, defaults to the leaderboard of the last fit
         :type param: {__setitem__}
         :param kf: set to True if you used KFold, defaults to False
         :type kf: bool (optional)
@@ -967,10 +1709,13 @@ class MultiClassifier:
         :param save_name: The name of the file you want to save the visualization as, defaults to dir1 (optional)
         """
 
-        names = self.classifier_model_names()
+        import seaborn as sns
+        from matplotlib import pyplot as plt
+
         sns.set()
 
-        param['model_names'] = names
+        param, kf, t_split = self.store.plot_data(param, kf, t_split)
+        param['model_names'] = list(param.index)
         FILE_FORMATS = ['pdf', 'png']
         if save not in FILE_FORMATS:
             raise Exception("set save to either 'pdf' or 'png' ")
@@ -1122,7 +1867,7 @@ class MultiClassifier:
                     img(FILENAME=name, FILE_PATH=file_path, type_='picture')
 
     def show(self,
-             param: {__setitem__},
+             param: {__setitem__} = None,
              file_path: any = None,
              kf: bool = False,
              t_split: bool = False,
@@ -1135,7 +1880,7 @@ class MultiClassifier:
                 :param save:
                 :param target:
                 :param file_path:
-                :param param: {__setitem__}
+                :param param: the leaderboard returned by fit, defaults to the leaderboard of the last fit
                 :type param: {__setitem__}
                 :param kf: set to True if you used KFold, defaults to False
                 :type kf: bool (optional)
@@ -1144,10 +1889,10 @@ class MultiClassifier:
                 :param size: This is the size of the plot
                 :param save_name: The name of the file you want to save the visualization as.
                 """
+        import plotly.express as px
 
-        names = self.classifier_model_names()
-
-        param['model_names'] = names
+        param, kf, t_split = self.store.plot_data(param, kf, t_split)
+        param['model_names'] = list(param.index)
 
         if kf is True:
             if t_split is True:
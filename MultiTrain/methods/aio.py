@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from MultiTrain.methods.parallel import WorkerSlots
+
+# the value next() returns once the run of a generator is over
+_DONE = object()
+
+
+class LeaderboardPool:
+    """
+    It is the bounded pool shared by the leaderboards run from async code with afit, afit_iter and atune_parameters.
+    The models of every run are fitted in worker processes that each take a slot of the pool, so the runs together
+    never have more than n_workers of them, and every run is driven by a thread of the executor of the pool so the
+    event loop is never blocked
+
+    :param n_workers: the number of model worker processes shared by all the runs, None or -1 uses all the cores
+    :param max_runs: the number of runs driven at the same time, the others wait for a thread of the executor
+    """
+
+    def __init__(self, n_workers: int = None, max_runs: int = 8):
+        self.slots = WorkerSlots(n_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_runs, thread_name_prefix='MultiTrain')
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> LeaderboardPool:
+    """
+    It returns the pool the async methods use when they are not given one, it is created the first time it is needed
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = LeaderboardPool()
+        return _default_pool
+
+
+def fit_estimator(estimator, X, y):
+    # runs in a worker process, the fitted estimator is sent back
+    return estimator.fit(X, y)
+
+
+async def iterate(start, pool: LeaderboardPool):
+    """
+    It drives the generator of a run in a thread of the pool and yields its items to the event loop as they come.
+    Cancelling the task that iterates, or closing the iterator early, sets the cancel event of the run, which kills its
+    worker processes, and then closes its generator
+
+    :param start: a callable that takes a threading.Event, the cancel event, and returns the generator of the run
+    :param pool: the LeaderboardPool that drives the run
+    """
+    cancel = threading.Event()
+    iterator = start(cancel)
+    step = None
+    try:
+        while True:
+            step = pool.executor.submit(next, iterator, _DONE)
+            item = await asyncio.wrap_future(step)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        cancel.set()
+        if step is not None and not step.done():
+            # the run sees the cancel event within a poll interval, its generator can only be closed once the step it
+            # is in has returned
+            try:
+                await asyncio.wrap_future(step)
+            except BaseException:
+                pass
+        iterator.close()
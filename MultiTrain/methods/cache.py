@@ -0,0 +1,192 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from MultiTrain.methods.parallel import TimedOut
+from MultiTrain.methods.store import Spilled
+
+# bumped whenever the layout of a cached result changes, so old entries are missed instead of misread
+CACHE_VERSION = 1
+
+# the parameters that only set how many threads an estimator uses, they do not change what it learns
+THREAD_PARAMS = ('n_jobs', 'thread_count', 'nthread')
+
+
+def _feed(digest, obj) -> None:
+    """
+    It feeds the content of obj into a blake2b digest. Arrays, series, dataframes and sparse matrices are hashed from
+    their buffers along with their dtype and shape, text and other object arrays from pandas' vectorized hash of their
+    values
+    """
+    if isinstance(obj, pd.DataFrame):
+        digest.update(b'DataFrame')
+        _feed(digest, list(map(str, obj.columns)))
+        _feed(digest, obj.index.to_numpy())
+        for column in range(obj.shape[1]):
+            _feed(digest, obj.iloc[:, column].to_numpy())
+    elif isinstance(obj, pd.Series):
+        digest.update(b'Series')
+        _feed(digest, str(obj.name))
+        _feed(digest, obj.index.to_numpy())
+        _feed(digest, obj.to_numpy())
+    elif isinstance(obj, np.ndarray):
+        digest.update(f'ndarray{obj.dtype.str}{obj.shape}'.encode())
+        if obj.dtype.kind == 'O':
+            try:
+                digest.update(pd.util.hash_array(obj.ravel()).data)
+            except TypeError:
+                # values pandas cannot hash, e.g. lists
+                digest.update(repr(obj.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(obj).data)
+    elif hasattr(obj, 'tocsr') and hasattr(obj, 'nnz'):
+        matrix = obj.tocsr()
+        digest.update(f'sparse{matrix.shape}'.encode())
+        for array in (matrix.data, matrix.indices, matrix.indptr):
+            _feed(digest, array)
+    elif isinstance(obj, (list, tuple)):
+        _feed(digest, np.asarray(obj, dtype=object))
+    else:
+        digest.update(repr(obj).encode())
+
+
+def fingerprint(*objects) -> str:
+    """
+    It returns a hex digest of the content of the objects, e.g. the training and test data of a run. The data is
+    hashed from its NumPy buffers, nothing is pickled
+
+    :param objects: arrays, series, dataframes, sparse matrices, lists or anything with a stable repr
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for obj in objects:
+        _feed(digest, obj)
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def estimator_fingerprint(model) -> str:
+    """
+    It returns the class of an estimator with its get_params(), two estimators with the same fingerprint train the
+    same model on the same data. The number of threads is left out
+    """
+    params = model.get_params(deep=False) if hasattr(model, 'get_params') else {}
+    params = {name: value for name, value in params.items() if name not in THREAD_PARAMS}
+    return f'{type(model).__module__}.{type(model).__qualname__}{sorted(params.items(), key=lambda item: item[0])!r}'
+
+
+def model_keys(mode: str, data: str, models, settings: tuple = ()) -> dict:
+    """
+    It returns the key of every model of a run by its position, the cache and the checkpoint journal find the results
+    of a model by it
+
+    :param mode: 'split' or 'kf'
+    :param data: the fingerprint of the data of the run
+    :param models: the estimators of the run
+    :param settings: everything else that changes the results, e.g. the folds or the resampling
+    """
+    return {i: fingerprint(CACHE_VERSION, mode, data, estimator_fingerprint(model), *settings)
+            for i, model in enumerate(models)}
+
+
+class ResultCache:
+    """
+    It is a persistent cache of the result of every model of a leaderboard run, keyed by the content of the data,
+    the estimator and everything else that changes the result. Every entry is a joblib file written atomically, so
+    the cache can be shared by runs of several processes
+
+    :param directory: where the entries are kept, it is created when missing
+    :param models: set to True to also keep the fitted model of a split run, so that use_model hands it out after a
+    run that was served from the cache
+    """
+
+    def __init__(self, directory: str, models: bool = False):
+        self.directory = directory
+        self.models = models
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, kind: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.{kind}.joblib')
+
+    def _write(self, path: str, value=None, source: str = None) -> None:
+        import joblib
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            if source is not None:
+                shutil.copyfile(source, temporary)
+            else:
+                joblib.dump(value, temporary)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def get(self, key: str):
+        """
+        It returns the cached result of a key, with the fitted model in first place when it was cached and models is
+        True, or None on a miss
+        """
+        import joblib
+
+        path = self._path(key, 'result')
+        if not os.path.exists(path):
+            return None
+        try:
+            result = joblib.load(path)
+        except Exception:
+            # an entry that cannot be read any more, e.g. written by another version of a backend, is a miss
+            return None
+
+        model_path = self._path(key, 'model')
+        if self.models is True and isinstance(result, tuple) and os.path.exists(model_path):
+            try:
+                result = (joblib.load(model_path),) + result[1:]
+            except Exception:
+                pass
+        return result
+
+    def put(self, key: str, result) -> None:
+        """
+        It caches the result of a model. For a split result the fitted model in first place is written to a file of
+        its own when models is True and left out otherwise, results of models that were stopped are not cached
+
+        :param key: see key
+        :param result: a split result tuple or a KFold row
+        """
+        if result is None or isinstance(result, TimedOut):
+            return
+        if isinstance(result, tuple):
+            model, result = result[0], (None,) + result[1:]
+            if self.models is True and model is not None:
+                try:
+                    if isinstance(model, Spilled):
+                        self._write(self._path(key, 'model'), source=model.path)
+                    else:
+                        self._write(self._path(key, 'model'), model)
+                except Exception:
+                    # e.g. a text pipeline holding a lambda, only its scores are cached
+                    pass
+        self._write(self._path(key, 'result'), result)
+
+    def lookup(self, keys: dict) -> dict:
+        """
+        It returns the cached results of the keys that hit, by the same index as keys
+        """
+        hits = {}
+        for index, key in keys.items():
+            result = self.get(key)
+            if result is not None:
+                hits[index] = result
+        return hits
+
+    def clear(self) -> None:
+        """
+        It deletes every entry of the cache
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
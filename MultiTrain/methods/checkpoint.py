@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+
+from MultiTrain.methods.parallel import TimedOut
+
+
+def _plain(value):
+    # numpy scalars, e.g. the mean scores of a KFold row, are written as the Python values they hold
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class Journal:
+    """
+    It is the checkpoint of a leaderboard run: the result of every model is appended to a JSON lines journal as soon
+    as the model finishes, and flushed and fsync'd before the run goes on, so a run that dies keeps everything that
+    finished before it. A later run with the same checkpoint_dir skips the models found in the journal
+
+    Models are found by the same keys as in the result cache, so a model is only skipped when its data, parameters
+    and settings are the same. The predictions of a split run are written to .npy files next to the journal before
+    the record that points to them
+
+    :param directory: the checkpoint directory, it is created when missing
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, 'journal.jsonl')
+        os.makedirs(os.path.join(directory, 'predictions'), exist_ok=True)
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb+') as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    # the last record was cut short by a crash, it is ended so that the next one starts on a line of
+                    # its own
+                    file.write(b'\n')
+
+    def _save(self, name: str, array) -> str:
+        path = os.path.join(self.directory, 'predictions', f'{name}.npy')
+        with open(path, 'wb') as file:
+            np.save(file, np.asarray(array), allow_pickle=True)
+            file.flush()
+            os.fsync(file.fileno())
+        return os.path.relpath(path, self.directory)
+
+    def _load(self, path: str):
+        return np.load(os.path.join(self.directory, path), allow_pickle=True)
+
+    def record(self, key: str, name: str, result) -> None:
+        """
+        It appends the result of a model to the journal, the results of models that were stopped are not recorded
+
+        :param key: the key of the model, see model_keys
+        :param name: the name of the model, only there for whoever reads the journal
+        :param result: a split result tuple or a KFold row
+        """
+        if result is None or isinstance(result, TimedOut):
+            return
+
+        entry = {'key': key, 'model': name}
+        if isinstance(result, tuple):
+            # the fitted model is not journaled, only what the leaderboard is built from
+            entry['time'] = result[-1]
+            entry['predictions'] = [None if array is None else self._save(f'{key}.{i}', array)
+                                    for i, array in enumerate(result[1:-1])]
+        else:
+            entry['row'] = [_plain(value) for value in result]
+
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def completed(self) -> dict:
+        """
+        It returns the results found in the journal by key, in the form the run produced them without the fitted
+        model. A record cut short by a crash is ignored
+        """
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    if 'row' in entry:
+                        results[entry['key']] = entry['row']
+                    else:
+                        arrays = [None if path is None else self._load(path) for path in entry['predictions']]
+                        results[entry['key']] = (None, *arrays, entry['time'])
+                except (ValueError, KeyError, OSError):
+                    continue
+        return results
+
+    def lookup(self, keys: dict) -> dict:
+        """
+        It returns the journaled results of the keys found in the journal, by the same index as keys
+        """
+        completed = self.completed()
+        return {index: completed[key] for index, key in keys.items() if key in completed}
+
+
+def previous_results(keys: dict, journal: Journal = None, cache=None) -> dict:
+    """
+    It returns the results of a run that are already known by the index of their model, from the checkpoint journal
+    first and the result cache for the rest
+
+    :param keys: the key of every model by its index, see model_keys
+    :param journal: the Journal of the run or None
+    :param cache: the ResultCache of the run or None
+    """
+    results = {} if journal is None else journal.lookup(keys)
+    if cache is not None:
+        results.update(cache.lookup({index: key for index, key in keys.items() if index not in results}))
+    return results
+
+
+def recorded(results, keys: dict, names: list, journal: Journal = None, cache=None):
+    """
+    It writes every (index, result) pair of results to the journal and the cache as it goes through, so a model is
+    checkpointed as soon as it finishes rather than at the end of the run
+
+    :param results: an iterable of (index, result) pairs, e.g. the results of run_tasks
+    :param keys: the key of every model by its index, empty when there is neither a journal nor a cache
+    :param names: the name of every model by its index
+    """
+    for index, result in results:
+        # a task whose worker failed is not recorded so that the model is tried again by the next run
+        if index in keys and result is not None:
+            if journal is not None:
+                journal.record(keys[index], names[index], result)
+            if cache is not None:
+                cache.put(keys[index], result)
+        yield index, result
@@ -0,0 +1,145 @@
+import time
+import warnings
+
+import numpy as np
+from sklearn import metrics
+from sklearn.model_selection import check_cv
+from sklearn.utils import _safe_indexing
+
+from MultiTrain.methods.parallel import TimedOut
+
+
+def _root_mean_squared_error(y_true, y_pred):
+    return np.sqrt(metrics.mean_squared_error(y_true, y_pred))
+
+
+# the scorers of the KFold leaderboards by their scikit-learn names, as (metric, its arguments, sign). All of them
+# work from the predictions, so a model predicts every fold once for all of them
+FOLD_SCORERS = {
+    'accuracy': (metrics.accuracy_score, {}, 1),
+    'balanced_accuracy': (metrics.balanced_accuracy_score, {}, 1),
+    'precision': (metrics.precision_score, {}, 1),
+    'recall': (metrics.recall_score, {}, 1),
+    'f1': (metrics.f1_score, {}, 1),
+    'r2': (metrics.r2_score, {}, 1),
+    'precision_macro': (metrics.precision_score, {'average': 'macro'}, 1),
+    'recall_macro': (metrics.recall_score, {'average': 'macro'}, 1),
+    'f1_macro': (metrics.f1_score, {'average': 'macro'}, 1),
+    'neg_mean_absolute_error': (metrics.mean_absolute_error, {}, -1),
+    'neg_root_mean_squared_error': (_root_mean_squared_error, {}, -1),
+    'neg_mean_squared_error': (metrics.mean_squared_error, {}, -1),
+    'neg_median_absolute_error': (metrics.median_absolute_error, {}, -1),
+    'neg_mean_squared_log_error': (metrics.mean_squared_log_error, {}, -1),
+    'neg_mean_absolute_percentage_error': (metrics.mean_absolute_percentage_error, {}, -1),
+}
+
+
+def fold_indices(X, y, n_folds: int, stratify: bool = False) -> list:
+    """
+    It computes the (train index, test index) of every fold once for a KFold run, the folds cross_validate would use
+    for an integer cv, so every model of the run is compared on the same folds. The indices are int32 unless the data
+    is too large for them
+
+    :param n_folds: the number of folds
+    :param stratify: set to True for a classifier, the folds are then stratified on y
+    """
+    dtype = np.int32 if len(y) < np.iinfo(np.int32).max else np.int64
+    return [(train.astype(dtype), test.astype(dtype))
+            for train, test in check_cv(n_folds, y, classifier=stratify).split(X, y)]
+
+
+def fold_data(X, y, indices: list) -> list:
+    """
+    It materializes (training data, training labels, test data, test labels) for every fold once, every model of the
+    run is fitted and scored on them instead of slicing the data again
+
+    :param indices: the (train index, test index) of every fold, see fold_indices
+    """
+    return [(_safe_indexing(X, train), _safe_indexing(y, train), _safe_indexing(X, test), _safe_indexing(y, test))
+            for train, test in indices]
+
+
+def _score(name: str, y_true, y_pred) -> float:
+    metric, kwargs, sign = FOLD_SCORERS[name]
+    try:
+        return sign * metric(y_true, y_pred, **kwargs)
+    except Exception as error:
+        # like cross_validate, a score that cannot be computed, e.g. the log error of negative values, is NaN
+        warnings.warn(f'Scoring {name} failed, the score of this fold is set to nan: {error}')
+        return np.nan
+
+
+def fold_scores(model, fold: tuple, scoring: tuple, train_score: bool = False) -> dict:
+    """
+    It fits a model on the training data of a fold and returns its scores in the form cross_validate returns them for
+    one fold, arrays of one value under test_<name> and train_<name>. It raises whatever the fit raises
+
+    :param fold: (training data, training labels, test data, test labels), see fold_data, optionally followed by
+    (resampled training data, resampled training labels) that the model is fitted on instead, the training data being
+    scored as it was
+    :param scoring: the names of the scorers, see FOLD_SCORERS
+    :param train_score: set to True to score the training data as well
+    """
+    X_train, y_train, X_test, y_test = fold[:4]
+    model.fit(*(fold[4:] or (X_train, y_train)))
+
+    sets = [('test', X_test, y_test)] + ([('train', X_train, y_train)] if train_score is True else [])
+    scores = {}
+    for kind, X, y in sets:
+        pred = model.predict(X)
+        for name in scoring:
+            scores[f'{kind}_{name}'] = np.array([_score(name, y, pred)])
+    return scores
+
+
+def merge_folds(folds: list) -> dict:
+    """
+    It joins the scores of folds that were scored one at a time, see fold_scores, into the scores cross_validate
+    returns for all of them
+    """
+    return {key: np.concatenate([fold[key] for fold in folds]) for key in folds[0]}
+
+
+def gather_folds(outcome, n_folds: int, make_row, deadline: float = None):
+    """
+    It turns the results of the (position, fold) tasks of a KFold run into (position, row) for every model as soon as
+    the last of its folds is done, so the tasks of all the models can share one pool instead of every model waiting
+    for its slowest fold before the next one starts. A model that has a fold go over its time gets a TimedOut with the
+    time of all its folds, and so does a model whose folds were not all run before the deadline. A model that fails on
+    a fold gets an empty row at once, as a failed fold of cross_validate leaves its means empty, see race_folds
+
+    :param outcome: the (position, fold) keys and results of the tasks in the order they complete, see run_tasks. A
+    result is (the scores of the fold, see fold_scores, the time taken), the scores being None when the model could
+    not be fitted, or None when its worker failed
+    :param n_folds: the number of folds of every model
+    :param make_row: a function of (the merged scores of the folds, seconds) that returns the leaderboard row of a
+    model, an empty row when the scores are None
+    :param deadline: the time.monotonic() value the run stops at, or None
+    """
+    folds, seconds, stopped = {}, {}, set()
+    for (i, fold), result in outcome:
+        if i in stopped:
+            continue
+        if isinstance(result, TimedOut):
+            stopped.add(i)
+            folds.pop(i, None)
+            yield i, TimedOut(seconds.get(i, 0.0) + result.elapsed)
+            continue
+
+        scores, took = (None, 0.0) if result is None else result
+        seconds[i] = seconds.get(i, 0.0) + took
+        if scores is None:
+            # the folds of the model that are still running are not waited for
+            stopped.add(i)
+            folds.pop(i, None)
+            yield i, make_row(None, seconds[i])
+            continue
+
+        folds.setdefault(i, {})[fold] = scores
+        if len(folds[i]) == n_folds:
+            yield i, make_row(merge_folds([folds[i][k] for k in range(n_folds)]), seconds[i])
+            del folds[i]
+
+    if deadline is not None and time.monotonic() >= deadline:
+        for i in folds:
+            yield i, TimedOut(seconds[i])
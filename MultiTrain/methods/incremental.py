@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+from sklearn.utils import _safe_indexing
+
+
+def n_rows(X) -> int:
+    return X.shape[0] if hasattr(X, 'shape') else len(X)
+
+
+def append_rows(X, X_new):
+    """
+    It returns the rows of X followed by the ones of X_new, both of the same kind: arrays, dataframes, series, sparse
+    matrices or lists of texts
+    """
+    if X is None:
+        return X_new
+    if sparse.issparse(X):
+        return sparse.vstack([X, X_new], format=X.format)
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return pd.concat([X, X_new])
+    if isinstance(X, np.ndarray):
+        return np.concatenate([X, np.asarray(X_new)])
+    return list(X) + list(X_new)
+
+
+def last_rows(X, n: int):
+    """
+    It returns the last n rows of X, all of them when it has fewer
+    """
+    total = n_rows(X)
+    return X if total <= n else _safe_indexing(X, np.arange(total - n, total))
+
+
+def roll(window, X_new, y_new, size: int = None) -> tuple:
+    """
+    It returns the (X, y) of a rolling window of rows once the new rows are appended to it, only the last size rows
+    are kept
+
+    :param window: the (X, y) of the window so far or None
+    :param size: the number of rows the window keeps, defaults to its number of rows so far, or to the new rows when
+    there is no window yet
+    """
+    X, y = (None, None) if window is None else window
+    if size is None:
+        size = n_rows(y_new if y is None else y)
+    return last_rows(append_rows(X, X_new), size), last_rows(append_rows(y, y_new), size)
+
+
+def advance(estimator, X, y, partial_fit: bool, warm_start: bool, rows_seen: int = None) -> str:
+    """
+    It trains a fitted model further on new rows only and returns how, 'partial_fit' or 'warm_start', or None when it
+    has no incremental path for them. A pipeline, e.g. of a text run, passes the rows through its fitted steps and
+    advances its last step. A warm start ensemble grows new estimators on the rows, as many as the rows are of the
+    rows_seen by the ensemble so far, and is left as it is when the rows do not have exactly its classes since its
+    earlier estimators would no longer line up with them
+
+    :param estimator: a fitted estimator or pipeline
+    :param partial_fit: True if the model has partial_fit, see ModelSpec
+    :param warm_start: True if the model is an ensemble that grows with warm_start, see ModelSpec
+    :param rows_seen: the rows the model was trained on so far, defaults to the new rows
+    """
+    model = estimator
+    if isinstance(estimator, Pipeline):
+        X = estimator[:-1].transform(X)
+        model = estimator[-1]
+
+    if partial_fit is True:
+        model.partial_fit(X, y)
+        return 'partial_fit'
+
+    if warm_start is True:
+        if hasattr(model, 'classes_') and not np.array_equal(np.unique(y), model.classes_):
+            return None
+        extra = math.ceil(model.n_estimators * n_rows(y) / (rows_seen or n_rows(y)))
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + max(extra, 1))
+        model.fit(X, y)
+        return 'warm_start'
+    return None
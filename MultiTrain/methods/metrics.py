@@ -0,0 +1,209 @@
+import numpy as np
+
+# integer labels spanning at most this many values are used as their own codes, anything else goes through np.unique
+_DIRECT_CODES = 1 << 16
+
+
+def _encode(true, preds) -> tuple:
+    """
+    It maps the labels of true and of every row of preds onto the codes 0..n_labels-1 and returns
+    (true codes, pred codes, labels)
+    """
+    true = np.asarray(true).ravel()
+    preds = np.asarray(preds)
+    preds = preds.reshape(len(preds), -1)
+    if preds.shape[1] != len(true):
+        raise ValueError(f'true and pred have different lengths: {len(true)} and {preds.shape[1]}')
+
+    if true.dtype.kind in 'iu' and preds.dtype.kind in 'iu' and true.size > 0 and preds.size > 0:
+        low = min(true.min(), preds.min())
+        high = max(true.max(), preds.max())
+        if int(high) - int(low) < _DIRECT_CODES:
+            # class labels like 0/1 or 0..k, no sorting is needed to encode them
+            return (true - low).astype(np.intp), (preds - low).astype(np.intp), np.arange(low, high + 1)
+
+    labels, codes = np.unique(np.concatenate([true, preds.ravel()]), return_inverse=True)
+    return codes[:len(true)], codes[len(true):].reshape(preds.shape), labels
+
+
+def confusion_matrices(true, preds) -> tuple:
+    """
+    It counts the confusion matrix of every row of a (n_models, n_samples) prediction matrix with a single bincount,
+    rows are the true labels and columns the predicted ones. All the matrices share the same sorted labels, including
+    labels that only some of the models predict
+
+    :param true: the true labels
+    :param preds: the predicted labels of every model, one row per model
+    :return: a tuple of (matrices of shape (n_models, n_labels, n_labels), labels)
+    """
+    true, preds, labels = _encode(true, preds)
+    n_models, n_labels = len(preds), len(labels)
+    cells = n_labels * n_labels
+    index = preds + true * n_labels
+    index += (np.arange(n_models) * cells)[:, None]
+    matrices = np.bincount(index.ravel(), minlength=n_models * cells).reshape(n_models, n_labels, n_labels)
+    return matrices, labels
+
+
+def confusion_matrix(true, pred) -> tuple:
+    """
+    It counts the confusion matrix of a vector of predictions. Only the labels found in true or pred are kept, in
+    sorted order as scikit-learn does
+
+    :param true: the true labels
+    :param pred: the predicted labels
+    :return: a tuple of (matrix, labels)
+    """
+    matrices, labels = confusion_matrices(true, [pred])
+    matrix = matrices[0]
+    present = (matrix.sum(axis=0) + matrix.sum(axis=1)) > 0
+    return matrix[present][:, present], labels[present]
+
+
+def _divide(numerator, denominator):
+    # scikit-learn's zero_division default, a score with an empty denominator is 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), 0.0)
+
+
+def scores_from_confusion(matrices, labels, average: str = 'binary', pos_label=1) -> dict:
+    """
+    It derives the classification scores of the leaderboard from a stack of confusion matrices, they match what
+    accuracy_score, balanced_accuracy_score, r2_score, roc_auc_score, f1_score, precision_score and recall_score
+    return for the same predictions
+
+    :param matrices: the confusion matrices of shape (n_models, n_labels, n_labels), see confusion_matrices
+    :param labels: the label of every row and column of the matrices
+    :param average: 'binary' for the scores of pos_label, 'macro' or 'micro' for multiclass averages
+    :param pos_label: the positive class when average is 'binary'
+    :return: a dictionary of the keys accuracy, balanced_accuracy, r2, roc_auc, f1, precision and recall to an array
+    with one score per model, r2 and roc_auc are NaN where scikit-learn would raise or warn
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    labels = np.asarray(labels)
+    n_models = len(matrices)
+    total = matrices.sum(axis=(1, 2))
+    tp = np.diagonal(matrices, axis1=1, axis2=2)
+    support = matrices.sum(axis=2)
+    predicted = matrices.sum(axis=1)
+    # scikit-learn only averages over the labels found in the true labels or the predictions of each model
+    present = (support + predicted) > 0
+    supported = support > 0
+
+    accuracy = _divide(tp.sum(axis=1), total)
+    recall = _divide(tp, support)
+    precision = _divide(tp, predicted)
+    f1 = _divide(2 * tp, support + predicted)
+    balanced_accuracy = _divide((recall * supported).sum(axis=1), supported.sum(axis=1))
+
+    if average == 'binary':
+        if (present.sum(axis=1) > 2).any():
+            raise ValueError(f'a binary average needs at most 2 labels, the labels are {labels}')
+        position = np.flatnonzero(labels == pos_label)
+        found = present[:, position[0]] if len(position) else np.zeros(n_models, dtype=bool)
+        if ((present.sum(axis=1) == 2) & ~found).any():
+            raise ValueError(f'pos_label={pos_label} is not a valid label, the labels are {labels}')
+        if len(position) == 0:
+            f1_, precision_, recall_ = np.zeros(n_models), np.zeros(n_models), np.zeros(n_models)
+        else:
+            f1_, precision_, recall_ = f1[:, position[0]], precision[:, position[0]], recall[:, position[0]]
+    elif average == 'macro':
+        count = present.sum(axis=1)
+        f1_ = _divide((f1 * present).sum(axis=1), count)
+        precision_ = _divide((precision * present).sum(axis=1), count)
+        recall_ = _divide((recall * present).sum(axis=1), count)
+    elif average == 'micro':
+        # every sample has exactly one true and one predicted label, so the micro averages are all the accuracy
+        f1_, precision_, recall_ = accuracy, accuracy, accuracy
+    else:
+        raise ValueError(f"average must be one of 'binary', 'macro' or 'micro', not {average}")
+
+    r2 = np.full(n_models, np.nan)
+    roc_auc = np.full(n_models, np.nan)
+    if labels.dtype.kind in 'iufb':
+        values = labels.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = (support * values).sum(axis=1) / total
+            residual = (matrices * (values[:, None] - values[None, :]) ** 2).sum(axis=(1, 2))
+            spread = (support * (values - mean[:, None]) ** 2).sum(axis=1)
+            r2 = np.where(spread > 0, 1 - residual / np.where(spread > 0, spread, 1),
+                          np.where(residual == 0, 1.0, 0.0))
+        r2[total < 2] = np.nan
+
+        # the predicted labels are the scores of the ROC curve, its area is the chance that a sample of the larger
+        # true label gets a larger prediction than one of the smaller true label, ties counting half. With 0/1
+        # predictions it is the balanced accuracy
+        for model in range(n_models):
+            rows = matrices[model][supported[model]]
+            if len(rows) == 2:
+                negative, positive = rows
+                below = np.cumsum(negative) - negative
+                roc_auc[model] = (positive * (below + negative / 2)).sum() / (positive.sum() * negative.sum())
+
+    return {'accuracy': accuracy, 'balanced_accuracy': balanced_accuracy, 'r2': r2, 'roc_auc': roc_auc,
+            'f1': f1_, 'precision': precision_, 'recall': recall_}
+
+
+def classification_score_matrix(true, preds, average: str = 'binary', pos_label=1) -> dict:
+    """
+    It scores every row of a (n_models, n_samples) prediction matrix in one vectorized pass, see
+    scores_from_confusion for the keys
+
+    :param true: the true labels
+    :param preds: the predicted labels of every model, one row per model
+    :param average: 'binary', 'macro' or 'micro'
+    :param pos_label: the positive class when average is 'binary'
+    """
+    matrices, labels = confusion_matrices(true, preds)
+    return scores_from_confusion(matrices, labels, average, pos_label)
+
+
+def classification_scores(true, pred, average: str = 'binary', pos_label=1) -> dict:
+    """
+    It scores a single vector of predictions, r2 and roc_auc are None where scikit-learn would raise or warn
+
+    :param true: the true labels
+    :param pred: the predicted labels
+    :param average: 'binary', 'macro' or 'micro'
+    :param pos_label: the positive class when average is 'binary'
+    """
+    scores = classification_score_matrix(true, [pred], average, pos_label)
+    return {key: None if np.isnan(value[0]) else float(value[0]) for key, value in scores.items()}
+
+
+def regression_score_matrix(true, preds) -> dict:
+    """
+    It scores every row of a (n_models, n_samples) prediction matrix in one vectorized pass, the scores match
+    mean_absolute_error, the square root of mean_squared_error, r2_score, the square root of mean_squared_log_error,
+    median_absolute_error and mean_absolute_percentage_error
+
+    :param true: the true values
+    :param preds: the predictions of every model, one row per model
+    :return: a dictionary of the keys mae, rmse, r2, rmsle, medae and mape to an array with one score per model,
+    rmsle is NaN for the models where the true values or the predictions are not above -1
+    """
+    true = np.asarray(true, dtype=np.float64).ravel()
+    preds = np.asarray(preds, dtype=np.float64)
+    preds = preds.reshape(len(preds), -1)
+
+    error = np.abs(preds - true)
+    mae = error.mean(axis=1)
+    mape = (error / np.maximum(np.abs(true), np.finfo(np.float64).eps)).mean(axis=1)
+    residual = np.square(error).sum(axis=1)
+    rmse = np.sqrt(residual / len(true))
+    spread = np.square(true - true.mean()).sum()
+    if len(true) < 2:
+        r2 = np.full(len(preds), np.nan)
+    elif spread > 0:
+        r2 = 1 - residual / spread
+    else:
+        r2 = np.where(residual == 0, 1.0, 0.0)
+
+    rmsle = np.full(len(preds), np.nan)
+    valid = (preds > -1).all(axis=1) if (true > -1).all() else np.zeros(len(preds), dtype=bool)
+    if valid.any():
+        rmsle[valid] = np.sqrt(np.square(np.log1p(preds[valid]) - np.log1p(true)).mean(axis=1))
+
+    # np.median partitions every row of the error matrix in the same call
+    medae = np.median(error, axis=1)
+    return {'mae': mae, 'rmse': rmse, 'r2': r2, 'rmsle': rmsle, 'medae': medae, 'mape': mape}
@@ -1,14 +1,27 @@
-from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib import pyplot as plt
-from IPython.display import display
 import os
 import shutil
 import logging
 
+import numpy as np
+import pandas as pd
+
+from MultiTrain.methods.parallel import TimedOut
+from MultiTrain.methods.sparse import Skipped
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def display(*objs) -> None:
+    """
+    It shows the objects with IPython's display. IPython is only imported the first time something is shown, so that
+    importing MultiTrain does not pay for it
+    """
+    from IPython.display import display as ipython_display
+
+    ipython_display(*objs)
+
+
 def write_to_excel(name: any,
                    file: any
                    ) -> None:
@@ -92,6 +105,9 @@ def img(FILENAME: any,
     :type FILENAME: any
     :param type_: 'file' or 'picture', defaults to file (optional)
     """
+    from matplotlib import pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
     if type_ == 'file':
         FILE = PdfPages(FILENAME)
         figureCount = plt.get_fignums()
@@ -161,3 +177,117 @@ def t_best_model(df, best, excel):
 
     write_to_excel(excel, df)
     return df
+
+
+def result_row(result: any,
+               n_columns: int,
+               status: bool = False) -> list:
+    """
+    It turns the result of a model task into a row of the leaderboard. A model that was stopped for going over its time
+    or skipped gets empty scores and its elapsed time in the last column, a model that was never started gets an empty
+    row
+
+    :param result: the list of scores returned by the task, a TimedOut, a Skipped or None for a model that was never
+    started
+    :param n_columns: the number of score columns, the last one being the time taken
+    :param status: set to True to add the Status column at the end of the row, see result_status. A model that was
+    never started is 'not attempted'
+    """
+    if result is None:
+        row = [None] * n_columns
+    elif isinstance(result, (TimedOut, Skipped)):
+        row = [None] * (n_columns - 1) + [round(result.elapsed, 2)]
+    else:
+        row = list(result)
+
+    if status is True:
+        row.append('not attempted' if result is None else result_status(result))
+    return row
+
+
+def result_status(result: any) -> str:
+    """
+    It returns the Status of a model task in the leaderboard: 'completed', 'failed', 'timed out', 'skipped' or
+    'not attempted'. A model that could not be fitted or could not predict has failed, whether its task returned
+    without predictions, its row is empty but for the time taken or its worker process failed and returned nothing.
+    The models that were never started have no result and are 'not attempted', it is up to the caller to tell them
+    apart
+
+    :param result: the result of the task, a TimedOut, a Skipped or None for a task that failed in its worker, see
+    run_tasks
+    """
+    if result is None:
+        return 'failed'
+    elif isinstance(result, TimedOut):
+        return 'timed out'
+    elif isinstance(result, Skipped):
+        return 'skipped'
+    elif isinstance(result, tuple) and result[1] is None:
+        return 'failed'
+    elif isinstance(result, list) and all(value is None for value in result[:-1]):
+        return 'failed'
+    return 'completed'
+
+
+def split_leaderboard(names: list,
+                      scores: np.ndarray,
+                      columns: list,
+                      results: dict,
+                      status: bool = False) -> pd.DataFrame:
+    """
+    It builds the leaderboard of a split run from the metric matrix of the models, the last column being the time
+    taken by every model
+
+    :param names: the model names, in the order of the rows of scores
+    :param scores: a (n_models, len(columns) - 1) matrix of scores, NaN for the models that have no scores
+    :param columns: the columns of the leaderboard
+    :param results: the position of a model in names to the result of its task, a tuple ending with the time taken,
+    a TimedOut, a Skipped or None for a task that failed in its worker, whose time is unknown. Models that were never
+    started are left out
+    :param status: set to True to add the Status column, see result_status. Models that were never started are
+    'not attempted'
+    """
+    times = np.full(len(names), np.nan)
+    for i, result in results.items():
+        if isinstance(result, (TimedOut, Skipped)):
+            times[i] = round(result.elapsed, 2)
+        elif result is not None:
+            times[i] = result[-1]
+
+    df = pd.DataFrame(np.column_stack([scores, times]), index=names, columns=columns)
+    if status is True:
+        df['Status'] = [result_status(results[i]) if i in results else 'not attempted' for i in range(len(names))]
+    return df
+
+
+def leaderboard_record(name: str,
+                       mode: str,
+                       scores: dict,
+                       result: any,
+                       reused: bool = False) -> dict:
+    """
+    It returns the record fit_iter yields for a model once it is done
+
+    :param name: the name of the model
+    :param mode: 'split' or 'kf'
+    :param scores: the leaderboard columns of the model to its values, NaN values are turned into None
+    :param result: the result of the model task, see result_status
+    :param reused: True when the result came from the checkpoint journal or the result cache
+    :return: a dictionary of the keys model, mode, scores, status and reused
+    """
+    scores = {column: value.item() if isinstance(value, np.generic) else value for column, value in scores.items()}
+    scores = {column: None if isinstance(value, float) and np.isnan(value) else value
+              for column, value in scores.items()}
+    return {'model': name, 'mode': mode, 'scores': scores, 'status': result_status(result), 'reused': reused}
+
+
+def log_data_report(report: dict) -> None:
+    """
+    It logs the memory report of prepare_data, nothing when the data was left as it was
+
+    :param report: the report of prepare_data or None
+    """
+    if report is None:
+        return
+    logger.info(f"Prepared the data as {report['dtype']}: {report['original MB']:.1f} MB -> "
+                f"{report['prepared MB']:.1f} MB, {report['peak saved MB']:.1f} MB of peak memory saved")
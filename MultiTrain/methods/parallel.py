@@ -0,0 +1,242 @@
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from MultiTrain.methods.scheduler import call_with_threads
+
+logger = logging.getLogger(__name__)
+
+
+class TimedOut:
+    """
+    It takes the place of the result of a task that was stopped because it ran for longer than its time limit
+    """
+
+    def __init__(self, elapsed: float):
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f'TimedOut(elapsed={self.elapsed:.2f})'
+
+
+# how often in seconds a run waiting on its workers looks for a free slot or a cancellation
+_POLL = 0.05
+
+
+class WorkerSlots:
+    """
+    It bounds the number of worker processes that several runs have at the same time, e.g. the leaderboards of
+    concurrent afit calls. A run only starts a worker when it gets a slot and gives the slot back when the worker ends
+
+    :param n_workers: the number of slots, None or -1 uses all the available cores
+    """
+
+    def __init__(self, n_workers: int = None):
+        self.n_workers = worker_count(n_workers)
+        self._semaphore = threading.BoundedSemaphore(self.n_workers)
+
+    def acquire(self) -> bool:
+        # never blocks, a run that gets no slot carries on collecting the workers it already has
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+def worker_count(n_workers: int = None, n_tasks: int = None) -> int:
+    """
+    It works out how many worker processes to start for a run
+
+    :param n_workers: the number of workers requested, None or -1 uses all the available cores
+    :param n_tasks: the number of tasks to be run, no more workers than tasks are started
+    """
+    if n_workers is None or n_workers == -1:
+        n_workers = os.cpu_count() or 1
+
+    elif n_workers < -1:
+        # follows the joblib convention where -2 means all the cores but one
+        n_workers = max((os.cpu_count() or 1) + 1 + n_workers, 1)
+
+    if n_tasks is not None:
+        n_workers = min(n_workers, n_tasks)
+
+    return max(n_workers, 1)
+
+
+def _serve(connection, function, n_threads):
+    # runs inside a worker process, it runs the (args, kwargs) it is sent one after the other and sends back either
+    # (True, result) or (False, exception) for every one of them, until it is sent None
+    try:
+        while True:
+            task = connection.recv()
+            if task is None:
+                return
+            try:
+                result = (True, call_with_threads(function, n_threads, *task[0], **task[1]))
+            except BaseException as error:
+                result = (False, error)
+
+            try:
+                connection.send(result)
+            except Exception as error:
+                # the result or the exception could not be pickled
+                connection.send((False, RuntimeError(f'the worker could not send back its result: {error!r}')))
+    except EOFError:
+        # the run went away
+        return
+    finally:
+        connection.close()
+
+
+def _kill(process):
+    if process.exitcode is None:
+        process.kill()
+        process.join()
+
+
+class _Worker:
+    """
+    It is a worker process of a run that is kept for all the tasks of the run. The task it is running if any is its
+    key and the time.monotonic() it was sent at, and it is lost once it exited without a result
+    """
+
+    def __init__(self, context, function, n_threads):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, function, n_threads))
+        self.process.start()
+        child.close()
+        # a worker waits for tasks until it is told to stop, so one left behind by a run that was never closed, e.g.
+        # held by the traceback of an error, is killed once it is garbage collected or before the interpreter waits
+        # for its child processes at exit
+        self._finalizer = multiprocessing.util.Finalize(self, _kill, args=(self.process,), exitpriority=10)
+        self.key, self.started, self.lost = None, None, False
+
+    def send(self, key, args, kwargs: dict = None) -> None:
+        self.connection.send((args, kwargs or {}))
+        self.key, self.started = key, time.monotonic()
+
+    def receive(self) -> tuple:
+        key, self.key = self.key, None
+        try:
+            ok, result = self.connection.recv()
+        except EOFError:
+            self.lost = True
+            ok, result = False, RuntimeError(f'the worker running {key} exited without a result')
+        return key, ok, result
+
+    def stop(self, kill: bool = False) -> None:
+        if kill is False:
+            try:
+                self.connection.send(None)
+            except OSError:
+                kill = True
+        if kill is True:
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self._finalizer.cancel()
+
+
+def run_tasks(function, tasks, n_workers: int = None, n_threads: int = None, timeout: float = None,
+              deadline: float = None, slots: WorkerSlots = None, cancel: threading.Event = None):
+    """
+    It runs function(*args, **kwargs) for every (key, args) or (key, args, kwargs) task in tasks in at most n_workers
+    worker processes, and yields (key, result) pairs in the order the tasks complete. The workers are started once and
+    every one of them runs task after task, so a run pays for as many process start-ups and copies of function as it
+    has workers rather than tasks. The args of every task are pickled to its worker, see SharedData for the arrays
+    they hold
+
+    A task that runs for longer than timeout seconds has its worker killed and yields a TimedOut result instead, a new
+    worker takes its place and the other tasks carry on. A task that raises, or whose worker exits without a result
+    e.g. killed for running out of memory, is logged and yields None, the other tasks carry on. Once the deadline
+    passes the running tasks are killed and yield TimedOut, and the tasks that were never started yield nothing.
+    Closing the generator early or setting cancel kills the workers.
+
+    :param function: a picklable callable, bound methods of the leaderboard classes are fine
+    :param tasks: a list of (key, args) or (key, args, kwargs) tuples
+    :param n_workers: the number of worker processes, None or -1 uses all the available cores
+    :param n_threads: caps the native thread pools of every worker, see scheduler.core_budget
+    :param timeout: the wall-clock limit in seconds for a single task, None for no limit
+    :param deadline: the time.monotonic() value at which the whole run stops, None for no limit
+    :param slots: the WorkerSlots shared with other runs, a worker is only started once it has a slot and holds it
+    until it is stopped
+    :param cancel: a threading.Event, once it is set the run stops and yields nothing more, e.g. from another thread
+    """
+    pending = deque(tasks)
+    n_workers = worker_count(n_workers, len(pending))
+    context = multiprocessing.get_context()
+    workers = []
+
+    def stop(worker, kill=False):
+        # the worker is gone, its slot goes back to the shared pool
+        workers.remove(worker)
+        worker.stop(kill)
+        if slots is not None:
+            slots.release()
+
+    try:
+        while pending or any(worker.key is not None for worker in workers):
+            if cancel is not None and cancel.is_set():
+                return
+
+            if deadline is not None and time.monotonic() >= deadline:
+                now = time.monotonic()
+                for worker in [worker for worker in workers if worker.key is not None]:
+                    key, started = worker.key, worker.started
+                    stop(worker, kill=True)
+                    yield key, TimedOut(now - started)
+                return
+
+            for worker in workers:
+                if worker.key is None and pending:
+                    worker.send(*pending.popleft())
+            while pending and len(workers) < n_workers and (slots is None or slots.acquire()):
+                workers.append(_Worker(context, function, n_threads))
+                workers[-1].send(*pending.popleft())
+            if not pending:
+                # the workers left without a task have nothing more to do
+                for worker in [worker for worker in workers if worker.key is None]:
+                    stop(worker)
+
+            busy = [worker for worker in workers if worker.key is not None]
+            wake_up = []
+            if timeout is not None and busy:
+                wake_up.append(min(worker.started for worker in busy) + timeout)
+            if deadline is not None:
+                wake_up.append(deadline)
+            if cancel is not None or (slots is not None and pending):
+                wake_up.append(time.monotonic() + _POLL)
+            wait_for = max(min(wake_up) - time.monotonic(), 0) if wake_up else None
+
+            if not busy:
+                # every slot is taken by other runs
+                time.sleep(wait_for)
+                continue
+
+            ready = wait([worker.connection for worker in busy], timeout=wait_for)
+            for worker in [worker for worker in busy if worker.connection in ready]:
+                key, ok, result = worker.receive()
+                if ok is False:
+                    # the task is lost but not the run, the leaderboard gets an empty row for it as in a serial run
+                    logger.error(f'the task {key} has an issue: {result!r}')
+                    result = None
+                if worker.lost is True:
+                    stop(worker, kill=True)
+                yield key, result
+
+            if timeout is not None:
+                now = time.monotonic()
+                for worker in [worker for worker in workers if worker.key is not None]:
+                    if now - worker.started >= timeout:
+                        key, started = worker.key, worker.started
+                        stop(worker, kill=True)
+                        yield key, TimedOut(now - started)
+    finally:
+        # nothing is left running when the generator finishes, fails or is closed early
+        for worker in list(workers):
+            stop(worker, kill=True)
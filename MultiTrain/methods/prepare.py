@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# the dtypes X can be prepared in, see prepare_data
+DTYPES = ('float64', 'float32')
+
+# the memory layouts X can be prepared in, row major 'C' or column major 'F'
+LAYOUTS = ('C', 'F')
+
+# the largest integer float32 holds exactly
+_FLOAT32_INTEGERS = 2 ** 24
+
+
+def data_size(X) -> int:
+    """
+    It returns the memory in bytes held by the values of X, an array, a dataframe, a series or a sparse matrix
+    """
+    if sparse.issparse(X):
+        X = X.tocsr() if X.format not in ('csr', 'csc') else X
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False).sum())
+    if isinstance(X, (pd.Series, np.ndarray)):
+        return X.nbytes
+    return 0
+
+
+def _numeric(X) -> bool:
+    if sparse.issparse(X):
+        return X.dtype.kind in 'biuf'
+    if isinstance(X, pd.DataFrame):
+        return all(dtype.kind in 'biuf' for dtype in X.dtypes)
+    if isinstance(X, pd.Series):
+        return X.dtype.kind in 'biuf'
+    return np.asarray(X).dtype.kind in 'biuf'
+
+
+def float32_safe(X) -> bool:
+    """
+    It returns True when X can be held as float32 without overflowing or rounding its integers, the values of X being
+    numeric. Other values are rounded to the about 7 significant digits of float32 all the same, it is not a check
+    that X round trips exactly
+    """
+    values = X.data if sparse.issparse(X) else np.asarray(X)
+    if values.size == 0:
+        return True
+    largest = np.nanmax(np.abs(values[np.isfinite(values)])) if np.isfinite(values).any() else 0
+    if largest > np.finfo(np.float32).max:
+        return False
+    if values.dtype.kind in 'biu' or np.array_equal(values, np.round(values), equal_nan=True):
+        return largest <= _FLOAT32_INTEGERS
+    return True
+
+
+def _convert(X, dtype: str, layout: str):
+    if sparse.issparse(X):
+        return X.asformat('csr' if layout == 'C' else 'csc').astype(dtype, copy=False)
+    X = np.asarray(X, dtype=dtype)
+    if X.ndim == 1:
+        # a single feature, e.g. a series, is one column
+        X = X.reshape(-1, 1)
+    return np.require(X, requirements=layout)
+
+
+def prepare_data(arrays: list, dtype: str = 'float64', layout: str = 'C', n_workers: int = 1) -> tuple:
+    """
+    It validates and converts the data of a run once, so every model is handed ready buffers instead of converting X
+    again in its own check_array, and returns (the prepared arrays, the memory report). The arrays become dtype arrays
+    in the layout, or CSR (CSC for 'F') sparse matrices, a single feature becomes one column. A dataframe becomes a
+    bare array so its column names are dropped, the models fitted on it have no feature_names_in_. float32 is lossy,
+    it rounds X to its precision, and it is only used when all the arrays are float32_safe, float64 otherwise. Arrays
+    that are not all numeric, e.g. documents or categorical columns, are returned as they are
+
+    The report has the dtype used, the memory of the data before and after in MB, and the peak memory saved in MB:
+    every model running at the same time used to hold its own float64 copy of the data when it was not float64
+    arrays in the layout already, they now share the prepared buffers
+
+    :param arrays: the training and test data, or the data of a KFold run
+    :param dtype: one of DTYPES
+    :param layout: one of LAYOUTS
+    :param n_workers: the number of models that run at the same time
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f'dtype should be one of {DTYPES}, got {dtype}')
+    if layout not in LAYOUTS:
+        raise ValueError(f'layout should be one of {LAYOUTS}, got {layout}')
+    if not all(_numeric(X) for X in arrays):
+        return list(arrays), None
+
+    if dtype == 'float32' and not all(float32_safe(X) for X in arrays):
+        dtype = 'float64'
+    before = sum(data_size(X) for X in arrays)
+    prepared = [_convert(X, dtype, layout) for X in arrays]
+    after = sum(data_size(X) for X in prepared)
+
+    # the buffers that had to be made, a model converted the same data to float64 on its own
+    made = sum(data_size(new) for X, new in zip(arrays, prepared) if new is not X)
+    copies = sum(data_size(new) * 8 // new.dtype.itemsize for X, new in zip(arrays, prepared) if new is not X)
+    saved = max(n_workers * copies - made, 0)
+    return prepared, {'dtype': dtype, 'original MB': before / 2 ** 20, 'prepared MB': after / 2 ** 20,
+                      'peak saved MB': saved / 2 ** 20}
+
+
+def prepare_target(y, dtype: str = None) -> np.ndarray:
+    """
+    It returns the labels or values of a run as a contiguous one dimensional array, in dtype when it is given e.g.
+    float64 for the values of a regression
+    """
+    y = np.ravel(np.asarray(y, dtype=dtype))
+    return np.ascontiguousarray(y)
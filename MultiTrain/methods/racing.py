@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+from scipy import stats
+from sklearn.utils import _safe_indexing
+
+from MultiTrain.methods.folds import merge_folds
+from MultiTrain.methods.parallel import TimedOut, run_tasks
+
+# the fewest training rows a round of a race is run on
+MIN_RACE_SAMPLES = 50
+
+# the fewest folds a model runs before it can be dropped from a KFold race, with fewer the spread of its gap to the
+# leader is too unreliable, e.g. nil when two small folds score the same
+MIN_RACE_FOLDS = 3
+
+
+def race_schedule(n_candidates: int, n_samples: int, factor: int = 3, min_samples: int = None) -> list:
+    """
+    It returns the number of training rows of every round of a race but the last, in which the survivors are trained
+    on all the data. Like successive halving, every round keeps 1 / factor of its models and the next round trains
+    them on factor times as many rows, there are as many rounds as it takes to get down to fewer than factor models
+
+    :param n_candidates: the number of models that start the race
+    :param n_samples: the number of training rows
+    :param factor: the proportion of models eliminated and the growth of the sample in every round
+    :param min_samples: the rows of the first round, by default the rows that let the last round be reached on all
+    the data, never fewer than MIN_RACE_SAMPLES
+    """
+    if factor < 2:
+        raise ValueError(f'the racing factor should be an integer of 2 or more, got {factor}')
+
+    rounds = int(math.floor(math.log(max(n_candidates, 1), factor) + 1e-9))
+    if min_samples is None:
+        min_samples = n_samples / factor ** rounds
+    rows = max(min_samples, MIN_RACE_SAMPLES)
+
+    schedule = []
+    while len(schedule) < rounds and rows < n_samples:
+        schedule.append(int(rows))
+        rows *= factor
+    return schedule
+
+
+def sample_order(y, random_state: int = None, stratify: bool = False) -> np.ndarray:
+    """
+    It returns a random order of the training rows whose every prefix is a sample of the data, so the samples of a
+    race are nested and each round only adds rows to the one before. With stratify every prefix holds the classes of
+    y in the proportions of the whole data
+
+    :param y: the training labels or values
+    :param random_state: the seed of the order
+    :param stratify: set to True to stratify the prefixes on y
+    """
+    random = np.random.default_rng(random_state)
+    y = np.asarray(y)
+    if stratify is False:
+        return random.permutation(len(y))
+
+    # every row gets its position inside its class as a fraction, rows of every class are then spread evenly along
+    # the order
+    _, codes = np.unique(y, return_inverse=True)
+    position = np.empty(len(y))
+    for code in range(codes.max() + 1):
+        members = random.permutation(np.flatnonzero(codes == code))
+        position[members] = (np.arange(len(members)) + 0.5) / len(members)
+    return np.argsort(position + random.random(len(y)) * 1e-9, kind='stable')
+
+
+def race_sample(X, y, order: np.ndarray, rows: int) -> tuple:
+    """
+    It returns the first rows of the order of X and y, in the order they come in the data
+
+    :param X: the training data, an array, a dataframe, a sparse matrix or a list of texts
+    :param y: the training labels or values
+    """
+    index = np.sort(order[:rows])
+    return _safe_indexing(X, index), _safe_indexing(y, index)
+
+
+def hopeless(fold_scores: dict, confidence: float = 0.95, min_folds: int = MIN_RACE_FOLDS) -> list:
+    """
+    It returns the models that cannot catch up with the leader, the model with the best mean score. Every model is
+    compared with the leader on the differences of their scores fold by fold, so the folds that are hard for every
+    model do not hide a gap. A model is hopeless when the lower confidence bound of its mean gap to the leader is above
+    zero, the gap being tested with Student's t. No model is hopeless before min_folds folds
+
+    :param fold_scores: the position of a model to its metric on each fold it ran, higher being better. All the models
+    ran the same folds
+    :param confidence: the one sided confidence level of the bound
+    :param min_folds: the folds every model runs before any of them can be hopeless, never fewer than 2
+    """
+    if len(fold_scores) < 2:
+        return []
+    means = {i: np.mean(scores) for i, scores in fold_scores.items()}
+    leader = max(means, key=means.get)
+    n_folds = len(fold_scores[leader])
+    if n_folds < max(min_folds, 2):
+        return []
+
+    quantile = stats.t.ppf(confidence, n_folds - 1)
+    losers = []
+    for i, scores in fold_scores.items():
+        gap = np.asarray(fold_scores[leader], dtype=float) - np.asarray(scores, dtype=float)
+        if i != leader and gap.mean() - quantile * gap.std(ddof=1) / math.sqrt(n_folds) > 0:
+            losers.append(i)
+    return losers
+
+
+def race_folds(fold_model, tasks: list, data: dict, make_row, metric: int, confidence: float = 0.95,
+               n_workers: int = None, n_threads: int = None, timeout: float = None, deadline: float = None,
+               slots=None, cancel=None):
+    """
+    It cross validates the models fold by fold, all of them on the same fold at a time, and after every fold drops
+    the models that cannot catch up with the leader, see hopeless, so the folds left are not run for them. It yields
+    (position, row) for every model as soon as it is dropped or has run every fold, the row having the number of folds
+    the model ran before its time column. A model that fails on a fold gets an empty row at once, as in gather_folds.
+    The models of a fold run in worker processes, see run_tasks
+
+    :param fold_model: a function that returns (the scores of a fold, see fold_scores, the time taken) for a model,
+    the scores being None when the model could not be fitted
+    :param tasks: (position, args) for every model, fold_model is called with args followed by the data of a fold
+    :param data: the position of a model to the data of every fold it is fitted on, see fold_data. All the models
+    have the same folds, some of them may get the folds in another form e.g. made dense
+    :param make_row: a function of (the merged scores of the folds run, seconds) that returns the leaderboard row of
+    a model, an empty row when the scores are None
+    :param metric: the position in the row of the score the models are compared on, higher being better
+    :param confidence: the confidence level of the bound, see hopeless
+    """
+    args = dict(tasks)
+    alive = [i for i, _ in tasks]
+    folds = {i: [] for i in alive}
+    seconds = {i: 0.0 for i in alive}
+
+    def row(i, failed=False):
+        built = make_row(None if failed else merge_folds(folds[i]), seconds[i])
+        return built[:-1] + [len(folds[i])] + built[-1:]
+
+    n_folds = len(next(iter(data.values()))) if data else 0
+    for k in range(n_folds):
+        if not alive:
+            return
+        outcome = run_tasks(fold_model, [(i, (*args[i], data[i][k])) for i in alive], n_workers=n_workers,
+                            n_threads=n_threads, timeout=timeout, deadline=deadline, slots=slots, cancel=cancel)
+
+        ran, done = [], []
+        for i, result in outcome:
+            done.append(i)
+            if isinstance(result, TimedOut):
+                yield i, TimedOut(seconds[i] + result.elapsed)
+                continue
+            scores, took = (None, 0.0) if result is None else result
+            seconds[i] += took
+            if scores is None:
+                yield i, row(i, failed=True)
+                continue
+            folds[i].append(scores)
+            ran.append(i)
+
+        if cancel is not None and cancel.is_set():
+            return
+        # the models that were never started on this fold before the deadline keep the folds they ran
+        for i in alive:
+            if i not in done and folds[i]:
+                yield i, row(i)
+
+        scored = {}
+        for i in ran:
+            values = [make_row(scores, 0.0)[metric] for scores in folds[i]]
+            if any(value is None or np.isnan(value) for value in values):
+                yield i, row(i)
+            else:
+                scored[i] = values
+        dropped = hopeless(scored, confidence)
+        for i in dropped:
+            yield i, row(i)
+        alive = [i for i in scored if i not in dropped]
+
+    for i in alive:
+        yield i, row(i)
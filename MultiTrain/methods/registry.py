@@ -0,0 +1,119 @@
+from importlib import import_module
+
+# the capabilities a model can be filtered on with the requires argument of fit and use_model
+CAPABILITIES = ('sparse', 'predict_proba', 'partial_fit', 'warm_start')
+
+
+class ModelSpec:
+    """
+    It describes one model or sampler of a leaderboard: its name, where its class lives, how to construct it and what
+    it is capable of. Nothing is imported or constructed until build is called.
+
+    :param name: the name of the model in the leaderboard
+    :param path: the import path of the estimator class e.g. 'sklearn.svm.SVC'
+    :param params: the fixed keyword arguments of the estimator
+    :param threads: the name of the parameter that sets the estimator's threads e.g. 'n_jobs', None if it has none
+    :param seed: set to False when the estimator takes no random_state
+    :param sparse: True if the estimator accepts scipy sparse input
+    :param predict_proba: True if the estimator has predict_proba
+    :param partial_fit: True if the estimator can be trained incrementally with partial_fit
+    :param warm_start: True if the estimator is an ensemble that grows n_estimators new estimators with warm_start
+    :param cost: the expected training cost from 1 (cheap linear models) to 5 (kernel methods)
+    """
+
+    def __init__(self,
+                 name: str,
+                 path: str,
+                 params: dict = None,
+                 threads: str = None,
+                 seed: bool = True,
+                 sparse: bool = False,
+                 predict_proba: bool = False,
+                 partial_fit: bool = False,
+                 warm_start: bool = False,
+                 cost: int = 3):
+        self.name = name
+        self.path = path
+        self.params = params or {}
+        self.threads = threads
+        self.seed = seed
+        self.sparse = sparse
+        self.predict_proba = predict_proba
+        self.partial_fit = partial_fit
+        self.warm_start = warm_start
+        self.cost = cost
+
+    def __repr__(self):
+        return f'ModelSpec({self.name!r}, {self.path!r})'
+
+    def estimator_class(self):
+        module, _, name = self.path.rpartition('.')
+        return getattr(import_module(module), name)
+
+    def build(self, n_threads: int = None, random_state: int = None, **params):
+        """
+        It imports the estimator class and returns a new, unfitted instance of it
+
+        :param n_threads: the number of threads the estimator may use, ignored if it has no threads parameter
+        :param random_state: the random state of the estimator, ignored if it takes none
+        :param params: keyword arguments that are only known at run time e.g. the sampling_strategy of a sampler
+        """
+        params = {**self.params, **params}
+        if self.threads is not None and n_threads is not None:
+            params[self.threads] = n_threads
+        if self.seed is True and random_state is not None:
+            params['random_state'] = random_state
+        return self.estimator_class()(**params)
+
+
+class ModelRegistry:
+    """
+    An ordered collection of ModelSpec with a dictionary index on the model names
+    """
+
+    def __init__(self, specs: list):
+        self.specs = list(specs)
+        self._index = {spec.name: spec for spec in self.specs}
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, name):
+        try:
+            return self._index[name]
+        except KeyError:
+            raise Exception(f"name {name} is not found, "
+                            f"here is a list of the available models to work with: {self.names()}") from None
+
+    def names(self) -> list:
+        return [spec.name for spec in self.specs]
+
+    def select(self, include: list = None, exclude: list = None, requires: list = None) -> list:
+        """
+        It returns the specs of the models that take part in a run, in the order of the registry
+
+        :param include: the names of the only models to use, defaults to all of them
+        :param exclude: the names of models to leave out
+        :param requires: capabilities every selected model must have, any of 'sparse', 'predict_proba',
+        'partial_fit' and 'warm_start'
+        """
+        for name in list(include or []) + list(exclude or []):
+            # raises with the list of the available models when a name is misspelt
+            self[name]
+
+        for capability in requires or []:
+            if capability not in CAPABILITIES:
+                raise ValueError(f'capability {capability} is not one of {CAPABILITIES}')
+
+        include = None if include is None else set(include)
+        exclude = set(exclude or [])
+        return [spec for spec in self.specs
+                if (include is None or spec.name in include)
+                and spec.name not in exclude
+                and all(getattr(spec, capability) for capability in requires or [])]
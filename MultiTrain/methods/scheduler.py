@@ -0,0 +1,82 @@
+import os
+from threadpoolctl import threadpool_limits
+
+# names of the constructor parameters the estimators and samplers use for their own thread pools
+THREAD_PARAMS = ('n_jobs', 'thread_count')
+
+
+def total_cores(cores: int = -1) -> int:
+    """
+    It turns the cores argument of the leaderboard classes into a number of cores
+
+    :param cores: a positive number of cores, -1 for all the available cores or -2 for all the cores but one
+    """
+    available = os.cpu_count() or 1
+    if cores is None or cores == -1:
+        return available
+    elif cores < -1:
+        return max(available + 1 + cores, 1)
+    return max(min(cores, available), 1)
+
+
+def core_budget(cores: int = -1, n_tasks: int = 1, n_workers: int = None) -> tuple:
+    """
+    It splits a total core budget between the outer tasks (models or folds) that run at the same time and the threads
+    each of those tasks is allowed to start, so that outer * inner never goes above the budget
+
+    :param cores: the total core budget, -1 uses all the available cores
+    :param n_tasks: the number of tasks that could run at the same time
+    :param n_workers: an optional cap on the number of outer tasks
+    :return: a tuple of (outer, inner)
+    """
+    budget = total_cores(cores)
+    outer = min(budget, max(n_tasks, 1))
+    if n_workers is not None and n_workers > 0:
+        outer = min(outer, n_workers)
+    inner = max(budget // outer, 1)
+    return outer, inner
+
+
+def set_threads(estimator, n_threads: int):
+    """
+    It sets every thread pool parameter of an estimator, sampler or pipeline, including the nested ones, to n_threads
+
+    :param estimator: any object with the scikit-learn get_params/set_params interface
+    :param n_threads: the number of threads the estimator is allowed to use
+    """
+    if n_threads is None or not hasattr(estimator, 'get_params'):
+        return estimator
+
+    params = {key: n_threads for key in estimator.get_params(deep=True)
+              if key.split('__')[-1] in THREAD_PARAMS}
+    if params:
+        estimator.set_params(**params)
+    return estimator
+
+
+def call_with_threads(function, n_threads, *args, **kwargs):
+    """
+    It calls function(*args, **kwargs) with the native BLAS and OpenMP thread pools of the current process capped to
+    n_threads
+    """
+    if n_threads is None:
+        return function(*args, **kwargs)
+
+    # libraries that read the environment when they start their pools (e.g. in a child process) get the same cap
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(n_threads)
+
+    with threadpool_limits(limits=n_threads):
+        return function(*args, **kwargs)
+
+
+def cost_order(costs: list, expensive_first: bool = False) -> list:
+    """
+    It returns the positions of the models ordered by their expected cost, models with the same cost keep their order
+
+    :param costs: the cost tier of every model, from 1 (cheap) to 5 (expensive)
+    :param expensive_first: set to True to put the most expensive models first
+    """
+    if expensive_first is True:
+        return sorted(range(len(costs)), key=lambda i: -costs[i])
+    return sorted(range(len(costs)), key=lambda i: costs[i])
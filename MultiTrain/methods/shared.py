@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+
+import numpy as np
+from scipy import sparse
+
+# POSIX shared memory, the data is written there when it exists so that it never goes through a disk
+_SHARED_MEMORY = '/dev/shm'
+
+
+def _attach(path: str, dtype: str, shape: tuple, order: str):
+    return SharedArray(path, dtype=dtype, mode='r', shape=shape, order=order)
+
+
+class SharedArray(np.memmap):
+    """
+    It is a read-only numpy array mapped from a file of SharedData. It is pickled by its path rather than by its
+    values, so a worker process that is handed it maps the same pages instead of receiving a copy of the data. The
+    views and results of operations on it are pickled by their values as any other array
+    """
+
+    def __array_finalize__(self, obj):
+        super().__array_finalize__(obj)
+        self._shared = None
+
+    def __reduce__(self):
+        if self._shared is None:
+            return np.asarray(self).copy().__reduce__()
+        return _attach, self._shared
+
+
+class SharedData:
+    """
+    It holds the data of a run in memory-mapped files, in POSIX shared memory when the system has it, so that the
+    worker processes of the run attach read-only views of it instead of getting their own copy with every task. The
+    resident memory of the data stays close to a single copy whatever the number of workers. The files are deleted by
+    close, or once the SharedData is garbage collected
+
+    :param directory: where the files are written, defaults to /dev/shm or the temporary directory of the system
+    """
+
+    def __init__(self, directory: str = None):
+        if directory is None and os.path.isdir(_SHARED_MEMORY) and os.access(_SHARED_MEMORY, os.W_OK):
+            directory = _SHARED_MEMORY
+        self.path = tempfile.mkdtemp(prefix='multitrain-', dir=directory)
+        self.nbytes = 0
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def _share_array(self, X: np.ndarray):
+        if X.dtype.hasobject or X.size == 0 or getattr(X, '_shared', None) is not None:
+            # object arrays, e.g. string labels, and empty ones cannot be mapped from a file, and a SharedArray is
+            # already in one
+            return X
+        order = 'F' if X.flags['F_CONTIGUOUS'] and not X.flags['C_CONTIGUOUS'] else 'C'
+        path = os.path.join(self.path, f'{uuid.uuid4().hex}.dat')
+        written = np.memmap(path, dtype=X.dtype, mode='w+', shape=X.shape, order=order)
+        written[...] = X
+        written.flush()
+        del written
+
+        shared = _attach(path, X.dtype.str, X.shape, order)
+        shared._shared = (path, X.dtype.str, X.shape, order)
+        self.nbytes += X.nbytes
+        return shared
+
+    def share(self, data):
+        """
+        It writes the arrays in data to the files of the run and returns data with every array replaced by a read-only
+        SharedArray of it, a sparse matrix gets its buffers shared. Tuples, lists and dictionaries are looked into and
+        anything else, e.g. a dataframe or a fitted transformer, is returned as it is
+        """
+        if isinstance(data, np.ndarray) and type(data) in (np.ndarray, np.memmap, SharedArray):
+            return self._share_array(data)
+        if sparse.issparse(data) and data.format in ('csr', 'csc'):
+            shared = type(data)(data.shape, dtype=data.dtype)
+            shared.data, shared.indices, shared.indptr = (self._share_array(data.data),
+                                                         self._share_array(data.indices),
+                                                         self._share_array(data.indptr))
+            return shared
+        if isinstance(data, tuple):
+            return tuple(self.share(value) for value in data)
+        if isinstance(data, list):
+            return [self.share(value) for value in data]
+        if isinstance(data, dict):
+            return {key: self.share(value) for key, value in data.items()}
+        return data
+
+    def close(self) -> None:
+        """
+        It deletes the files of the run, the arrays still mapped keep their pages until they are garbage collected
+        """
+        self._finalizer()
@@ -0,0 +1,90 @@
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.decomposition import TruncatedSVD
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+# how the models that only take dense data get a sparse X: a dense float32 copy of it, a dense float32 projection of
+# it on SVD_COMPONENTS columns, or no data at all, see dense_route
+DENSE_POLICIES = ('float32', 'svd', 'skip')
+
+# the columns of the projection of the 'svd' dense policy
+SVD_COMPONENTS = 100
+
+
+class Skipped:
+    """
+    It takes the place of the result of a model that was not fitted because it cannot take the data of the run, e.g.
+    a model that only takes dense data when the dense copy of a sparse X would not fit in the memory allowed for it
+    """
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return f'Skipped({self.reason!r})'
+
+
+def to_float32(X):
+    """
+    It returns X as a dense float32 array. It is a function of the module rather than a lambda so that the pipelines
+    holding it can be pickled
+    """
+    if sparse.issparse(X):
+        return X.astype(np.float32).toarray()
+    return np.asarray(X, dtype=np.float32)
+
+
+def dense_route(X_train, X_test, policy: str = 'float32', limit_mb: float = None, random_state: int = None) -> tuple:
+    """
+    It decides, before any model is fitted, how the models that only take dense data get a sparse X and returns (an
+    unfitted transformer that turns X into dense data, None), or (None, the reason the models are skipped) when the
+    policy is 'skip' or the dense data would take more than limit_mb
+
+    :param X_train: the sparse training data
+    :param X_test: the sparse test data
+    :param policy: one of DENSE_POLICIES
+    :param limit_mb: the most memory in MB the dense training and test data may take, None for no limit
+    :param random_state: the random state of the SVD
+    """
+    if policy not in DENSE_POLICIES:
+        raise ValueError(f'dense_policy should be one of {DENSE_POLICIES}, got {policy}')
+    if policy == 'skip':
+        return None, "it only takes dense data and dense_policy is 'skip'"
+
+    n_rows, n_columns = X_train.shape[0] + X_test.shape[0], X_train.shape[1]
+    if policy == 'svd':
+        n_columns = max(min(SVD_COMPONENTS, n_columns - 1, X_train.shape[0]), 1)
+        transformer = make_pipeline(TruncatedSVD(n_components=n_columns, random_state=random_state),
+                                    FunctionTransformer(to_float32))
+    else:
+        transformer = FunctionTransformer(to_float32)
+
+    size = n_rows * n_columns * np.dtype(np.float32).itemsize / 2 ** 20
+    if limit_mb is not None and size > limit_mb:
+        return None, (f"it only takes dense data and the dense {policy} data would take {size:.1f} MB, over "
+                      f"dense_limit_mb={limit_mb}")
+    return transformer, None
+
+
+def densify_split(transformer, X_train, X_test) -> tuple:
+    """
+    It fits a copy of the transformer of dense_route on the training data once and returns (the fitted transformer,
+    the dense training data, the dense test data), shared by all the models that only take dense data
+    """
+    fitted = clone(transformer)
+    return fitted, fitted.fit_transform(X_train), fitted.transform(X_test)
+
+
+def densify_folds(transformer, data: list) -> list:
+    """
+    It returns the data of every fold, see fold_data, with the training and test data made dense by the transformer of
+    dense_route fitted on the training data of the fold
+    """
+    folds = []
+    for X_train, y_train, X_test, y_test in data:
+        _, X_train, X_test = densify_split(transformer, X_train, X_test)
+        folds.append((X_train, y_train, X_test, y_test))
+    return folds
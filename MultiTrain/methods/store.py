@@ -0,0 +1,269 @@
+import os
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# the retention policies of the fitted models, see ModelStore
+KEEP_POLICIES = ('none', 'top_k', 'all')
+
+
+class Spilled:
+    """
+    It takes the place of a fitted model that was written to disk with joblib
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __repr__(self):
+        return f'Spilled({self.path!r})'
+
+
+def estimate_size(obj, seen: dict = None) -> int:
+    """
+    It estimates the memory in bytes held by an object and everything it refers to, numpy arrays are counted by their
+    buffers. Objects with their own __getstate__ are measured through it, which covers the Cython trees of
+    scikit-learn and the boosters of the gradient boosting libraries that keep their data outside of Python
+
+    :param obj: any object, typically a fitted estimator
+    :param seen: the objects already counted by id, they are kept alive so that an id is never reused while counting
+    """
+    seen = {} if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        # a view of another array is counted through that array, a view over any other buffer by its own size
+        return estimate_size(obj.base, seen) if isinstance(obj.base, np.ndarray) else obj.nbytes
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(key, seen) + estimate_size(value, seen)
+                                        for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, seen) for item in obj)
+    if isinstance(obj, type) or callable(obj) and not hasattr(obj, 'get_params'):
+        return 0
+
+    if getattr(type(obj), '__getstate__', None) is not getattr(object, '__getstate__', None):
+        try:
+            return sys.getsizeof(obj) + estimate_size(obj.__getstate__(), seen)
+        except Exception:
+            pass
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + estimate_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+class ModelStore:
+    """
+    It keeps what the last fit produced: the fitted estimator of every model with its test and training predictions,
+    and the leaderboard, so that use_model, visualize and show can work from them without training again
+
+    :param keep: which fitted models stay in memory after a fit, 'all' of them, the 'top_k' best ones on the
+    leaderboard metric or 'none'
+    :param top_k: the number of models kept in memory when keep is 'top_k'
+    :param spill_dir: a directory where the models that are not kept in memory are written with joblib, they are
+    loaded back when use_model asks for them. Without it they are dropped
+    """
+
+    def __init__(self, keep: str = 'all', top_k: int = 3, spill_dir: str = None):
+        if keep not in KEEP_POLICIES:
+            raise ValueError(f'keep must be one of {KEEP_POLICIES}, not {keep}')
+        if isinstance(top_k, int) is False or top_k < 1:
+            raise ValueError(f'top_k must be a positive integer, not {top_k}')
+
+        self.keep = keep
+        self.top_k = top_k
+        self.spill_dir = spill_dir
+        self.estimators = {}
+        self.spilled = {}
+        self.predictions = {}
+        self.leaderboard = None
+        self.data_report = None
+        self.holdout = None
+        self.training = None
+        self.prepared_as = ('float64', 'C')
+        self.trained = {}
+        self.mode = None
+
+    def __contains__(self, name):
+        return name in self.estimators or name in self.spilled
+
+    def __len__(self):
+        return len(self.estimators) + len(self.spilled)
+
+    def clear(self, mode: str = None) -> None:
+        """
+        It forgets the results of the previous fit, the files it spilled are deleted
+
+        :param mode: 'split' or 'kf', the kind of run the store is about to hold
+        """
+        for path in self.spilled.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.estimators = {}
+        self.spilled = {}
+        self.predictions = {}
+        self.leaderboard = None
+        self.data_report = None
+        self.holdout = None
+        self.training = None
+        self.prepared_as = ('float64', 'C')
+        self.trained = {}
+        self.mode = mode
+
+    def _spill(self, estimator) -> Spilled:
+        import joblib
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f'{uuid.uuid4().hex}.joblib')
+        try:
+            joblib.dump(estimator, path)
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        return Spilled(path)
+
+    def pack(self, estimator):
+        """
+        It is called where the model was fitted, possibly in a worker process, and returns what should be handed back
+        for it: the estimator, a Spilled when the policy may evict it and there is a spill_dir, or None when nothing
+        is kept. Spilling in the worker means the fitted models never all sit in the memory of the main process
+        """
+        if estimator is None or self.keep == 'all':
+            return estimator
+        if self.spill_dir is not None:
+            try:
+                return self._spill(estimator)
+            except Exception:
+                # e.g. a text pipeline holding a lambda, it is handled as if there was no spill_dir
+                pass
+        if self.keep == 'none':
+            return None
+        return estimator
+
+    @staticmethod
+    def discard(packed) -> None:
+        """
+        It throws away what pack returned for a model that is not added to the store, e.g. a model of a racing round,
+        deleting its file if it was spilled
+        """
+        if isinstance(packed, Spilled) and os.path.exists(packed.path):
+            os.remove(packed.path)
+
+    def add(self, name: str, estimator, test=None, train=None, rows: int = None) -> None:
+        """
+        It keeps a fitted estimator and its predictions, in place of the one kept for the model before if any
+
+        :param name: the name of the model in the leaderboard
+        :param estimator: the fitted estimator or the fitted pipeline for text data, a Spilled or None, see pack
+        :param test: the predictions on the test data
+        :param train: the predictions on the training data
+        :param rows: the rows the estimator was trained on when it was just trained, its time and rows are then kept
+        in trained for update
+        """
+        previous = self.spilled.pop(name, None)
+        if previous is not None and not (isinstance(estimator, Spilled) and estimator.path == previous) \
+                and os.path.exists(previous):
+            os.remove(previous)
+        self.estimators.pop(name, None)
+        if rows is not None:
+            self.trained[name] = (time.time(), rows)
+
+        if isinstance(estimator, Spilled):
+            self.spilled[name] = estimator.path
+        elif estimator is not None:
+            self.estimators[name] = estimator
+        self.predictions[name] = (test, train)
+
+    def retain(self, ranking: list) -> None:
+        """
+        It applies the keep policy once the leaderboard is known: the models that are not kept in memory are spilled
+        to spill_dir or dropped, and the spilled models that are kept are loaded back
+
+        :param ranking: the model names from the best to the worst on the leaderboard metric
+        """
+        import joblib
+
+        if self.keep == 'all':
+            return
+        if self.keep == 'top_k':
+            kept = set(ranking[:self.top_k])
+        else:
+            kept = set()
+
+        for name in [name for name in self.estimators if name not in kept]:
+            estimator = self.estimators.pop(name)
+            if self.spill_dir is not None:
+                try:
+                    self.spilled[name] = self._spill(estimator).path
+                except Exception:
+                    pass
+
+        for name in [name for name in self.spilled if name in kept]:
+            path = self.spilled.pop(name)
+            self.estimators[name] = joblib.load(path)
+            os.remove(path)
+
+    def estimator(self, name: str):
+        """
+        It returns the fitted estimator of a model, loading it from spill_dir if it was spilled, or None if the last
+        fit did not keep one for it
+        """
+        if name in self.estimators:
+            return self.estimators[name]
+        if name in self.spilled:
+            import joblib
+
+            return joblib.load(self.spilled[name])
+        return None
+
+    def names(self) -> list:
+        return list(self.estimators) + [name for name in self.spilled if name not in self.estimators]
+
+    def memory_report(self) -> pd.DataFrame:
+        """
+        It returns the resident memory held by every retained model and the size of the spilled ones on disk, in MB
+        """
+        rows = {}
+        for name in self.names():
+            if name in self.estimators:
+                rows[name] = ['memory', estimate_size(self.estimators[name]) / 2 ** 20]
+            else:
+                rows[name] = ['disk', os.path.getsize(self.spilled[name]) / 2 ** 20]
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['Location', 'Size (MB)'])
+
+    def memory_usage(self) -> int:
+        """
+        It returns the resident memory in bytes held by the models kept in memory and by the stored predictions
+        """
+        seen = {}
+        return sum(estimate_size(estimator, seen) for estimator in self.estimators.values()) + \
+            estimate_size(self.predictions, seen)
+
+    def plot_data(self, param=None, kf: bool = False, t_split: bool = False) -> tuple:
+        """
+        It returns the (leaderboard, kf, t_split) that visualize and show plot from. When no leaderboard is passed the
+        one of the last fit is used, and kf and t_split are taken from that fit unless one of them is set
+
+        :param param: a leaderboard returned by fit, defaults to the leaderboard of the last fit
+        :param kf: set to True if the leaderboard comes from KFold
+        :param t_split: set to True if the leaderboard comes from the split method
+        """
+        if param is not None:
+            return param, kf, t_split
+
+        if self.leaderboard is None:
+            raise Exception('There is no leaderboard to plot, call fit first or pass its result to param.')
+
+        if kf is False and t_split is False:
+            kf, t_split = self.mode == 'kf', self.mode == 'split'
+        # visualize and show add a column to the leaderboard, the stored one is left as it is
+        return self.leaderboard.copy(), kf, t_split
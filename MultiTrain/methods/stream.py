@@ -0,0 +1,231 @@
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from MultiTrain.methods.metrics import scores_from_confusion
+from MultiTrain.methods.prepare import prepare_data, prepare_target
+
+logger = logging.getLogger(__name__)
+
+# the rows read from a CSV or Parquet file at a time when fit_stream is given a path
+CHUNK_SIZE = 10_000
+
+_PARQUET = ('.parquet', '.pq')
+
+
+def _parquet_batches(path: str, chunk_size: int, columns: list = None):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError('reading a Parquet file in chunks needs pyarrow, install it with pip install pyarrow') \
+            from error
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def _frames(path: str, chunk_size: int, columns: list = None):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    if extension in _PARQUET:
+        return _parquet_batches(path, chunk_size, columns)
+    raise ValueError(f'only CSV and Parquet files can be streamed, got {path}')
+
+
+def read_chunks(source, target: str = None, chunk_size: int = CHUNK_SIZE):
+    """
+    It yields the (X, y) chunks of a stream, only one chunk is held in memory at a time
+
+    :param source: the path of a CSV or Parquet file, or an iterable of (X, y) chunks or of dataframes holding the
+    target column
+    :param target: the name of the target column of a file or of the dataframes of source
+    :param chunk_size: the number of rows read from a file at a time
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if target is None:
+            raise ValueError('target, the name of the label column, is needed to stream a file')
+        source = _frames(os.fspath(source), chunk_size)
+
+    for chunk in source:
+        if isinstance(chunk, pd.DataFrame):
+            if target is None:
+                raise ValueError('target, the name of the label column, is needed to stream dataframes')
+            yield chunk.drop(columns=target), chunk[target]
+        else:
+            X, y = chunk
+            yield X, y
+
+
+def scan_labels(path: str, target: str, chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """
+    It reads only the target column of a CSV or Parquet file and returns its sorted labels, the classes partial_fit
+    needs before the first chunk
+    """
+    labels = set()
+    for frame in _frames(os.fspath(path), chunk_size, columns=[target]):
+        labels.update(pd.unique(frame[target]))
+    return np.array(sorted(labels))
+
+
+def holdout_mask(n_rows: int, test_size: float, seed: int, chunk: int) -> np.ndarray:
+    """
+    It returns the rows of a chunk that are held out, drawn from the seed and the position of the chunk so that the
+    same rows are held out every time a file is read
+    """
+    return np.random.default_rng([seed, chunk]).random(n_rows) < test_size
+
+
+def prepared_chunks(source, target: str = None, chunk_size: int = CHUNK_SIZE, dtype: str = 'float64',
+                    target_dtype: str = None, test_size: float = None, seed: int = None, held_out: bool = False):
+    """
+    It yields the (X, y) chunks of a stream converted once for all the models, see prepare_data. With a test_size
+    only the rows of every chunk that are not held out are yielded, or only the held out ones when held_out is True,
+    see holdout_mask. Chunks left without rows are passed over
+
+    :param target_dtype: the dtype of y, e.g. float64 for the values of a regression
+    """
+    for k, (X, y) in enumerate(read_chunks(source, target, chunk_size)):
+        (X,), _ = prepare_data([X], dtype)
+        y = prepare_target(y, target_dtype)
+        if test_size is not None:
+            rows = holdout_mask(len(y), test_size, seed, k)
+            rows = rows if held_out is True else ~rows
+            X, y = X[rows], y[rows]
+        if len(y):
+            yield X, y
+
+
+def train_stream(models: list, chunks, fit, tally=None) -> tuple:
+    """
+    It feeds every chunk to every model in turn, so the stream is read once whatever the number of models, and returns
+    (the seconds every model spent in fit, the positions of the models that failed, the rows trained on). A model that
+    fails on a chunk is left out of the chunks that follow
+
+    :param models: the models of the stream
+    :param chunks: the (X, y) chunks, see prepared_chunks
+    :param fit: a function of (model, X, y) that trains the model on a chunk, e.g. calling its partial_fit
+    :param tally: a tally the predictions of every model on the chunk it was just trained on are added to
+    """
+    elapsed, failed, rows = np.zeros(len(models)), set(), 0
+    for X, y in chunks:
+        for i, model in enumerate(models):
+            if i in failed:
+                continue
+            start = time.time()
+            try:
+                fit(model, X, y)
+                elapsed[i] += time.time() - start
+                if tally is not None:
+                    tally.add(i, y, model.predict(X))
+            except Exception:
+                logger.error(f'{model} has an issue')
+                failed.add(i)
+        rows += len(y)
+    return elapsed, failed, rows
+
+
+def score_stream(models: list, chunks, tally, failed: set) -> None:
+    """
+    It adds the predictions of every model that did not fail on every held-out chunk to the tally, the models that
+    fail to predict are added to failed
+    """
+    for X, y in chunks:
+        for i, model in enumerate(models):
+            if i in failed:
+                continue
+            try:
+                tally.add(i, y, model.predict(X))
+            except Exception:
+                logger.error(f'{model} has an issue')
+                failed.add(i)
+
+
+class ClassificationTally:
+    """
+    It accumulates the confusion matrix of every model over the chunks of a stream, the scores are then exactly the
+    ones of the whole stream while only a chunk of predictions is held at a time
+
+    :param n_models: the number of models of the stream
+    :param classes: the sorted labels of the stream
+    """
+
+    def __init__(self, n_models: int, classes):
+        self.classes = np.asarray(classes)
+        self.matrices = np.zeros((n_models, len(self.classes), len(self.classes)), dtype=np.int64)
+
+    def _codes(self, labels) -> np.ndarray:
+        labels = np.asarray(labels).ravel()
+        codes = np.searchsorted(self.classes, labels)
+        codes = np.minimum(codes, len(self.classes) - 1)
+        if (self.classes[codes] != labels).any():
+            raise ValueError(f'the stream has labels that are not in classes {list(self.classes)}')
+        return codes
+
+    def add(self, model: int, y, pred) -> None:
+        n_labels = len(self.classes)
+        index = self._codes(y) * n_labels + self._codes(pred)
+        self.matrices[model] += np.bincount(index, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+
+    def scores(self, average: str) -> dict:
+        """
+        It returns the scores of every model, see scores_from_confusion
+        """
+        return scores_from_confusion(self.matrices, self.classes, average)
+
+
+class RegressionTally:
+    """
+    It accumulates the error sums of every model over the chunks of a stream, the scores are then the ones of the
+    whole stream while only a chunk of predictions is held at a time. The median absolute error needs every error at
+    once and is left empty
+
+    :param n_models: the number of models of the stream
+    """
+
+    def __init__(self, n_models: int):
+        self.count = np.zeros(n_models)
+        self.mean = np.zeros(n_models)
+        self.spread = np.zeros(n_models)
+        self.absolute = np.zeros(n_models)
+        self.squared = np.zeros(n_models)
+        self.percentage = np.zeros(n_models)
+        self.log_squared = np.zeros(n_models)
+        self.log_valid = np.ones(n_models, dtype=bool)
+
+    def add(self, model: int, y, pred) -> None:
+        y = np.asarray(y, dtype=np.float64).ravel()
+        pred = np.asarray(pred, dtype=np.float64).ravel()
+        error = np.abs(pred - y)
+        self.absolute[model] += error.sum()
+        self.squared[model] += np.square(error).sum()
+        self.percentage[model] += (error / np.maximum(np.abs(y), np.finfo(np.float64).eps)).sum()
+        if self.log_valid[model] and (y > -1).all() and (pred > -1).all():
+            self.log_squared[model] += np.square(np.log1p(pred) - np.log1p(y)).sum()
+        else:
+            self.log_valid[model] = False
+
+        # the spread of the true values around their mean is merged chunk by chunk, see Chan et al.
+        n, mean = len(y), y.mean() if len(y) else 0.0
+        total = self.count[model] + n
+        if total > 0:
+            delta = mean - self.mean[model]
+            self.spread[model] += np.square(y - mean).sum() + delta ** 2 * self.count[model] * n / total
+            self.mean[model] += delta * n / total
+        self.count[model] = total
+
+    def scores(self) -> dict:
+        """
+        It returns the scores of every model, see regression_score_matrix
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            count = np.where(self.count > 0, self.count, np.nan)
+            r2 = np.where(self.spread > 0, 1 - self.squared / np.where(self.spread > 0, self.spread, 1),
+                          np.where(self.squared == 0, 1.0, 0.0))
+            r2[self.count < 2] = np.nan
+            return {'mae': self.absolute / count, 'rmse': np.sqrt(self.squared / count), 'r2': r2,
+                    'rmsle': np.where(self.log_valid, np.sqrt(self.log_squared / count), np.nan),
+                    'medae': np.full(len(self.count), np.nan), 'mape': self.percentage / count}
@@ -0,0 +1,27 @@
+import time
+
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+# the vectorizers that turn the documents of a text run into a document-term matrix, by the name of the vectorizer
+# argument
+VECTORIZERS = {'count': CountVectorizer, 'tfidf': TfidfVectorizer}
+
+
+def vectorize(X_train, X_test, vectorizer: str, ngrams: tuple = None) -> tuple:
+    """
+    It tokenizes the documents and builds the vocabulary on the training documents once, and returns (the fitted
+    vectorizer, the sparse document-term matrix of the training documents, the one of the test documents, the time
+    taken in seconds). Every model of a text run is fitted on these matrices instead of vectorizing the corpus again
+    in a pipeline of its own
+
+    :param vectorizer: 'count' or 'tfidf', see VECTORIZERS
+    :param ngrams: the ngram_range of the vectorizer, defaults to (1, 1)
+    """
+    if vectorizer not in VECTORIZERS:
+        raise ValueError(f'vectorizer should be one of {list(VECTORIZERS)} when text is True, got {vectorizer}')
+
+    start = time.time()
+    fitted = VECTORIZERS[vectorizer](ngram_range=(1, 1) if ngrams is None else ngrams)
+    matrix_train = fitted.fit_transform(X_train)
+    matrix_test = fitted.transform(X_test)
+    return fitted, matrix_train, matrix_test, time.time() - start
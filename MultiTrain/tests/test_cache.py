@@ -0,0 +1,46 @@
+from MultiTrain.methods.cache import estimator_fingerprint, fingerprint
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+class TestCache(unittest.TestCase):
+
+    def test_fingerprint(self):
+        X = pd.DataFrame({'a': np.arange(5.0), 'b': list('vwxyz')})
+        self.assertEqual(fingerprint(X), fingerprint(X.copy()))
+        changed = X.copy()
+        changed.loc[2, 'a'] = 7.0
+        self.assertNotEqual(fingerprint(X), fingerprint(changed))
+        self.assertNotEqual(fingerprint(X['a'].to_numpy()), fingerprint(X['a'].to_numpy(dtype=np.float32)))
+
+        # the thread count does not change the model, its other parameters do
+        self.assertEqual(estimator_fingerprint(Ridge(alpha=2)), estimator_fingerprint(Ridge(alpha=2)))
+        self.assertNotEqual(estimator_fingerprint(Ridge(alpha=2)), estimator_fingerprint(Ridge(alpha=3)))
+
+    def test_only_new_models_are_trained(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        split = train_test_split(X, y - y.min() + 1, test_size=0.2, random_state=1)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=['Ridge'],
+                                                       cache_dir=cache_dir)
+            entries = sum(len(files) for _, _, files in os.walk(cache_dir))
+
+            reg = MultiRegressor(random_state=0)
+            second = reg.fit(splitting=True, split_data=split, include=['Ridge', 'Lasso'], cache_dir=cache_dir)
+            pd.testing.assert_frame_equal(first, second.loc[['Ridge']])
+            self.assertEqual(sum(len(files) for _, _, files in os.walk(cache_dir)), entries + 1)
+            # without cache_models a model served from the cache comes back unfitted
+            self.assertFalse(hasattr(reg.use_model(second, model='Ridge'), 'coef_'))
+            self.assertTrue(hasattr(reg.use_model(second, model='Lasso'), 'coef_'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+from MultiTrain.methods.checkpoint import Journal
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Journal(directory)
+            journal.record('a', 'Ridge', [np.float64(0.5), np.bool_(True), None, 1.25])
+            journal.record('b', 'Lasso', (object(), np.array([1.0, 2.0]), None, 0.5))
+            with open(journal.path, 'a') as file:
+                file.write('{"key": "c", "mod')
+
+            journal = Journal(directory)
+            journal.record('d', 'SVR', [0.1, 2.0])
+            found = journal.lookup({0: 'a', 1: 'b', 2: 'c', 3: 'd'})
+            self.assertEqual(sorted(found), [0, 1, 3])
+            self.assertEqual(found[0], [0.5, True, None, 1.25])
+            np.testing.assert_array_equal(found[1][1], [1.0, 2.0])
+            self.assertEqual((found[1][0], found[1][2], found[1][3]), (None, None, 0.5))
+
+    def test_resume(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        split = train_test_split(X, y - y.min() + 1, test_size=0.2, random_state=1)
+        with tempfile.TemporaryDirectory() as directory:
+            first = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=['Ridge'],
+                                                       checkpoint_dir=directory)
+            second = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=['Ridge', 'Lasso'],
+                                                        checkpoint_dir=directory)
+            pd.testing.assert_frame_equal(first, second.loc[['Ridge']])
+            with open(os.path.join(directory, 'journal.jsonl')) as file:
+                self.assertEqual(len(file.readlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
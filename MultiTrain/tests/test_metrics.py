@@ -0,0 +1,83 @@
+from MultiTrain.methods.metrics import classification_scores, confusion_matrix, regression_score_matrix
+from sklearn import metrics
+
+import numpy as np
+import unittest
+import warnings
+
+
+def reference(true, pred, average):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        scores = {'accuracy': metrics.accuracy_score(true, pred),
+                  'balanced_accuracy': metrics.balanced_accuracy_score(true, pred),
+                  'r2': metrics.r2_score(true, pred),
+                  'f1': metrics.f1_score(true, pred, average=average),
+                  'precision': metrics.precision_score(true, pred, average=average),
+                  'recall': metrics.recall_score(true, pred, average=average)}
+        try:
+            scores['roc_auc'] = metrics.roc_auc_score(true, pred)
+        except ValueError:
+            scores['roc_auc'] = None
+    return scores
+
+
+def regression_reference(true, pred):
+    scores = {'mae': metrics.mean_absolute_error(true, pred),
+              'rmse': np.sqrt(metrics.mean_squared_error(true, pred)),
+              'r2': metrics.r2_score(true, pred),
+              'medae': metrics.median_absolute_error(true, pred),
+              'mape': metrics.mean_absolute_percentage_error(true, pred)}
+    # mean_squared_log_error refuses values that are not above -1, rmsle is NaN for them
+    scores['rmsle'] = np.sqrt(metrics.mean_squared_log_error(true, pred)) if (pred > -1).all() else np.nan
+    return scores
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_confusion_matrix(self):
+        true, pred = np.array([3, 1, 1, 7, 3]), np.array([3, 3, 1, 7, 1])
+        matrix, labels = confusion_matrix(true, pred)
+        np.testing.assert_array_equal(labels, [1, 3, 7])
+        np.testing.assert_array_equal(matrix, metrics.confusion_matrix(true, pred))
+
+        matrix, labels = confusion_matrix(['b', 'a', 'c'], ['a', 'a', 'c'])
+        np.testing.assert_array_equal(labels, ['a', 'b', 'c'])
+        np.testing.assert_array_equal(matrix, [[1, 0, 0], [1, 0, 0], [0, 0, 1]])
+
+    def test_scores(self):
+        rng = np.random.default_rng(0)
+        for n_classes, average in [(2, 'binary'), (4, 'macro'), (4, 'micro')]:
+            for _ in range(20):
+                true = rng.integers(0, n_classes, 50)
+                pred = np.where(rng.random(50) < 0.7, true, rng.integers(0, n_classes, 50))
+                scores = classification_scores(true, pred, average=average)
+                for key, value in reference(true, pred, average).items():
+                    if value is None:
+                        self.assertIsNone(scores[key])
+                    else:
+                        self.assertAlmostEqual(scores[key], value, msg=key)
+
+    def test_regression_scores(self):
+        rng = np.random.default_rng(0)
+        # a constant true has no spread, r2 is then 1 for the exact predictions and 0 for the others
+        for true in [2 + rng.random(40) * 10, np.full(40, 3.0)]:
+            # a stack of predictions, one of them with values not above -1 and one exactly the true values
+            preds = np.vstack([true + rng.normal(0, 0.5, (8, 40)), true - 20, true])
+            scores = regression_score_matrix(true, preds)
+            self.assertEqual(sorted(scores), ['mae', 'mape', 'medae', 'r2', 'rmse', 'rmsle'])
+            self.assertTrue(np.isnan(scores['rmsle'][-2]))
+            for row, pred in enumerate(preds):
+                for key, value in regression_reference(true, pred).items():
+                    if np.isnan(value):
+                        self.assertTrue(np.isnan(scores[key][row]), msg=key)
+                    else:
+                        self.assertAlmostEqual(scores[key][row], value, msg=key)
+
+    def test_binary_pos_label(self):
+        with self.assertRaises(ValueError):
+            classification_scores([0, 2, 2], [0, 2, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+from MultiTrain.classification.classification_models import MultiClassifier
+from MultiTrain.methods.aio import LeaderboardPool
+from MultiTrain.methods.folds import fold_data, fold_indices, gather_folds
+from MultiTrain.methods.parallel import TimedOut, run_tasks, worker_count
+from MultiTrain.methods.scheduler import core_budget, set_threads
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_classification, make_regression
+from sklearn.ensemble import BaggingClassifier, RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+import asyncio
+import multiprocessing
+import numpy as np
+import os
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+
+def square(value):
+    return value * value
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def process_id(_):
+    return os.getpid()
+
+
+def dying(split_model):
+    # the worker of a KNeighbors model dies without sending a result, the other models are fitted as usual
+    def dying_split_model(self, model, *args, **kwargs):
+        if type(model).__name__.startswith('KNeighbors'):
+            os._exit(1)
+        return split_model(self, model, *args, **kwargs)
+    return dying_split_model
+
+
+def crash(value):
+    if value == 2:
+        # the worker dies without sending a result, as when it is killed for running out of memory
+        os._exit(1)
+    if value == 3:
+        raise ValueError('not a value')
+    return value
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_worker_count(self):
+        self.assertEqual(worker_count(None), os.cpu_count() or 1)
+        self.assertEqual(worker_count(8, n_tasks=3), 3)
+        self.assertEqual(worker_count(0), 1)
+
+    def test_run_tasks(self):
+        results = dict(run_tasks(square, [(i, (i,)) for i in range(6)], n_workers=2))
+        self.assertEqual(results, {i: i * i for i in range(6)})
+
+    def test_run_tasks_workers(self):
+        # the workers are started once and run task after task
+        results = dict(run_tasks(process_id, [(i, (i,)) for i in range(8)], n_workers=2))
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(len(set(results.values())), 2)
+        self.assertNotIn(os.getpid(), results.values())
+
+    def test_run_tasks_failure(self):
+        results = dict(run_tasks(crash, [(i, (i,)) for i in range(6)], n_workers=2))
+        # the failed tasks yield None and the others still finish
+        self.assertEqual(results, {0: 0, 1: 1, 2: None, 3: None, 4: 4, 5: 5})
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_run_tasks_abandoned(self):
+        # a run left suspended with its workers waiting for tasks does not keep the interpreter from exiting
+        code = ('from operator import neg\n'
+                'from MultiTrain.methods.parallel import run_tasks\n'
+                'outcome = run_tasks(neg, [(i, (i,)) for i in range(4)], n_workers=2)\n'
+                'next(outcome)\n')
+        subprocess.run([sys.executable, '-c', code], timeout=60, check=True)
+
+    def test_run_tasks_timeout(self):
+        start = time.monotonic()
+        # the worker of the slow task is killed and a new one runs the fast task
+        results = dict(run_tasks(nap, [('slow', (30,)), ('fast', (0,))], n_workers=1, timeout=1))
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(results['fast'], 0)
+        self.assertIsInstance(results['slow'], TimedOut)
+        self.assertGreaterEqual(results['slow'].elapsed, 1)
+
+    def test_run_tasks_deadline(self):
+        tasks = [('fast', (0,)), ('slow', (30,)), ('never', (0,))]
+        results = dict(run_tasks(nap, tasks, n_workers=1, deadline=time.monotonic() + 2))
+        self.assertEqual(results['fast'], 0)
+        self.assertIsInstance(results['slow'], TimedOut)
+        self.assertNotIn('never', results)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    @mock.patch('os.cpu_count', return_value=8)
+    def test_core_budget(self, _):
+        self.assertEqual(core_budget(8, n_tasks=30), (8, 1))
+        self.assertEqual(core_budget(8, n_tasks=4), (4, 2))
+        self.assertEqual(core_budget(8, n_tasks=30, n_workers=2), (2, 4))
+        self.assertEqual(core_budget(-1, n_tasks=3), (3, 2))
+        self.assertEqual(core_budget(64, n_tasks=30), (8, 1))
+
+    def test_set_threads(self):
+        model = set_threads(BaggingClassifier(RandomForestClassifier(n_jobs=-1), n_jobs=-1), 2)
+        self.assertEqual(model.n_jobs, 2)
+        self.assertEqual(model.estimator.n_jobs, 2)
+
+    def test_fold_indices(self):
+        y = np.array([0] * 80 + [1] * 20)
+        indices = fold_indices(np.zeros((100, 2)), y, 5, stratify=True)
+        self.assertEqual(len(indices), 5)
+        for train, test in indices:
+            self.assertEqual(train.dtype, np.int32)
+            self.assertEqual(y[test].sum(), 4)
+        X_train, y_train, X_test, y_test = fold_data(np.arange(100), y, indices)[0]
+        np.testing.assert_array_equal(X_test, indices[0][1])
+        self.assertEqual(len(y_train), 80)
+
+    def test_gather_folds(self):
+        outcome = [((0, 1), ({'test_r2': np.array([0.5])}, 1.0)), ((1, 0), (None, 0.5)),
+                   ((0, 0), ({'test_r2': np.array([0.7])}, 2.0)), ((1, 1), TimedOut(3.0)),
+                   ((2, 0), ({'test_r2': np.array([0.1])}, 1.0))]
+        rows = list(gather_folds(outcome, 2, lambda scores, seconds: [None if scores is None else
+                                                                      scores['test_r2'].tolist(), seconds]))
+        # a row as soon as the last fold of a model is done with its folds in order, or as soon as one of its folds
+        # fails, nothing for unfinished models
+        self.assertEqual(rows[0], (1, [None, 0.5]))
+        self.assertEqual(rows[1], (0, [[0.7, 0.5], 3.0]))
+        self.assertEqual(len(rows), 2)
+
+    def test_fit_iter(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        split = train_test_split(X, y - y.min() + 1, test_size=0.2, random_state=1)
+        reg = MultiRegressor(random_state=0)
+        records = list(reg.fit_iter(splitting=True, split_data=split, include=['Ridge', 'Lasso', 'DummyRegressor']))
+
+        self.assertEqual(sorted(record['model'] for record in records), ['DummyRegressor', 'Lasso', 'Ridge'])
+        # every record has the scores the leaderboard built at the end has for the model
+        for record in records:
+            self.assertEqual(record['status'], 'completed')
+            self.assertAlmostEqual(record['scores']['r2 score'], reg.store.leaderboard.loc[record['model'], 'r2 score'])
+
+        # breaking out of the stream stops the run without a leaderboard
+        for _ in reg.fit_iter(splitting=True, split_data=split, include=['Ridge', 'Lasso']):
+            break
+        self.assertIsNone(reg.store.leaderboard)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_fit_failure(self):
+        # a KNeighbors model fitted on fewer rows than its neighbors fails to predict and gets an empty row
+        X, y = make_regression(n_samples=40, n_features=4, random_state=0)
+        y = y - y.min() + 1
+        reg = MultiRegressor(random_state=0)
+        records = list(reg.fit_iter(splitting=True, split_data=(X[:4], X[4:], y[:4], y[4:]),
+                                    include=['Ridge', 'KNeighborsRegressor'], parallel=False))
+        self.assertEqual({record['model']: record['status'] for record in records},
+                         {'Ridge': 'completed', 'KNeighborsRegressor': 'failed'})
+        self.assertTrue(np.isnan(reg.store.leaderboard.loc['KNeighborsRegressor', 'r2 score']))
+        self.assertFalse(np.isnan(reg.store.leaderboard.loc['Ridge', 'r2 score']))
+
+        X, y = make_classification(n_samples=40, n_features=4, random_state=0)
+        clf = MultiClassifier(random_state=0)
+        records = list(clf.fit_iter(splitting=True, split_data=(X[:4], X[4:], np.array([0, 1, 0, 1]), y[4:]),
+                                    include=['Logistic Regression', 'KNeighborsClassifier'], parallel=False))
+        self.assertEqual({record['model']: record['status'] for record in records},
+                         {'Logistic Regression': 'completed', 'KNeighborsClassifier': 'failed'})
+        self.assertTrue(np.isnan(clf.store.leaderboard.loc['KNeighborsClassifier', 'Accuracy']))
+        self.assertFalse(np.isnan(clf.store.leaderboard.loc['Logistic Regression', 'Accuracy']))
+
+    def test_fit_worker_failure(self):
+        X, y = make_regression(n_samples=40, n_features=4, random_state=0)
+        split = (X[:30], X[30:], y[:30] - y.min() + 1, y[30:] - y.min() + 1)
+        with mock.patch.object(MultiRegressor, '_split_model', dying(MultiRegressor._split_model)):
+            df = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, parallel=True,
+                                                    include=['Ridge', 'KNeighborsRegressor'], max_time_per_model=60)
+        # the model whose worker failed gets an empty row, no time and a 'failed' Status
+        self.assertEqual(df.loc['KNeighborsRegressor', 'Status'], 'failed')
+        self.assertTrue(df.loc['KNeighborsRegressor'].drop('Status').isna().all())
+        self.assertEqual(df.loc['Ridge', 'Status'], 'completed')
+
+        X, y = make_classification(n_samples=40, n_features=4, random_state=0)
+        split = (X[:30], X[30:], y[:30], y[30:])
+        clf = MultiClassifier(random_state=0)
+        with mock.patch.object(MultiClassifier, '_split_model', dying(MultiClassifier._split_model)):
+            records = list(clf.fit_iter(splitting=True, split_data=split, parallel=True,
+                                        include=['Logistic Regression', 'KNeighborsClassifier']))
+        self.assertEqual({record['model']: record['status'] for record in records},
+                         {'Logistic Regression': 'completed', 'KNeighborsClassifier': 'failed'})
+        self.assertTrue(np.isnan(clf.store.leaderboard.loc['KNeighborsClassifier', 'execution time(seconds)']))
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_afit(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        split = train_test_split(X, y - y.min() + 1, test_size=0.2, random_state=1)
+        pool = LeaderboardPool(n_workers=2)
+
+        async def runs():
+            # two leaderboards at once on the workers of one pool
+            return await asyncio.gather(*[MultiRegressor(random_state=0).afit(
+                pool, splitting=True, split_data=split, include=['Ridge', 'Lasso']) for _ in range(2)])
+
+        first, second = asyncio.run(runs())
+        pool.shutdown()
+        self.assertEqual(sorted(first.index), ['Lasso', 'Ridge'])
+        self.assertTrue(first.drop(columns='Time Taken(s)').equals(second.drop(columns='Time Taken(s)')))
+        self.assertEqual(multiprocessing.active_children(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from MultiTrain.methods.prepare import prepare_data, prepare_target
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import unittest
+
+
+class TestPrepare(unittest.TestCase):
+
+    def test_prepare_data(self):
+        X = pd.DataFrame(np.arange(60).reshape(20, 3))
+        (X_train, X_test), report = prepare_data([X[:15], X[15:]], 'float32', 'F', n_workers=4)
+        self.assertEqual((X_train.dtype, X_train.flags['F_CONTIGUOUS'], X_test.shape), (np.float32, True, (5, 3)))
+        self.assertEqual(report['dtype'], 'float32')
+        self.assertGreater(report['peak saved MB'], 0)
+
+        # integers above 2 ** 24 are not held exactly by float32
+        (X_train,), report = prepare_data([np.array([[2 ** 25 + 1.0]])], 'float32')
+        self.assertEqual((X_train.dtype, report['dtype']), (np.float64, 'float64'))
+
+        # other values are rounded, float32 is lossy
+        X = np.array([[0.1, 1.23456789012345]])
+        (X_train,), report = prepare_data([X], 'float32')
+        self.assertEqual(report['dtype'], 'float32')
+        self.assertFalse(np.array_equal(X_train, X))
+
+        (X_train,), _ = prepare_data([sp.random(10, 4, density=0.5, format='csr')], 'float32', 'F')
+        self.assertEqual((X_train.format, X_train.dtype), ('csc', np.float32))
+        self.assertIsNone(prepare_data([pd.DataFrame({'a': ['x', 'y']})])[1])
+        with self.assertRaises(ValueError):
+            prepare_data([X], 'float16')
+
+        self.assertEqual(prepare_target(pd.DataFrame({'y': [1, 2]}), 'float64').shape, (2,))
+
+    def test_prepared_fit(self):
+        X, y = make_regression(200, 5, random_state=0)
+        split = train_test_split(pd.DataFrame(X), pd.Series(y), random_state=0)
+        reg = MultiRegressor(random_state=0)
+        df = reg.fit(splitting=True, split_data=split, include=['Ridge', 'DecisionTreeRegressor'], dtype='float32')
+        self.assertEqual(reg.store.data_report['dtype'], 'float32')
+        self.assertGreater(df.loc['Ridge', 'r2 score'], 0.9)
+
+        # a single feature given as a series is one column of the prepared data
+        split = train_test_split(pd.Series(X[:, 0]), pd.Series(X[:, 0] * 2), random_state=0)
+        df = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=['Ridge'])
+        self.assertGreater(df.loc['Ridge', 'r2 score'], 0.99)
+
+
+if __name__ == '__main__':
+    unittest.main()
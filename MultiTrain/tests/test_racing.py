@@ -0,0 +1,66 @@
+from MultiTrain.methods.racing import hopeless, race_schedule, sample_order
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import unittest
+
+
+class TestRacing(unittest.TestCase):
+
+    def test_race_schedule(self):
+        self.assertEqual(race_schedule(30, 27000, factor=3), [1000, 3000, 9000])
+        # never fewer rows than MIN_RACE_SAMPLES, so small data has fewer rounds
+        self.assertEqual(race_schedule(30, 300, factor=3), [50, 150])
+        self.assertEqual(race_schedule(2, 27000, factor=3), [])
+
+    def test_sample_order(self):
+        y = np.array([0] * 900 + [1] * 100)
+        order = sample_order(y, random_state=0, stratify=True)
+        self.assertEqual(sorted(order), list(range(1000)))
+        # every prefix holds the classes in the proportions of the whole data
+        self.assertEqual(y[order[:100]].sum(), 10)
+        self.assertEqual(y[order[:250]].sum(), 25)
+
+    def test_racing(self):
+        X, y = make_regression(n_samples=1500, n_features=6, noise=5, random_state=0)
+        split = train_test_split(X, y, test_size=0.2, random_state=1)
+        include = ['Ridge', 'Lasso', 'DummyRegressor', 'DecisionTreeRegressor', 'KNeighborsRegressor']
+        reg = MultiRegressor(random_state=0)
+        records = list(reg.fit_iter(splitting=True, split_data=split, include=include, racing=True))
+        df = reg.store.leaderboard
+
+        self.assertEqual(sorted(df.index), sorted(include))
+        trained = df[df['Rows Trained'] == 1200].index
+        self.assertEqual(sorted(trained), ['Lasso', 'Ridge'])
+        self.assertEqual(sorted(reg.store.names()), ['Lasso', 'Ridge'])
+        self.assertEqual(sorted(record['model'] for record in records if record['status'] == 'eliminated'),
+                         ['DecisionTreeRegressor', 'DummyRegressor', 'KNeighborsRegressor'])
+
+    def test_hopeless(self):
+        scores = {0: [0.90, 0.80, 0.85], 1: [0.70, 0.61, 0.66], 2: [0.91, 0.78, 0.86]}
+        # 1 trails the leader by the same gap on every fold, 2 is sometimes ahead of it
+        self.assertEqual(hopeless(scores), [1])
+        self.assertEqual(hopeless({0: [0.9], 1: [0.1]}), [])
+        # the same scores on two small folds leave no spread to the gap, nothing is dropped before MIN_RACE_FOLDS
+        self.assertEqual(hopeless({0: [0.9, 0.9], 1: [0.8, 0.8]}), [])
+        self.assertEqual(hopeless({0: [0.9, 0.9], 1: [0.8, 0.8]}, min_folds=2), [1])
+
+    def test_early_stopping(self):
+        X, y = make_regression(n_samples=400, n_features=6, noise=5, random_state=0)
+        y = y - y.min() + 1
+        include = ['Ridge', 'Lasso', 'DummyRegressor']
+        reg = MultiRegressor(random_state=0)
+        df = reg.fit(kf=True, X=X, y=y, fold=10, include=include, early_stopping=True)
+
+        self.assertEqual(sorted(df.index), sorted(include))
+        self.assertEqual(df.loc['Ridge', 'Folds Run'], 10)
+        self.assertLess(df.loc['DummyRegressor', 'Folds Run'], 10)
+        # the rows of the models that ran every fold are the ones of a plain KFold run
+        plain = MultiRegressor(random_state=0).fit(kf=True, X=X, y=y, fold=10, include=['Ridge'])
+        self.assertAlmostEqual(df.loc['Ridge', 'r2'], plain.loc['Ridge', 'r2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+from MultiTrain.classification.classification_models import CLASSIFIERS
+from MultiTrain.regression.regression_models import REGRESSORS
+from MultiTrain.methods.scheduler import cost_order
+
+import unittest
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_select(self):
+        self.assertEqual(len(CLASSIFIERS.select()), len(CLASSIFIERS))
+        self.assertEqual([spec.name for spec in REGRESSORS.select(include=['Ridge', 'Lasso'])], ['Ridge', 'Lasso'])
+        self.assertNotIn('SVR', [spec.name for spec in REGRESSORS.select(exclude=['SVR'])])
+        self.assertTrue(all(spec.partial_fit for spec in CLASSIFIERS.select(requires=['partial_fit'])))
+
+    def test_unknown_name(self):
+        with self.assertRaises(Exception):
+            REGRESSORS.select(include=['Ridge', 'Rigde'])
+        with self.assertRaises(ValueError):
+            CLASSIFIERS.select(requires=['gpu'])
+
+    def test_build(self):
+        model = REGRESSORS['Random Forest Regressor'].build(n_threads=2, random_state=7)
+        self.assertEqual((model.n_jobs, model.random_state), (2, 7))
+        self.assertNotIn('random_state', REGRESSORS['SVR'].build(random_state=7).get_params())
+
+    def test_cost_order(self):
+        self.assertEqual(cost_order([3, 1, 5, 1]), [1, 3, 0, 2])
+        self.assertEqual(cost_order([3, 1, 5, 1], expensive_first=True), [2, 0, 1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
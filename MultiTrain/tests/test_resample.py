@@ -0,0 +1,55 @@
+from MultiTrain.classification.classification_models import MultiClassifier
+from imblearn.over_sampling import RandomOverSampler
+from sklearn.datasets import make_classification
+from sklearn.model_selection import train_test_split
+
+import unittest
+from unittest import mock
+
+MODELS = ['Logistic Regression', 'DecisionTreeClassifier', 'GaussianNB']
+
+
+def counting():
+    # fit_resample of RandomOverSampler that keeps count of its calls and resamples as usual
+    return mock.patch.object(RandomOverSampler, 'fit_resample', autospec=True,
+                             side_effect=RandomOverSampler.fit_resample)
+
+
+class TestResample(unittest.TestCase):
+
+    def setUp(self):
+        self.X, self.y = make_classification(n_samples=200, n_features=6, weights=[0.85], random_state=0)
+
+    def classifier(self):
+        return MultiClassifier(random_state=0, imbalanced=True, sampling='RandomOverSampler')
+
+    def leaderboards(self, **kwargs):
+        # the leaderboard of all the models at once and the one put together from a run per model
+        with counting() as sampler:
+            df = self.classifier().fit(include=MODELS, parallel=False, **kwargs)
+        alone = [self.classifier().fit(include=[name], parallel=False, **kwargs) for name in MODELS]
+        return sampler.call_count, df, alone
+
+    def assertSameScores(self, df, alone, time):
+        for one in alone:
+            name = one.index[0]
+            self.assertTrue(df.loc[[name]].drop(columns=time).equals(one.drop(columns=time)), msg=name)
+
+    def test_split_resample(self):
+        split = train_test_split(self.X, self.y, test_size=0.25, random_state=0, stratify=self.y)
+        calls, df, alone = self.leaderboards(splitting=True, split_data=split)
+        # the training data is resampled once for all the models
+        self.assertEqual(calls, 1)
+        self.assertEqual(sorted(df.index), sorted(MODELS))
+        self.assertSameScores(df, alone, 'execution time(seconds)')
+
+    def test_kfold_resample(self):
+        calls, df, alone = self.leaderboards(X=self.X, y=self.y, kf=True, fold=3)
+        # every fold is resampled once for all the models
+        self.assertEqual(calls, 3)
+        self.assertEqual(sorted(df.index), sorted(MODELS))
+        self.assertSameScores(df, alone, 'Time Taken(s)')
+
+
+if __name__ == '__main__':
+    unittest.main()
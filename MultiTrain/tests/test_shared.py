@@ -0,0 +1,62 @@
+from MultiTrain.methods.shared import SharedArray, SharedData
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import os
+import pickle
+import scipy.sparse as sp
+import unittest
+from unittest import mock
+
+
+class TestShared(unittest.TestCase):
+
+    def test_share(self):
+        shared = SharedData()
+        X = np.asfortranarray(np.random.default_rng(0).random((500, 20)))
+        S = sp.random(50, 10, density=0.2, format='csr', random_state=0)
+        labels = np.array(['a', 'b'] * 250, dtype=object)
+        views = shared.share({'given': (X, labels, None), 'sparse': [S]})
+
+        X_shared = views['given'][0]
+        self.assertIsInstance(X_shared, SharedArray)
+        self.assertTrue(np.array_equal(X_shared, X) and X_shared.flags['F_CONTIGUOUS'])
+        self.assertFalse(X_shared.flags.writeable)
+        self.assertIs(views['given'][1], labels)
+        self.assertEqual((views['sparse'][0] != S).nnz, 0)
+
+        # a worker is handed the path of the data, not its values
+        self.assertLess(len(pickle.dumps(X_shared)), 1000)
+        self.assertTrue(np.array_equal(pickle.loads(pickle.dumps(X_shared)), X))
+        # a slice of it is pickled by its values
+        self.assertTrue(np.array_equal(pickle.loads(pickle.dumps(X_shared[:10])), X[:10]))
+
+        shared.close()
+        self.assertFalse(os.path.exists(shared.path))
+
+    def test_closed_early(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        split = train_test_split(X, y, test_size=0.2, random_state=1)
+        directory = os.path.dirname(SharedData().path)
+        before = set(os.listdir(directory))
+        # the files of a run are deleted when its stream is closed before the leaderboard
+        for _ in MultiRegressor(random_state=0).fit_iter(splitting=True, split_data=split, include=['Ridge', 'Lasso']):
+            break
+        for _ in MultiRegressor(random_state=0).fit_iter(kf=True, X=X, y=y, fold=3, include=['Ridge', 'Lasso']):
+            break
+        # and when it fails, while the frames of the run are still held by the error
+        error = None
+        with mock.patch('MultiTrain.regression.regression_models.split_leaderboard', side_effect=RuntimeError):
+            try:
+                MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=['Ridge', 'Lasso'])
+            except RuntimeError as raised:
+                error = raised
+        self.assertIsNotNone(error.__traceback__)
+        self.assertEqual({name for name in set(os.listdir(directory)) - before if name.startswith('multitrain-')},
+                         set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+from MultiTrain.methods.sparse import dense_route, densify_split
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import scipy.sparse as sp
+import unittest
+
+
+class TestSparse(unittest.TestCase):
+
+    def test_dense_route(self):
+        X = sp.random(200, 300, density=0.05, format='csr', random_state=0)
+        transformer, reason = dense_route(X[:160], X[160:], 'float32')
+        self.assertIsNone(reason)
+        _, X_train, X_test = densify_split(transformer, X[:160], X[160:])
+        self.assertEqual((X_train.dtype, X_train.shape, X_test.shape), (np.float32, (160, 300), (40, 300)))
+
+        transformer, _ = dense_route(X[:160], X[160:], 'svd')
+        _, X_train, _ = densify_split(transformer, X[:160], X[160:])
+        self.assertEqual(X_train.shape, (160, 100))
+
+        # 200 rows of 300 float32 columns take about 0.23 MB
+        self.assertIsNone(dense_route(X[:160], X[160:], 'float32', limit_mb=0.2)[0])
+        self.assertIsNone(dense_route(X[:160], X[160:], 'skip')[0])
+        with self.assertRaises(ValueError):
+            dense_route(X[:160], X[160:], 'float64')
+
+    def test_sparse_fit(self):
+        X = sp.random(300, 40, density=0.2, format='csr', random_state=0)
+        y = X @ np.arange(40) + 1.0
+        split = train_test_split(X, y, test_size=0.25, random_state=1)
+        include = ['Ridge', 'BayesianRidge']
+
+        reg = MultiRegressor(random_state=0)
+        df = reg.fit(splitting=True, split_data=split, include=include)
+        # the dense only model is fitted on a dense copy and handed out behind it
+        self.assertGreater(df.loc['BayesianRidge', 'r2 score'], 0.9)
+        self.assertEqual(len(reg.use_model(df, 'BayesianRidge').predict(split[1])), split[1].shape[0])
+
+        df = MultiRegressor(random_state=0).fit(splitting=True, split_data=split, include=include,
+                                                dense_policy='skip')
+        self.assertEqual(df.loc['BayesianRidge', 'Status'], 'skipped')
+        self.assertEqual(df.loc['Ridge', 'Status'], 'completed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_regression
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        X, y = make_regression(n_samples=100, n_features=4, random_state=0)
+        self.split = train_test_split(pd.DataFrame(X), pd.Series(y - y.min() + 1), test_size=0.2, random_state=1)
+
+    def test_use_model_returns_fitted(self):
+        reg = MultiRegressor(random_state=0)
+        df = reg.fit(splitting=True, split_data=self.split, include=['Ridge', 'Lasso'])
+        self.assertEqual(reg.store.names(), ['Ridge', 'Lasso'])
+
+        best = reg.use_model(df, best='r2 score')
+        name = df['r2 score'].idxmax()
+        self.assertIs(best, reg.store.estimator(name))
+        np.testing.assert_allclose(best.predict(self.split[1]), reg.store.predictions[name][0])
+
+    def test_unfitted_without_store(self):
+        reg = MultiRegressor(random_state=0)
+        reg.fit(splitting=True, split_data=self.split, include=['Ridge'])
+        self.assertFalse(hasattr(reg.use_model(None, model='Lasso'), 'coef_'))
+
+    def test_top_k_spills_the_rest(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            reg = MultiRegressor(random_state=0, keep='top_k', top_k=1, spill_dir=spill_dir)
+            df = reg.fit(splitting=True, split_data=self.split, include=['Ridge', 'Lasso', 'DummyRegressor'])
+            report = reg.memory_report()
+            self.assertEqual(list(report.index[report['Location'] == 'memory']), [df['r2 score'].idxmax()])
+            self.assertEqual(len(os.listdir(spill_dir)), 2)
+
+            # a spilled model comes back fitted from disk
+            worst = df['r2 score'].idxmin()
+            np.testing.assert_allclose(reg.use_model(df, model=worst).predict(self.split[1]),
+                                       reg.store.predictions[worst][0])
+
+            reg.store.clear()
+            self.assertEqual(os.listdir(spill_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
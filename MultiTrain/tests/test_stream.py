@@ -0,0 +1,63 @@
+from MultiTrain.classification.classification_models import MultiClassifier
+from MultiTrain.methods.metrics import classification_score_matrix, regression_score_matrix
+from MultiTrain.methods.stream import ClassificationTally, RegressionTally
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_classification, make_regression
+
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+class TestStream(unittest.TestCase):
+
+    def test_tally(self):
+        random = np.random.default_rng(0)
+        y = random.integers(0, 3, 400)
+        preds = np.stack([y, random.integers(0, 3, 400)])
+        tally = ClassificationTally(2, [0, 1, 2])
+        for start in range(0, 400, 70):
+            for i in range(2):
+                tally.add(i, y[start:start + 70], preds[i, start:start + 70])
+        scores, expected = tally.scores('macro'), classification_score_matrix(y, preds, 'macro')
+        for key in ('accuracy', 'f1', 'precision', 'recall', 'r2'):
+            self.assertTrue(np.allclose(scores[key], expected[key]), key)
+
+        values = random.random(400) * 10
+        preds = np.stack([values + random.normal(0, 1, 400), values * 0.5])
+        tally = RegressionTally(2)
+        for start in range(0, 400, 70):
+            for i in range(2):
+                tally.add(i, values[start:start + 70], preds[i, start:start + 70])
+        scores, expected = tally.scores(), regression_score_matrix(values, preds)
+        for key in ('mae', 'rmse', 'r2', 'mape'):
+            self.assertTrue(np.allclose(scores[key], expected[key]), key)
+
+    def test_fit_stream(self):
+        X, y = make_classification(1200, 6, random_state=0)
+        chunks = [(X[start:start + 200], y[start:start + 200]) for start in range(0, 1000, 200)]
+        clf = MultiClassifier(random_state=0, target_class='binary')
+        df = clf.fit_stream(iter(chunks), holdout=[(X[1000:], y[1000:])], classes=[0, 1],
+                            include=['SGDClassifier', 'GaussianNB'])
+        self.assertEqual(list(df['Rows Trained']), [1000, 1000])
+        self.assertGreater(df.loc['GaussianNB', 'Accuracy'], 0.8)
+        self.assertEqual(len(clf.use_model(df, 'SGDClassifier').predict(X[:5])), 5)
+        with self.assertRaises(ValueError):
+            clf.fit_stream(iter(chunks), classes=[0, 1])
+
+        X, y = make_regression(1000, 5, noise=1, random_state=0)
+        data = pd.DataFrame(X, columns=list('abcde')).assign(target=y)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stream.csv')
+            data.to_csv(path, index=False)
+            df = MultiRegressor(random_state=0).fit_stream(path, target='target', chunk_size=150,
+                                                           include=['SGDRegressor'])
+        # the held-out rows of the file are left out of the training
+        self.assertLess(df.loc['SGDRegressor', 'Rows Trained'], 1000)
+        self.assertGreater(df.loc['SGDRegressor', 'r2 score'], 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
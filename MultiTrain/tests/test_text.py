@@ -0,0 +1,42 @@
+from MultiTrain.classification.classification_models import MultiClassifier
+from MultiTrain.methods.text import vectorize
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import unittest
+
+
+def documents(n, random_state=0):
+    random = np.random.default_rng(random_state)
+    words = [f'w{i}' for i in range(60)]
+    y = np.arange(n) % 2
+    X = [' '.join(random.choice(words[:40] if label else words[20:], 12)) for label in y]
+    return X, y
+
+
+class TestText(unittest.TestCase):
+
+    def test_vectorize(self):
+        X, _ = documents(40)
+        fitted, X_train, X_test, _ = vectorize(X[:30], X[30:], 'count', (1, 2))
+        self.assertEqual(X_train.shape[0], 30)
+        self.assertEqual(X_test.shape, (10, len(fitted.vocabulary_)))
+        with self.assertRaises(ValueError):
+            vectorize(X[:30], X[30:], 'hashing')
+
+    def test_text_fit(self):
+        X, y = documents(200)
+        split = train_test_split(X, y, test_size=0.25, random_state=1)
+        clf = MultiClassifier(random_state=0)
+        include = ['MultinomialNB', 'HistGradientBoostingClassifier']
+        df = clf.fit(splitting=True, split_data=split, include=include, text=True, vectorizer='tfidf')
+
+        self.assertEqual(sorted(df.index), sorted(include))
+        self.assertIn('vectorization time(seconds)', df.columns)
+        # the dense only model was fitted on the shared matrix and its pipeline predicts the documents
+        pipeline = clf.use_model(df, 'HistGradientBoostingClassifier')
+        self.assertEqual(len(pipeline.predict(split[1])), len(split[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
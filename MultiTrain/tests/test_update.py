@@ -0,0 +1,71 @@
+from MultiTrain.classification.classification_models import MultiClassifier
+from MultiTrain.regression.regression_models import MultiRegressor
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import train_test_split
+
+import numpy as np
+import pandas as pd
+import unittest
+from unittest import mock
+
+
+class TestUpdate(unittest.TestCase):
+
+    def test_update(self):
+        X, y = make_classification(3000, 8, random_state=0)
+        clf = MultiClassifier(random_state=0, target_class='binary')
+        with self.assertRaises(Exception):
+            clf.update(X, y)
+
+        clf.fit(splitting=True, split_data=train_test_split(X[:1500], y[:1500], random_state=0),
+                include=['SGDClassifier', 'RandomForestClassifier', 'DecisionTreeClassifier'])
+        df = clf.update(X[1500:2200], y[1500:2200])
+        self.assertEqual(list(df['Update']), ['partial_fit', 'warm_start', 'kept'])
+        self.assertEqual(list(df['Rows Trained']), [1685, 1685, 1125])
+        self.assertGreater(clf.use_model(df, 'RandomForestClassifier').n_estimators, 100)
+        # the held-out rows of the fit and of the update, the window keeps the size of the fit's
+        self.assertEqual(clf.store.holdout[0].shape, (375, 8))
+
+        df = clf.update(X[2200:], y[2200:], max_age=0)
+        self.assertEqual(df.loc['DecisionTreeClassifier', 'Update'], 'refit')
+        self.assertGreater(df.loc['DecisionTreeClassifier', 'Accuracy'], 0.8)
+
+        # a model that fails half way through the new rows is kept exactly as it was
+        def fails(model, *args, **kwargs):
+            model.coef_ += 1
+            raise ValueError('the rows could not be learned')
+
+        kept = clf.use_model(df, 'SGDClassifier')
+        coef = kept.coef_.copy()
+        with mock.patch.object(SGDClassifier, 'partial_fit', fails):
+            df = clf.update(X[2200:2400], y[2200:2400])
+        self.assertEqual(df.loc['SGDClassifier', 'Update'], 'kept')
+        self.assertTrue(np.isnan(df.loc['SGDClassifier', 'Accuracy']))
+        self.assertIs(clf.use_model(df, 'SGDClassifier'), kept)
+        self.assertTrue(np.array_equal(kept.coef_, coef))
+
+        X, y = make_regression(1500, 5, noise=1, random_state=0)
+        reg = MultiRegressor(random_state=0)
+        reg.fit(splitting=True, split_data=train_test_split(X[:1000], y[:1000], random_state=0),
+                include=['SGDRegressor', 'Linear Regression'])
+        df = reg.update(X[1000:], y[1000:], max_age=0)
+        self.assertEqual(list(df['Update']), ['refit', 'partial_fit'])
+        self.assertGreater(df.loc['SGDRegressor', 'r2 score'], 0.9)
+
+    def test_update_prepared(self):
+        X, y = make_regression(1500, 5, noise=1, random_state=0)
+        X = pd.DataFrame(X, columns=list('abcde'))
+        reg = MultiRegressor(random_state=0)
+        reg.fit(splitting=True, split_data=train_test_split(X[:1000], y[:1000], random_state=0),
+                include=['SGDRegressor'], dtype='float32', layout='F')
+        # the new rows are converted like the data of the fit, and so are the windows
+        df = reg.update(X[1000:], pd.Series(y[1000:]))
+        self.assertEqual(df.loc['SGDRegressor', 'Update'], 'partial_fit')
+        for X_window, y_window in (reg.store.holdout, reg.store.training):
+            self.assertEqual((type(X_window), X_window.dtype, y_window.dtype), (np.ndarray, np.float32, np.float64))
+            self.assertTrue(X_window.flags['F_CONTIGUOUS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
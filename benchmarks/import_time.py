@@ -0,0 +1,89 @@
+"""
+It measures the cold import time and the resident memory of MultiTrain, each sample in a fresh interpreter
+
+    python benchmarks/import_time.py                 # the working tree
+    python benchmarks/import_time.py --rev baseline  # the working tree against a git revision, e.g. before a change
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the optional backends that should only be imported when a model, sampler or plot needs them
+BACKENDS = ['catboost', 'xgboost', 'lightgbm', 'skopt', 'imblearn', 'plotly', 'seaborn', 'matplotlib.pyplot',
+            'matplotlib.backends.backend_pdf', 'IPython']
+
+STATEMENTS = {
+    'import MultiTrain': 'import MultiTrain',
+    'MultiClassifier': 'from MultiTrain import MultiClassifier',
+    'MultiRegressor': 'from MultiTrain import MultiRegressor',
+}
+
+PROBE = '''
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                  'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'backends': [name for name in {backends!r} if name in sys.modules]}}))
+'''
+
+
+def measure(path: str, statement: str, repeat: int) -> dict:
+    """
+    It imports statement in repeat fresh interpreters with path first on sys.path and returns the median time and
+    memory, and the backends that ended up imported
+    """
+    environment = dict(os.environ, PYTHONPATH=path, PYTHONDONTWRITEBYTECODE='1')
+    # the first run compiles and warms the disk cache, it is not counted
+    samples = []
+    for _ in range(repeat + 1):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, backends=BACKENDS)],
+                                env=environment, cwd=path, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    samples = samples[1:]
+    return {'seconds': statistics.median(sample['seconds'] for sample in samples),
+            'rss_mb': statistics.median(sample['rss_mb'] for sample in samples),
+            'backends': samples[-1]['backends']}
+
+
+def checkout(rev: str, destination: str) -> str:
+    # only the package is extracted, the benchmark always runs from the working tree
+    archive = os.path.join(destination, 'tree.tar')
+    subprocess.run(['git', '-C', ROOT, 'archive', '-o', archive, rev, 'MultiTrain'], check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(destination)
+    return destination
+
+
+def report(label: str, results: dict) -> None:
+    print(f'\n{label}')
+    print(f'{"statement":<20}{"seconds":>10}{"rss (MB)":>12}  backends imported')
+    for name, result in results.items():
+        print(f'{name:<20}{result["seconds"]:>10.3f}{result["rss_mb"]:>12.1f}  {", ".join(result["backends"]) or "-"}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rev', help='a git revision to compare the working tree against')
+    parser.add_argument('--repeat', type=int, default=5, help='the number of timed imports of each statement')
+    args = parser.parse_args()
+
+    trees = [('working tree', ROOT)]
+    with tempfile.TemporaryDirectory() as temporary:
+        if args.rev is not None:
+            trees.insert(0, (args.rev, checkout(args.rev, temporary)))
+
+        for label, path in trees:
+            report(label, {name: measure(path, statement, args.repeat) for name, statement in STATEMENTS.items()})
+
+
+if __name__ == '__main__':
+    main()